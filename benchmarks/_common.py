@@ -0,0 +1,83 @@
+"""Shared helpers for the standalone benchmark scripts.
+
+Run any script from the repository root, e.g.::
+
+    PYTHONPATH=src python benchmarks/bench_forgetting.py --students 20000
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import random
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from skillgraph_tutor.student import StudentState
+
+BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def synthetic_students(
+    n_students: int, n_concepts: int, seed: int = 42, fill: float = 0.6
+) -> list[StudentState]:
+    """Students with a random subset of ``C0..Cn`` touched over the last 90 days."""
+    rng = random.Random(seed)
+    names = [f"C{idx}" for idx in range(n_concepts)]
+    students = []
+    for idx in range(n_students):
+        student = StudentState(
+            student_id=f"s{idx}", name=f"Student {idx}", forgetting_lambda=rng.uniform(0.01, 0.1)
+        )
+        for name in names:
+            if rng.random() < fill:
+                state = student.concept(name)
+                state.mastery = rng.random()
+                stamp = BASE_TIME - timedelta(seconds=rng.uniform(0, 90 * 86400))
+                state.updated_at = stamp.isoformat()
+        students.append(student)
+    return students
+
+
+def synthetic_syllabus(n_concepts: int, shape: str = "dag", seed: int = 42) -> str:
+    """Markdown syllabus of ``C0..Cn``.
+
+    ``chain``: each concept requires the previous one (the parser's implicit rule).
+    ``dag``: each concept requires up to three random earlier concepts.
+    ``wide``: layers of about sqrt(n) concepts, each requiring up to three
+    concepts of the layer before (the first layer has no prerequisites).
+    """
+    rng = random.Random(seed)
+    width = max(1, math.isqrt(n_concepts))
+    lines = []
+    for idx in range(n_concepts):
+        lines.append(f"## C{idx}")
+        if shape == "dag" and idx:
+            reqs = {f"C{rng.randrange(idx)}" for _ in range(rng.randint(1, 3))}
+            lines.append(f"requires: {', '.join(sorted(reqs))}")
+        elif shape == "wide":
+            layer = idx // width
+            if layer:
+                start = (layer - 1) * width
+                reqs = {f"C{rng.randrange(start, start + width)}" for _ in range(rng.randint(1, 3))}
+                lines.append(f"requires: {', '.join(sorted(reqs))}")
+            else:
+                lines.append("requires:")  # an empty list, not the implicit previous heading
+    return "\n".join(lines) + "\n"
+
+
+def measure(fn: Callable[[], object], repeat: int = 3) -> float:
+    """Best wall time of ``repeat`` runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def emit(name: str, **fields) -> None:
+    json.dump({"benchmark": name, **fields}, sys.stdout)
+    sys.stdout.write("\n")
@@ -0,0 +1,110 @@
+"""Cold vs warm startup: parsing the config and graph vs loading them from the cache.
+
+``config``/``graph`` time one load in process: ``parse`` always parses (and
+compiles the graph), ``cold`` is a first cached load (parse plus writing the
+entry), ``warm`` reuses the entry. ``cli_quiz`` times a whole ``skillgraph quiz``
+process with ``SKILLGRAPH_CACHE=0`` and with a warm cache. Sources are dated a
+minute back, as in a workspace initialized earlier, so their stamps are trusted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from _common import emit, measure, synthetic_syllabus
+
+from skillgraph_tutor.cache import load_cached
+from skillgraph_tutor.config import SkillGraphConfig
+from skillgraph_tutor.graph import load_graph, parse_syllabus_markdown
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concepts", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=9, help="CLI processes per variant")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        workspace = root / "workspace"
+        config = root / "skillgraph.toml"
+        config.write_text(
+            f'data_dir = "{workspace.as_posix()}"\n'
+            f'[logging]\ntrace_path = "{(root / "traces.jsonl").as_posix()}"\n'
+            "[storage]\nfsync_writes = false\n[planner]\nactions_per_day = 5\n",
+            encoding="utf-8",
+        )
+        syllabus = root / "syllabus.md"
+        syllabus.write_text(synthetic_syllabus(args.concepts), encoding="utf-8")
+        graph_path = workspace / "graph.json"
+        parse_syllabus_markdown(syllabus.read_text(encoding="utf-8")).save_json(graph_path)
+        past = time.time() - 60
+        for path in (config, graph_path):
+            os.utime(path, (past, past))
+
+        cache = root / "cache"
+        for name, path, build in (
+            ("config", config, SkillGraphConfig.load),
+            ("graph", graph_path, load_graph),
+        ):
+
+            def cold(path=path, build=build) -> None:
+                shutil.rmtree(cache, ignore_errors=True)
+                load_cached(path, build, cache)
+
+            timings = {
+                "parse": measure(lambda path=path, build=build: build(path), args.repeat),
+                "cold": measure(cold, args.repeat),
+                "warm": measure(
+                    lambda path=path, build=build: load_cached(path, build, cache), args.repeat
+                ),
+            }
+            for variant, seconds in timings.items():
+                emit(
+                    f"cache_{name}",
+                    variant=variant,
+                    concepts=args.concepts,
+                    seconds=round(seconds, 6),
+                )
+
+        env = {**os.environ, "SKILLGRAPH_CACHE_DIR": str(root / "user-cache")}
+        cli = [sys.executable, "-m", "skillgraph_tutor.cli"]
+        subprocess.run(
+            cli + ["add-student", "s1", "--name", "Bench", "--config-path", str(config)],
+            env=env,
+            check=True,
+            capture_output=True,
+        )
+        concepts = iter(range(args.concepts))  # a fresh concept per run keeps intervals short
+        for variant, extra in (("uncached", {"SKILLGRAPH_CACHE": "0"}), ("warm", {})):
+            walls = []
+            for _ in range(args.runs + 1):  # the first run warms the cache
+                quiz = cli + ["quiz", "s1", f"C{next(concepts)}", "--correct"]
+                start = time.perf_counter()
+                subprocess.run(
+                    quiz + ["--config-path", str(config)],
+                    env={**env, **extra},
+                    check=True,
+                    capture_output=True,
+                )
+                walls.append(time.perf_counter() - start)
+            walls = walls[1:]
+            emit(
+                "cache_cli_quiz",
+                variant=variant,
+                concepts=args.concepts,
+                median_ms=round(statistics.median(walls) * 1000, 2),
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Concurrent writers updating one student: per-student locks vs optimistic retries.
+
+Each of ``--writers`` processes increments one concept's repetition count
+``--updates`` times. ``locked`` wraps every load-modify-save in
+``store.locked``; ``optimistic`` saves without it and reloads on
+``StaleStudentError``. Both must end at writers * updates (no lost updates) on
+every backend: json, binary, eventlog and sqlite.
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from _common import emit
+
+from skillgraph_tutor.storage import StaleStudentError, open_student_store
+from skillgraph_tutor.student import StudentState
+
+
+def _bump(store, locked: bool) -> int:
+    conflicts = 0
+    while True:
+        try:
+            if locked:
+                with store.locked("s0"):
+                    student = store.load("s0")
+                    student.concept("C0").reviews.repetitions += 1
+                    store.save(student)
+            else:
+                student = store.load("s0")
+                student.concept("C0").reviews.repetitions += 1
+                store.save(student)
+            return conflicts
+        except StaleStudentError:
+            conflicts += 1
+
+
+def _writer(args: tuple[str, str, bool, bool, int]) -> int:
+    workspace, backend, fsync, locked, updates = args
+    store = open_student_store(workspace, backend=backend, fsync=fsync)
+    return sum(_bump(store, locked) for _ in range(updates))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--updates", type=int, default=200)
+    parser.add_argument(
+        "--fsync", action="store_true", help="fsync every write, as configured stores do by default"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in ("json", "binary", "eventlog", "sqlite"):
+            for variant in ("locked", "optimistic"):
+                workspace = str(Path(tmp) / f"{backend}-{variant}")
+                store = open_student_store(workspace, backend=backend)
+                store.save(StudentState(student_id="s0", name="Student 0"))
+                jobs = [(workspace, backend, args.fsync, variant == "locked", args.updates)]
+                start = time.perf_counter()
+                with multiprocessing.Pool(args.writers) as pool:
+                    conflicts = sum(pool.map(_writer, jobs * args.writers))
+                seconds = time.perf_counter() - start
+                total = args.writers * args.updates
+                emit(
+                    "contended_updates",
+                    backend=backend,
+                    variant=variant,
+                    writers=args.writers,
+                    updates=total,
+                    final_count=store.load("s0").concepts["C0"].reviews.repetitions,
+                    conflicts=conflicts,
+                    seconds=round(seconds, 4),
+                    updates_per_sec=round(total / seconds, 1),
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Scalar vs vectorized forgetting and mastery updates over a whole cohort."""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+
+from _common import BASE_TIME, emit, measure, synthetic_students
+
+from skillgraph_tutor.cohort import CohortStore, apply_forgetting_batch, update_mastery_batch
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--concepts", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    students = synthetic_students(args.students, args.concepts)
+    now = BASE_TIME
+
+    # Re-running at the same ``now`` repeats identical work (delta becomes 0), so no
+    # per-run reset is needed for either path.
+    def scalar() -> None:
+        for student in students:
+            for name in student.concepts:
+                student.apply_forgetting(name, now=now)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CohortStore.create(tmp, student_capacity=args.students)
+        for student in students:
+            store.save_student(student)
+
+        def vectorized(exact: bool) -> None:
+            apply_forgetting_batch(store, now=now, exact=exact)
+
+        # One quiz event per student, as in a daily LMS export.
+        ids = [student.student_id for student in students]
+        concepts = [f"C{idx % args.concepts}" for idx in range(args.students)]
+
+        def scalar_updates() -> None:
+            for student, name in zip(students, concepts, strict=True):
+                student.update_mastery(name, correct=True, confidence=0.8, now=now)
+
+        def batch_updates() -> None:
+            update_mastery_batch(store, ids, concepts, True, 0.8, now=now)
+
+        timings = {
+            ("apply_forgetting", "scalar"): measure(scalar, args.repeat),
+            ("apply_forgetting", "batch_exact"): measure(lambda: vectorized(True), args.repeat),
+            ("apply_forgetting", "batch_fast"): measure(lambda: vectorized(False), args.repeat),
+            ("update_mastery", "scalar"): measure(scalar_updates, args.repeat),
+            ("update_mastery", "batch_exact"): measure(batch_updates, args.repeat),
+        }
+
+    for (name, variant), seconds in timings.items():
+        emit(
+            name,
+            variant=variant,
+            students=args.students,
+            concepts=args.concepts,
+            seconds=round(seconds, 4),
+            students_per_sec=round(args.students / seconds, 1),
+        )
+
+
+if __name__ == "__main__":
+    main()
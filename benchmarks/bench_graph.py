@@ -0,0 +1,62 @@
+"""Graph load/compile and new-concept eligibility on large synthetic syllabi."""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from _common import emit, measure, synthetic_syllabus
+
+from skillgraph_tutor.graph import load_graph, parse_syllabus_markdown
+from skillgraph_tutor.planner import _eligible_new_concepts, next_action
+from skillgraph_tutor.student import StudentState
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concepts", type=int, default=10_000)
+    parser.add_argument("--shape", choices=["chain", "dag", "wide"], default="dag")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    text = synthetic_syllabus(args.concepts, args.shape)
+    graph = parse_syllabus_markdown(text)
+    student = StudentState(student_id="s1", name="Bench")
+    for name in graph.topological_order()[: args.concepts // 2]:
+        student.concept(name).mastery = 0.9
+
+    order = graph.topological_order()
+    flips = iter(range(10**9))
+
+    def flip_and_query() -> None:
+        # Toggle one mastered concept across the threshold, then ask for the next one.
+        name = order[next(flips) % (args.concepts // 2)]
+        state = student.concept(name)
+        state.mastery = 0.1 if state.mastery >= 0.7 else 0.9
+        _eligible_new_concepts(graph, student, 0.7, limit=1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "graph.json"
+        graph.save_json(path)
+        timings = {
+            "load_graph": measure(lambda: load_graph(path), args.repeat),
+            "compile": measure(graph.compile, args.repeat),
+            "eligible_all": measure(
+                lambda: _eligible_new_concepts(graph, student, 0.7), args.repeat
+            ),
+            "eligible_after_update": measure(flip_and_query, args.repeat),
+            "next_action": measure(lambda: next_action(graph, student), args.repeat),
+        }
+
+    for name, seconds in timings.items():
+        emit(
+            name,
+            concepts=args.concepts,
+            shape=args.shape,
+            seconds=round(seconds, 6),
+        )
+
+
+if __name__ == "__main__":
+    main()
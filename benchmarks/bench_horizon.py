@@ -0,0 +1,45 @@
+"""Horizon planner latency across plan lengths on a synthetic syllabus."""
+
+from __future__ import annotations
+
+import argparse
+
+from _common import BASE_TIME, emit, measure, synthetic_students, synthetic_syllabus
+
+from skillgraph_tutor.config import PlannerConfig
+from skillgraph_tutor.graph import parse_syllabus_markdown
+from skillgraph_tutor.horizon import plan_horizon
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concepts", type=int, default=1000)
+    parser.add_argument("--horizons", default="7d,30d,90d")
+    parser.add_argument("--per-day", type=int, default=3)
+    parser.add_argument("--fill", type=float, default=0.3, help="share of concepts started")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    graph = parse_syllabus_markdown(synthetic_syllabus(args.concepts))
+    graph.compile()
+    (student,) = synthetic_students(1, args.concepts, fill=args.fill)
+    config = PlannerConfig(actions_per_day=args.per_day)
+
+    for horizon in args.horizons.split(","):
+        actions = plan_horizon(graph, student, horizon, config, now=BASE_TIME)
+        seconds = measure(
+            lambda h=horizon: plan_horizon(graph, student, h, config, now=BASE_TIME),
+            args.repeat,
+        )
+        emit(
+            "plan_horizon",
+            concepts=args.concepts,
+            horizon=horizon,
+            per_day=args.per_day,
+            actions=len(actions),
+            seconds=round(seconds, 6),
+        )
+
+
+if __name__ == "__main__":
+    main()
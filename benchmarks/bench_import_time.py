@@ -0,0 +1,125 @@
+"""CLI startup cost: ``python -X importtime`` for ``skillgraph_tutor.cli`` against a budget.
+
+Each run is a fresh interpreter with warm bytecode caches (kept in a temporary
+``PYTHONPYCACHEPREFIX``). Reports the median import time, the modules with the
+largest self time, any command-specific module that leaked into the startup
+path, and the wall time of a whole ``skillgraph quiz`` process. Exits with
+status 1 if the median import time exceeds ``--budget-ms``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from _common import emit
+
+# Imported by individual commands only; none of these should load at startup.
+LAZY_MODULES = (
+    "skillgraph_tutor.reporting",
+    "skillgraph_tutor.eval_harness",
+    "skillgraph_tutor.ingest",
+    "skillgraph_tutor.horizon",
+    "skillgraph_tutor.tutors",
+    "skillgraph_tutor.service",
+    "skillgraph_tutor.cohort",
+    "skillgraph_tutor.sqlstore",
+    "concurrent.futures",
+    "tempfile",
+    "tomllib",
+)
+
+
+def importtime(env: dict) -> dict[str, tuple[int, int]]:
+    """Module -> (self us, cumulative us) for one fresh ``import skillgraph_tutor.cli``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import skillgraph_tutor.cli"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line.removeprefix("import time:").split("|")
+        modules[name.strip()] = (int(own), int(cumulative))
+    return modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=80.0)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    src = Path(__file__).resolve().parents[1] / "src"
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "PYTHONPYCACHEPREFIX": str(Path(tmp) / "pycache"),
+            "SKILLGRAPH_CACHE_DIR": str(Path(tmp) / "cache"),
+        }
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(src), env.get("PYTHONPATH")]))
+
+        importtime(env)  # populate the bytecode cache
+        runs = [importtime(env) for _ in range(args.runs)]
+        total_ms = statistics.median(run["skillgraph_tutor.cli"][1] for run in runs) / 1000
+        last = runs[-1]
+        emit(
+            "cli_import_time",
+            runs=args.runs,
+            median_ms=round(total_ms, 2),
+            budget_ms=args.budget_ms,
+            within_budget=total_ms <= args.budget_ms,
+            leaked_modules=[name for name in LAZY_MODULES if name in last],
+        )
+        for name, (own, cumulative) in sorted(last.items(), key=lambda item: -item[1][0])[
+            : args.top
+        ]:
+            emit(
+                "cli_import_module",
+                module=name,
+                self_ms=own / 1000,
+                cumulative_ms=cumulative / 1000,
+            )
+
+        workspace = Path(tmp) / "workspace"
+        config = Path(tmp) / "skillgraph.toml"
+        config.write_text(
+            f'data_dir = "{workspace.as_posix()}"\n'
+            f'[logging]\ntrace_path = "{(Path(tmp) / "traces.jsonl").as_posix()}"\n',
+            encoding="utf-8",
+        )
+        cli = [sys.executable, "-m", "skillgraph_tutor.cli"]
+        syllabus = Path(__file__).resolve().parents[1] / "data" / "sample_syllabus.md"
+        for setup in (
+            ["init", str(syllabus), "--config", str(config)],
+            ["add-student", "s1", "--name", "Bench", "--config-path", str(config)],
+        ):
+            subprocess.run(cli + setup, env=env, check=True, capture_output=True)
+        quiz = cli + ["quiz", "s1", "Variables", "--correct", "--config-path", str(config)]
+        walls = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            subprocess.run(quiz, env=env, check=True, capture_output=True)
+            walls.append(time.perf_counter() - start)
+        emit(
+            "cli_quiz_process", runs=args.runs, median_ms=round(statistics.median(walls) * 1000, 2)
+        )
+
+    if total_ms > args.budget_ms:
+        sys.exit(f"Import time {total_ms:.1f} ms exceeds the {args.budget_ms:.0f} ms budget.")
+
+
+if __name__ == "__main__":
+    main()
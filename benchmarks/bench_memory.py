@@ -0,0 +1,91 @@
+"""Resident bytes per concept for a warm cache of loaded students.
+
+``slots`` loads students through ``StudentState.from_dict`` (slotted concept and
+review states, interned concept names); ``dict`` builds the same fields as
+ordinary ``__dict__``-backed dataclasses with per-student name strings.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import tracemalloc
+from dataclasses import dataclass, field
+
+from _common import emit, synthetic_students
+
+from skillgraph_tutor.student import StudentState, concept_from_dict
+
+
+@dataclass
+class DictReviewState:
+    repetitions: int = 0
+    interval_days: int = 0
+    ease_factor: float = 2.5
+    due_us: int | None = None
+
+
+@dataclass
+class DictConceptState:
+    mastery: float = 0.2
+    updated_us: int = 0
+    reviews: DictReviewState = field(default_factory=DictReviewState)
+
+
+def load_dict_backed(data: dict) -> dict[str, DictConceptState]:
+    concepts = {}
+    for name, raw in data["concepts"].items():
+        state = concept_from_dict(raw)
+        reviews = state.reviews
+        concepts[name] = DictConceptState(
+            state.mastery,
+            state.updated_us,
+            DictReviewState(
+                reviews.repetitions, reviews.interval_days, reviews.ease_factor, reviews.due_us
+            ),
+        )
+    return concepts
+
+
+def footprint(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    held = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--concepts", type=int, default=100)
+    args = parser.parse_args()
+
+    # Round-trip through JSON text so names and numbers are fresh objects, as when
+    # a service process loads profiles from disk.
+    payloads = [
+        json.dumps(student.to_dict())
+        for student in synthetic_students(args.students, args.concepts)
+    ]
+    total = sum(len(json.loads(text)["concepts"]) for text in payloads)
+    variants = {
+        "slots": lambda: [StudentState.from_dict(json.loads(text)) for text in payloads],
+        "dict": lambda: [load_dict_backed(json.loads(text)) for text in payloads],
+    }
+    for variant, build in variants.items():
+        size = footprint(build)
+        emit(
+            "student_memory",
+            variant=variant,
+            students=args.students,
+            concepts=total,
+            megabytes=round(size / 2**20, 2),
+            bytes_per_concept=round(size / total, 1),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Per-student next_action loop vs vectorized plan_cohort over a whole cohort."""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+
+from _common import BASE_TIME, emit, measure, synthetic_students, synthetic_syllabus
+
+from skillgraph_tutor.cohort import CohortStore, plan_cohort
+from skillgraph_tutor.graph import parse_syllabus_markdown
+from skillgraph_tutor.planner import next_action
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--concepts", type=int, default=200)
+    parser.add_argument("--fill", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    graph = parse_syllabus_markdown(synthetic_syllabus(args.concepts))
+    graph.compile()
+    students = synthetic_students(args.students, args.concepts, fill=args.fill)
+    # Mostly-mastered profiles so a good share of students reach the frontier check.
+    for student in students:
+        for state in student.concepts.values():
+            state.mastery = 0.6 + 0.4 * state.mastery
+            state.reviews.due_at = BASE_TIME.replace(year=2027).isoformat()
+
+    def loop() -> None:
+        # Fresh copies so the per-student indexes are built inside the timing, as in a
+        # nightly job that loads each profile once.
+        for student in students:
+            next_action(graph, student.simulate(), now=BASE_TIME)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CohortStore.create(tmp, student_capacity=args.students)
+        for student in students:
+            store.save_student(student)
+        timings = {
+            "next_action_loop": measure(loop, args.repeat),
+            "plan_cohort_students": measure(
+                lambda: plan_cohort(graph, students, now=BASE_TIME), args.repeat
+            ),
+            "plan_cohort_store": measure(
+                lambda: plan_cohort(graph, store, now=BASE_TIME), args.repeat
+            ),
+        }
+
+    for name, seconds in timings.items():
+        emit(
+            name,
+            students=args.students,
+            concepts=args.concepts,
+            seconds=round(seconds, 6),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Flat vs hashed-shard JSON layouts: listing the cohort and loading random students."""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+from pathlib import Path
+
+from _common import emit, measure
+
+from skillgraph_tutor.storage import JsonStudentStore
+from skillgraph_tutor.student import StudentState
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=20_000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    ids = [f"student-{idx:07d}" for idx in range(args.students)]
+    sample = random.Random(18).sample(ids, min(args.lookups, len(ids)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for layout, levels in (("flat", 0), ("sharded", 2)):
+            store = JsonStudentStore(Path(tmp) / layout, shard_levels=levels, shard_fanout=64)
+            for student_id in ids:
+                store.save(StudentState(student_id=student_id, name=student_id))
+
+            def glob_listing(store=store) -> None:
+                sorted(path.stem for path in store.layout.scan())
+
+            def lookups(store=store) -> None:
+                for student_id in sample:
+                    store.load(student_id)
+
+            cases = {
+                "list_manifest": store.student_ids,
+                "list_directory_walk": glob_listing,
+                "load": lookups,
+            }
+            for operation, fn in cases.items():
+                seconds = measure(fn, args.repeat)
+                emit(
+                    "student_layout",
+                    layout=layout,
+                    operation=operation,
+                    students=args.students,
+                    seconds=round(seconds, 4),
+                )
+
+
+if __name__ == "__main__":
+    main()
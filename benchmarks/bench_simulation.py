@@ -0,0 +1,60 @@
+"""Copy-on-write simulation vs deepcopy for planning and eval across profile sizes."""
+
+from __future__ import annotations
+
+import argparse
+import copy
+from datetime import timedelta
+
+from _common import BASE_TIME, emit, measure, synthetic_students, synthetic_syllabus
+
+from skillgraph_tutor.graph import parse_syllabus_markdown
+from skillgraph_tutor.planner import next_action, seven_day_plan
+from skillgraph_tutor.student import StudentState
+
+
+def deepcopy_plan(graph, student) -> list:
+    """``seven_day_plan`` as it was before ``StudentState.simulate``."""
+    actions = []
+    simulated = copy.deepcopy(student)
+    for day in range(7):
+        action = next_action(graph, simulated)
+        actions.append(action)
+        if action.concept not in simulated.concepts:
+            simulated.concept(action.concept).mastery = 0.3
+        simulated.apply_forgetting(action.concept, now=BASE_TIME + timedelta(days=day + 1))
+    return actions
+
+
+def bench_size(size: int, repeat: int) -> dict[str, float]:
+    graph = parse_syllabus_markdown(synthetic_syllabus(size))
+    graph.compile()
+    (student,) = synthetic_students(1, size, fill=0.9)
+
+    def eval_gain(fork) -> None:
+        sim = fork(student)
+        sim.update_mastery("C0", correct=True, confidence=0.9, now=BASE_TIME)
+
+    return {
+        "fork_deepcopy": measure(lambda: copy.deepcopy(student), repeat),
+        "fork_overlay": measure(student.simulate, repeat),
+        "eval_gain_deepcopy": measure(lambda: eval_gain(copy.deepcopy), repeat),
+        "eval_gain_overlay": measure(lambda: eval_gain(StudentState.simulate), repeat),
+        "seven_day_plan_deepcopy": measure(lambda: deepcopy_plan(graph, student), repeat),
+        "seven_day_plan_overlay": measure(lambda: seven_day_plan(graph, student), repeat),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="100,1000,10000", help="concepts per profile")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for size in [int(value) for value in args.sizes.split(",")]:
+        for name, seconds in bench_size(size, args.repeat).items():
+            emit(name, concepts=size, seconds=round(seconds, 6))
+
+
+if __name__ == "__main__":
+    main()
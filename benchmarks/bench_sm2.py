@@ -0,0 +1,60 @@
+"""Per-event ``sm2_update`` vs ``sm2_update_many`` for a day of review events."""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+
+from _common import BASE_TIME, emit, measure, synthetic_students
+
+from skillgraph_tutor.cohort import CohortStore, sm2_update_many
+from skillgraph_tutor.scheduler import sm2_update
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--concepts", type=int, default=50)
+    parser.add_argument("--events", type=int, default=100_000)
+    # Intervals compound across runs, so repeats are opt-in.
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    students = synthetic_students(args.students, args.concepts)
+    picks = [
+        (rng.randrange(args.students), f"C{rng.randrange(args.concepts)}", rng.randint(0, 5))
+        for _ in range(args.events)
+    ]
+    now = BASE_TIME
+
+    def scalar() -> None:
+        for idx, name, quality in picks:
+            sm2_update(students[idx].concept(name), quality=quality, now=now)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CohortStore.create(tmp, student_capacity=args.students)
+        for student in students:
+            store.save_student(student)
+        ids = [students[idx].student_id for idx, _, _ in picks]
+        names = [name for _, name, _ in picks]
+        qualities = [quality for _, _, quality in picks]
+
+        def batch() -> None:
+            sm2_update_many(store, ids, names, qualities, now=now)
+
+        timings = {"scalar": measure(scalar, args.repeat), "batch": measure(batch, args.repeat)}
+
+    for variant, seconds in timings.items():
+        emit(
+            "sm2_update",
+            variant=variant,
+            events=args.events,
+            seconds=round(seconds, 4),
+            events_per_sec=round(args.events / seconds, 1),
+        )
+
+
+if __name__ == "__main__":
+    main()
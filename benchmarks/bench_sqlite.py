@@ -0,0 +1,64 @@
+"""SQLite store: batched vs per-save commits, and indexed vs scanned "who is due" queries."""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from _common import BASE_TIME, emit, measure, synthetic_students
+
+from skillgraph_tutor.storage import open_student_store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--concepts", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    students = synthetic_students(args.students, args.concepts)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite = open_student_store(Path(tmp) / "sqlite", backend="sqlite")
+        json_store = open_student_store(Path(tmp) / "json", backend="json")
+
+        # A save attaches a change tracker, after which re-saving an unchanged student
+        # writes nothing; dropping it makes every run a full write of every profile.
+        def save_each() -> None:
+            for student in students:
+                student._watchers.clear()
+                sqlite.save(student)
+
+        def save_batched() -> None:
+            with sqlite.batch():
+                for student in students:
+                    student._watchers.clear()
+                    sqlite.save(student)
+
+        for variant, fn in (("per_save_commit", save_each), ("batched", save_batched)):
+            seconds = measure(fn, args.repeat)
+            emit(
+                "sqlite_save",
+                variant=variant,
+                students=args.students,
+                seconds=round(seconds, 4),
+                students_per_sec=round(args.students / seconds, 1),
+            )
+
+        for student in students:
+            json_store.save(student)
+        for backend, store in (("json_scan", json_store), ("sqlite_index", sqlite)):
+            seconds = measure(lambda store=store: store.students_due("C7", now=BASE_TIME), 1)
+            emit(
+                "students_due",
+                variant=backend,
+                students=args.students,
+                matches=len(store.students_due("C7", now=BASE_TIME)),
+                seconds=round(seconds, 5),
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Load/save throughput of the JSON and binary student stores.
+
+``load`` and ``save`` process every concept; ``quiz`` is the single-concept path
+of ``skillgraph quiz`` (load, update one concept, save).
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+
+from _common import BASE_TIME, emit, measure, synthetic_students
+
+from skillgraph_tutor.storage import open_student_store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--concepts", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    students = synthetic_students(args.students, args.concepts)
+    ids = [student.student_id for student in students]
+    concepts = sum(len(student.concepts) for student in students)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in ("json", "binary"):
+            store = open_student_store(tmp, backend=backend)
+
+            def save(store=store) -> None:
+                for student in students:
+                    store.save(student)
+
+            def load(store=store) -> None:
+                for student_id in ids:
+                    loaded = store.load(student_id)
+                    for name in loaded.concepts:
+                        loaded.concepts[name]
+
+            def quiz(store=store) -> None:
+                for student_id in ids:
+                    student = store.load(student_id)
+                    student.update_mastery("C0", correct=True, confidence=0.8, now=BASE_TIME)
+                    store.save(student)
+
+            for operation, fn in (("save", save), ("load", load), ("quiz", quiz)):
+                seconds = measure(fn, args.repeat)
+                emit(
+                    "student_store",
+                    backend=backend,
+                    operation=operation,
+                    students=args.students,
+                    concepts=concepts,
+                    seconds=round(seconds, 4),
+                    students_per_sec=round(args.students / seconds, 1),
+                )
+
+
+if __name__ == "__main__":
+    main()
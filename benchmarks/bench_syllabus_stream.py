@@ -0,0 +1,96 @@
+"""Multi-file syllabus parsing: streaming lines vs reading every file into one string.
+
+Writes ``--files`` markdown files holding a ``dag`` syllabus of ``--concepts``
+concepts between them (so most ``requires:`` lines point into other files) and
+``--prose`` lines of lesson text per concept. ``stream`` is
+``parse_syllabus_files`` over the directory; ``read_all`` joins every file's
+text and calls ``parse_syllabus_markdown``, as ``init`` did for a single file.
+Reports lines/sec and, in a separate ``tracemalloc`` pass, peak traced memory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from _common import emit, measure, synthetic_syllabus
+
+from skillgraph_tutor.graph import parse_syllabus_files, parse_syllabus_markdown, syllabus_files
+
+
+def write_files(root: Path, n_concepts: int, n_files: int, prose: int) -> int:
+    """Split the syllabus at headings into ``n_files`` files; return the line count.
+
+    Each concept gets ``prose`` lines of body text, as real lesson pages have.
+    """
+    lines = synthetic_syllabus(n_concepts).splitlines(keepends=True)
+    body = [
+        f"Lesson text line {idx} about this concept, with an example or two.\n"
+        for idx in range(prose)
+    ]
+    per_file = -(-n_concepts // n_files)
+    handle = None
+    headings = 0
+    written = 0
+    for line in lines:
+        if line.startswith("## "):
+            if handle is not None:
+                handle.writelines(body)
+                written += prose
+            if headings % per_file == 0:
+                if handle is not None:
+                    handle.close()
+                part = root / f"unit{headings // per_file:05d}" / "syllabus.md"
+                part.parent.mkdir()
+                handle = part.open("w", encoding="utf-8")
+            headings += 1
+        handle.write(line)
+        written += 1
+    handle.writelines(body)
+    handle.close()
+    return written + prose
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concepts", type=int, default=50_000)
+    parser.add_argument("--files", type=int, default=1_000)
+    parser.add_argument("--prose", type=int, default=20, help="body lines per concept")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        n_lines = write_files(root, args.concepts, args.files, args.prose)
+
+        def stream() -> None:
+            parse_syllabus_files(syllabus_files(root))
+
+        def read_all() -> None:
+            text = "".join(path.read_text(encoding="utf-8") for path in syllabus_files(root))
+            parse_syllabus_markdown(text).compile()
+
+        _, report = parse_syllabus_files(syllabus_files(root))
+        for variant, fn in (("stream", stream), ("read_all", read_all)):
+            seconds = measure(fn, args.repeat)
+            tracemalloc.start()
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            emit(
+                "syllabus_files",
+                variant=variant,
+                files=report.files,
+                lines=n_lines,
+                concepts=args.concepts,
+                unknown=len(report.unknown),
+                seconds=round(seconds, 4),
+                lines_per_sec=round(n_lines / seconds, 1),
+                peak_mb=round(peak / 2**20, 1),
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Per-call cost of ``is_due``, ``apply_forgetting`` and ``sm2_update``.
+
+``iso`` re-implements the previous model, where ``updated_at``/``due_at`` were ISO
+strings parsed and formatted on every call; ``epoch`` is the current code, which
+keeps integer epoch microseconds and only touches ISO strings when serializing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+from datetime import datetime, timedelta
+
+from _common import BASE_TIME, emit, measure
+
+from skillgraph_tutor.config import SpacedRepetitionConfig
+from skillgraph_tutor.scheduler import is_due, sm2_update
+from skillgraph_tutor.student import ConceptState, StudentState
+
+
+def iso_is_due(state: dict, now: datetime) -> bool:
+    due_at = state["due_at"]
+    return due_at is None or datetime.fromisoformat(due_at) <= now
+
+
+def iso_apply_forgetting(state: dict, forgetting_lambda: float, now: datetime) -> float:
+    past = datetime.fromisoformat(state["updated_at"])
+    delta_days = max((now - past).total_seconds() / 86400, 0)
+    decayed = state["mastery"] * math.exp(-forgetting_lambda * delta_days)
+    state["mastery"] = float(max(0.0, min(1.0, decayed)))
+    state["updated_at"] = now.isoformat()
+    return state["mastery"]
+
+
+def iso_sm2_update(state: dict, quality: int, cfg: SpacedRepetitionConfig, now: datetime) -> None:
+    # Same schedule as ``sm2_update``; only the timestamp handling differs.
+    if quality < 3:
+        state["repetitions"] = 0
+        state["interval_days"] = cfg.initial_interval_days
+    else:
+        if state["repetitions"] == 0:
+            state["interval_days"] = cfg.initial_interval_days
+        elif state["repetitions"] == 1:
+            state["interval_days"] = max(2, round(cfg.initial_interval_days * 6))
+        else:
+            state["interval_days"] = max(1, round(state["interval_days"] * state["ease_factor"]))
+        state["repetitions"] += 1
+    state["ease_factor"] = max(
+        cfg.min_ease,
+        state["ease_factor"] + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)),
+    )
+    if quality == 5:
+        state["interval_days"] = max(
+            state["interval_days"], round(state["interval_days"] * cfg.easy_bonus)
+        )
+    state["due_at"] = (now + timedelta(days=state["interval_days"])).isoformat()
+    state["updated_at"] = now.isoformat()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(14)
+    cfg = SpacedRepetitionConfig()
+    now = BASE_TIME
+    stamps = [now - timedelta(seconds=rng.uniform(0, 90 * 86400)) for _ in range(args.calls)]
+    qualities = [rng.randint(0, 5) for _ in range(args.calls)]
+
+    legacy = [
+        {
+            "mastery": rng.random(),
+            "updated_at": stamp.isoformat(),
+            "repetitions": 0,
+            "interval_days": 0,
+            "ease_factor": 2.5,
+            "due_at": stamp.isoformat(),
+        }
+        for stamp in stamps
+    ]
+    student = StudentState(student_id="bench", name="Bench", forgetting_lambda=0.05)
+    states = []
+    for idx, item in enumerate(legacy):
+        state = ConceptState(mastery=item["mastery"])
+        state.updated_at = item["updated_at"]
+        state.reviews.due_at = item["due_at"]
+        student.concepts[f"C{idx}"] = state
+        states.append(state)
+    names = list(student.concepts)
+
+    # Forgetting at a fixed ``now`` is idempotent after the first run and SM-2 only
+    # grows intervals, so repeated runs measure the same work on both paths.
+    cases = {
+        "is_due": {
+            "iso": lambda: [iso_is_due(item, now) for item in legacy],
+            "epoch": lambda: [is_due(state, now) for state in states],
+        },
+        "apply_forgetting": {
+            "iso": lambda: [iso_apply_forgetting(item, 0.05, now) for item in legacy],
+            "epoch": lambda: [student.apply_forgetting(name, now) for name in names],
+        },
+        "sm2_update": {
+            "iso": lambda: [
+                iso_sm2_update(item, q, cfg, now) for item, q in zip(legacy, qualities, strict=True)
+            ],
+            "epoch": lambda: [
+                sm2_update(state, q, cfg, now) for state, q in zip(states, qualities, strict=True)
+            ],
+        },
+    }
+    for name, variants in cases.items():
+        for variant, fn in variants.items():
+            seconds = measure(fn, args.repeat)
+            emit(
+                name,
+                variant=variant,
+                calls=args.calls,
+                seconds=round(seconds, 4),
+                calls_per_sec=round(args.calls / seconds, 1),
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Cost of tracing a quiz: per-event append vs the buffered ``TraceWriter``.
+
+``append`` re-implements the previous ``log_trace``, which created the parent
+directory and opened, wrote and closed the file for every event. ``buffered``
+times ``emit`` for every event plus one final ``flush``. ``due_count`` compares
+building the ranked review queue with counting it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+from _common import BASE_TIME, emit, measure, synthetic_students
+
+from skillgraph_tutor.logging_utils import TraceWriter
+from skillgraph_tutor.planner import build_review_queue, count_reviews
+
+
+def append_trace(path: Path, payload: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    enriched = {"timestamp": datetime.now(timezone.utc).isoformat(), **payload}
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(enriched) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--concepts", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    payload = {
+        "student_id": "s0",
+        "concept": "C7",
+        "chosen_action": "quiz",
+        "tutor_type": "socratic",
+        "mastery_before": 0.41,
+        "mastery_after": 0.52,
+        "due_count": 12,
+        "quiz_score": 1,
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+
+        def append() -> None:
+            for _ in range(args.events):
+                append_trace(root / "append" / "traces.jsonl", payload)
+
+        def buffered() -> None:
+            writer = TraceWriter(root / "buffered" / "traces.jsonl", max_bytes=16 << 20)
+            for _ in range(args.events):
+                writer.emit(payload)
+            writer.close()
+
+        for variant, fn in (("append", append), ("buffered", buffered)):
+            seconds = measure(fn, args.repeat)
+            emit(
+                "trace_events",
+                variant=variant,
+                events=args.events,
+                seconds=round(seconds, 4),
+                events_per_sec=round(args.events / seconds, 1),
+            )
+
+    student = synthetic_students(1, args.concepts)[0]
+    for variant, fn in (("queue", build_review_queue), ("count", count_reviews)):
+        seconds = measure(lambda fn=fn: fn(student, now=BASE_TIME), args.repeat)
+        emit(
+            "trace_due_count",
+            variant=variant,
+            concepts=len(student.concepts),
+            due_count=count_reviews(student, now=BASE_TIME),
+            seconds=round(seconds, 6),
+        )
+
+
+if __name__ == "__main__":
+    main()
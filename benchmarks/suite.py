@@ -0,0 +1,227 @@
+"""Benchmark suite over the hot paths, with a regression check against a baseline.
+
+Times syllabus parsing (chain, dag and wide graphs), graph and student I/O, review
+queues, ``next_action``, ``seven_day_plan``, ``sm2_update``, ``render_report`` and
+whole CLI commands on a synthetic cohort. Each result is printed as a JSON line;
+``--out`` also writes them to one JSON file, which a later run can be compared
+against with ``--baseline``::
+
+    PYTHONPATH=src python benchmarks/suite.py --scale medium --out baseline.json
+    PYTHONPATH=src python benchmarks/suite.py --scale medium --baseline baseline.json
+
+The comparison exits with status 1 if any case got slower by more than
+``--tolerance`` (relative) and ``--min-delta`` seconds (absolute noise floor).
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import tempfile
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+
+from _common import BASE_TIME, emit, measure, synthetic_students, synthetic_syllabus
+
+from skillgraph_tutor import cli
+from skillgraph_tutor.config import SkillGraphConfig
+from skillgraph_tutor.graph import load_graph, parse_syllabus_markdown
+from skillgraph_tutor.planner import build_review_queue, next_action, seven_day_plan
+from skillgraph_tutor.reporting import render_report
+from skillgraph_tutor.scheduler import sm2_update
+from skillgraph_tutor.student import load_student, save_student
+
+SCALES = {
+    # concepts per syllabus, students in the cohort, students planned/rendered one by one
+    "small": (500, 200, 5),
+    "medium": (5_000, 1_000, 10),
+    "large": (20_000, 5_000, 20),
+}
+
+
+_COHORT_CASES = (
+    "save_student",
+    "load_student",
+    "build_review_queue",
+    "next_action",
+    "seven_day_plan",
+    "render_report",
+    "sm2_update",
+)
+_CLI_CASES = ("cli_init", "cli_study", "cli_quiz", "cli_review", "cli_plan", "cli_report")
+
+Case = tuple[str, dict, Callable[[], object]]
+
+
+def cases(scale: str, tmp: Path, only: str = "") -> list[Case]:
+    """Every case at ``scale`` whose name contains ``only``; fixtures are built only if used."""
+    n_concepts, n_students, n_sampled = SCALES[scale]
+    found: list[Case] = []
+
+    syllabi = {shape: synthetic_syllabus(n_concepts, shape) for shape in ("chain", "dag", "wide")}
+    for shape, text in syllabi.items():
+        found.append(
+            ("parse_syllabus_markdown", {"shape": shape, "concepts": n_concepts}, _bind(text))
+        )
+    graph = parse_syllabus_markdown(syllabi["dag"])
+    graph_path = tmp / "graph.json"
+    graph.save_json(graph_path)
+    found.append(("load_graph", {"concepts": n_concepts}, lambda: load_graph(graph_path)))
+
+    if any(only in name for name in _COHORT_CASES):
+        found += _cohort_cases(tmp, graph, n_concepts, n_students, n_sampled)
+    if any(only in name for name in _CLI_CASES):
+        found += _cli_cases(tmp / "cli", syllabi["dag"], n_concepts)
+    return [case for case in found if only in case[0]]
+
+
+def _cohort_cases(tmp: Path, graph, n_concepts: int, n_students: int, n_sampled: int) -> list[Case]:
+    # A fifth of the syllabus per student keeps profiles realistic at every scale.
+    students = synthetic_students(n_students, max(1, n_concepts // 5))
+    student = students[0]
+    student_path = tmp / "student.json"
+    save_student(student_path, student, fsync=False)
+    size = {"concepts": len(student.concepts)}
+    cohort = {"students": n_students}
+    sampled = students[:n_sampled]
+    return [
+        ("save_student", size, lambda: save_student(student_path, student, fsync=False)),
+        ("load_student", size, lambda: load_student(student_path)),
+        (
+            "build_review_queue",
+            cohort,
+            lambda: [build_review_queue(s, now=BASE_TIME) for s in students],
+        ),
+        ("next_action", cohort, lambda: [next_action(graph, s, now=BASE_TIME) for s in students]),
+        (
+            "seven_day_plan",
+            {"students": n_sampled},
+            lambda: [seven_day_plan(graph, s) for s in sampled],
+        ),
+        (
+            "render_report",
+            {"students": n_sampled},
+            lambda: [render_report(s, graph) for s in sampled],
+        ),
+        ("sm2_update", size, lambda: _review_all(student)),
+    ]
+
+
+def _bind(text: str) -> Callable[[], object]:
+    return lambda: parse_syllabus_markdown(text)
+
+
+def _review_all(student) -> None:
+    config = SkillGraphConfig().spaced_repetition
+    for state in student.concepts.values():
+        sm2_update(state, quality=4, config=config, now=BASE_TIME)
+
+
+def _cli_cases(root: Path, syllabus: str, n_concepts: int) -> list[Case]:
+    root.mkdir()
+    (root / "syllabus.md").write_text(syllabus, encoding="utf-8")
+    config = root / "skillgraph.toml"
+    config.write_text(
+        f'data_dir = "{(root / "workspace").as_posix()}"\n'
+        f'[logging]\ntrace_path = "{(root / "traces.jsonl").as_posix()}"\n'
+        "[storage]\nfsync_writes = false\n",
+        encoding="utf-8",
+    )
+    path = str(config)
+    cli.init_cmd(str(root / "syllabus.md"), config_path=path)
+    cli.add_student("s1", name="Bench", config_path=path)
+    for idx in range(0, n_concepts, max(1, n_concepts // 200)):
+        cli.quiz("s1", f"C{idx}", correct=idx % 3 != 0, confidence=0.8, config_path=path)
+
+    size = {"concepts": n_concepts}
+    return [
+        ("cli_init", size, lambda: cli.init_cmd(str(root / "syllabus.md"), config_path=path)),
+        ("cli_study", size, lambda: cli.study("s1", "C1", config_path=path)),
+        (
+            "cli_quiz",
+            size,
+            lambda: cli.quiz("s1", "C1", correct=True, confidence=0.8, config_path=path),
+        ),
+        ("cli_review", size, lambda: cli.review("s1", config_path=path)),
+        ("cli_plan", size, lambda: cli.plan("s1", horizon="7d", per_day=None, config_path=path)),
+        ("cli_report", size, lambda: cli.report("s1", out=str(root / "out"), config_path=path)),
+    ]
+
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float, min_delta: float) -> int:
+    """Emit one ``regression_check`` line per shared case; return the number of regressions."""
+    previous = {_key(row): row["seconds"] for row in baseline}
+    regressions = 0
+    for row in results:
+        before = previous.get(_key(row))
+        if before is None:
+            continue
+        ratio = row["seconds"] / before if before else float("inf")
+        regressed = ratio > 1 + tolerance and row["seconds"] - before > min_delta
+        regressions += regressed
+        emit(
+            "regression_check",
+            case=row["case"],
+            params=row["params"],
+            baseline_seconds=before,
+            seconds=row["seconds"],
+            ratio=round(ratio, 3),
+            status="regressed" if regressed else "ok",
+        )
+    return regressions
+
+
+def _key(row: dict) -> str:
+    return json.dumps([row["case"], row["params"]], sort_keys=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", default="", help="run only cases whose name contains this")
+    parser.add_argument("--out", help="write all results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results written by --out")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-delta", type=float, default=0.005)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # CLI commands print; keep stdout for the JSON lines.
+        with contextlib.redirect_stdout(io.StringIO()):
+            selected = cases(args.scale, Path(tmp), args.only)
+        for name, params, fn in selected:
+            with contextlib.redirect_stdout(io.StringIO()):
+                seconds = measure(fn, args.repeat)
+            results.append({"case": name, "params": params, "seconds": round(seconds, 6)})
+            emit(name, scale=args.scale, **params, seconds=round(seconds, 6))
+
+    if args.out:
+        payload = {
+            "scale": args.scale,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "created": datetime.now(timezone.utc).isoformat(),
+            "results": results,
+        }
+        Path(args.out).write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        if baseline.get("scale") != args.scale:
+            sys.exit(
+                f"Baseline was recorded at scale '{baseline.get('scale')}', not '{args.scale}'."
+            )
+        if compare(results, baseline["results"], args.tolerance, args.min_delta):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import os
+import pickle
+import sys
+import time
+import zlib
+from collections.abc import Callable
+from pathlib import Path
+from typing import TypeVar
+
+from .fsutil import atomic_write
+
+T = TypeVar("T")
+
+_FORMAT = 1
+# A source modified this close to when its entry was written may change again
+# without a visible mtime change (coarse timestamps), so its hash is checked.
+_RACY_SECONDS = 2.0
+# Writing an entry evicts the oldest ones beyond this many, and any older than this.
+_MAX_ENTRIES = 32
+_MAX_AGE_SECONDS = 30 * 24 * 3600
+
+
+def cache_dir() -> Path | None:
+    """Where cached configs go: ``SKILLGRAPH_CACHE_DIR``, else the user cache directory.
+
+    None when ``SKILLGRAPH_CACHE=0`` turns caching off.
+    """
+    if os.environ.get("SKILLGRAPH_CACHE", "1") == "0":
+        return None
+    explicit = os.environ.get("SKILLGRAPH_CACHE_DIR")
+    if explicit:
+        return Path(explicit)
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "skillgraph"
+
+
+def load_cached(source: str | Path, build: Callable[[Path], T], directory: Path | None) -> T:
+    """``build(source)``, reusing the result pickled in ``directory`` while ``source`` is unchanged.
+
+    An entry is reused when the source's mtime and size match it, or when they
+    do not but its content hash does. Entries are also dropped when the module
+    defining ``build`` changes. Without a directory, or if the cache cannot be
+    read or written, this is just ``build(source)``. Entries are pickles, so
+    this trusts whoever can write to ``directory``.
+    """
+    source = Path(source).resolve()
+    if directory is None:
+        return build(source)
+    stat = source.stat()
+    entry = directory / f"{source.stem}-{zlib.crc32(str(source).encode()):08x}.pickle"
+    tag = (_FORMAT, sys.version_info[:2], _code_stamp(build))
+    digest = None
+    try:
+        with entry.open("rb") as handle:
+            header = pickle.load(handle)
+            if (header["source"], header["tag"]) == (str(source), tag):
+                stamp = (header["mtime_ns"], header["size"])
+                racy = header["written"] - stat.st_mtime < _RACY_SECONDS
+                if stamp == (stat.st_mtime_ns, stat.st_size) and not racy:
+                    return pickle.load(handle)
+                digest = _digest(source)
+                if digest == header["digest"]:
+                    value = pickle.load(handle)
+                    if time.time() - stat.st_mtime >= _RACY_SECONDS:
+                        _write(entry, source, tag, stat, digest, value)  # trust the stamp again
+                    return value
+    except Exception:
+        pass  # a missing, torn or outdated entry (e.g. a class that changed shape) is a miss
+
+    # Hash before building: if the file changes in between, the next load sees the mismatch.
+    digest = digest or _digest(source)
+    value = build(source)
+    _write(entry, source, tag, stat, digest, value)
+    return value
+
+
+def _code_stamp(build: Callable) -> int:
+    module = sys.modules.get(getattr(build, "__module__", ""), None)
+    path = getattr(module, "__file__", None)
+    return os.stat(path).st_mtime_ns if path else 0
+
+
+def _digest(source: Path) -> str:
+    from hashlib import blake2b
+
+    return blake2b(source.read_bytes(), digest_size=16).hexdigest()
+
+
+def _write(entry: Path, source: Path, tag: tuple, stat, digest: str, value) -> None:
+    header = {
+        "source": str(source),
+        "tag": tag,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "digest": digest,
+        "written": time.time(),
+    }
+    try:
+        data = pickle.dumps(header, pickle.HIGHEST_PROTOCOL)
+        atomic_write(entry, data + pickle.dumps(value, pickle.HIGHEST_PROTOCOL), fsync=False)
+        _evict(entry.parent)
+    except (OSError, pickle.PicklingError):
+        pass  # an unwritable cache only costs the next command a parse
+
+
+def _evict(directory: Path) -> None:
+    # Only misses get here, so a warm cache never pays for the listing.
+    cutoff = time.time() - _MAX_AGE_SECONDS
+    entries = []
+    for path in directory.glob("*.pickle"):
+        try:
+            entries.append((path.stat().st_mtime, path))
+        except FileNotFoundError:
+            continue  # evicted by another process meanwhile
+    entries.sort(reverse=True)
+    for rank, (mtime, path) in enumerate(entries):
+        if rank >= _MAX_ENTRIES or mtime < cutoff:
+            path.unlink(missing_ok=True)
@@ -1,22 +1,68 @@
 from __future__ import annotations
 
-import shutil
+import copy
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import TYPE_CHECKING
 
+from . import profiling
+from .cache import cache_dir, load_cached
 from .compat import typer
 from .config import SkillGraphConfig
-from .eval_harness import write_evaluation
-from .graph import load_graph, parse_syllabus_markdown
-from .logging_utils import log_trace
-from .planner import build_review_queue, next_action, seven_day_plan
-from .reporting import write_report
+from .graph import find_cycles, load_graph, parse_syllabus_files, syllabus_files
+from .logging_utils import trace_writer
+from .planner import (
+    PlannedAction,
+    build_review_queue,
+    count_reviews,
+    next_action,
+    seven_day_plan,
+)
 from .scheduler import sm2_update
-from .student import StudentState, load_student, save_student
-from .tutors import SocraticTutor
+from .storage import (
+    CohortStudentStore,
+    FileStudentStore,
+    StaleStudentError,
+    StudentStore,
+    migrate_students,
+    open_configured_store,
+)
+from .student import StudentState
+
+if TYPE_CHECKING:
+    from .tutors import TutorTurn
+
+# Modules only some commands need (reporting, ingest, horizon planning, tutors, the
+# service) are imported inside those commands to keep startup short: LMS hooks run
+# one process per event.
 
 app = typer.Typer(help="SkillGraph Tutor CLI")
 
 
+def command(name: str):
+    """``app.command`` whose runs are profiled when ``--profile`` or ``SKILLGRAPH_PROFILE`` asks."""
+    return lambda func: app.command(name)(profiling.command(name)(func))
+
+
+@app.callback()
+def main(
+    profile: bool = typer.Option(False, "--profile"),
+    profile_alloc: bool = typer.Option(False, "--profile-alloc"),
+    profile_dump: str | None = typer.Option(None, "--profile-dump"),
+) -> None:
+    profiling.configure(profile, profile_alloc, profile_dump)
+
+
+@profiling.profiled
+def _load_config(config_path: str | None) -> SkillGraphConfig:
+    if config_path is None:
+        cfg = SkillGraphConfig()
+    else:
+        cfg = load_cached(config_path, SkillGraphConfig.load, cache_dir())
+    profiling.set_output(cfg.logging.profile_path)
+    return cfg
+
+
 def _workspace(config: SkillGraphConfig) -> Path:
     root = Path(config.data_dir)
     root.mkdir(parents=True, exist_ok=True)
@@ -24,8 +70,12 @@ def _workspace(config: SkillGraphConfig) -> Path:
     return root
 
 
-def _student_path(config: SkillGraphConfig, student_id: str) -> Path:
-    return _workspace(config) / "students" / f"{student_id}.json"
+def _student_store(config: SkillGraphConfig, backend: str | None = None) -> StudentStore:
+    _workspace(config)
+    try:
+        return open_configured_store(config, backend)
+    except (ModuleNotFoundError, ValueError) as exc:
+        _fail(str(exc))
 
 
 def _graph_path(config: SkillGraphConfig) -> Path:
@@ -37,61 +87,199 @@ def _fail(message: str) -> None:
     raise SystemExit(1)
 
 
-def _require_student(config: SkillGraphConfig, student_id: str) -> StudentState:
-    path = _student_path(config, student_id)
+@profiling.profiled
+def _require_student(
+    config: SkillGraphConfig, student_id: str, store: StudentStore | None = None
+) -> StudentState:
     try:
-        return load_student(path)
+        return (store or _student_store(config)).load(student_id)
     except FileNotFoundError:
         _fail(
             f"Student with ID '{student_id}' not found. Run 'skillgraph add-student {student_id}'."
         )
 
 
+@profiling.profiled
+def _save_student(store: StudentStore, student: StudentState) -> None:
+    try:
+        store.save(student)
+    except StaleStudentError as exc:
+        _fail(f"{exc} Retry the command.")
+
+
+@profiling.profiled
 def _require_graph(config: SkillGraphConfig):
-    path = _graph_path(config)
+    """The concept graph; its cache in ``<data_dir>/.cache`` is unpickled, trusting its writers."""
+    cache = None if cache_dir() is None else _workspace(config) / ".cache"
     try:
-        return load_graph(path)
+        graph = _student_store(config).load_graph()
+        if graph is not None:
+            return graph
+        return load_cached(_graph_path(config), load_graph, cache)
     except FileNotFoundError:
         _fail("Concept graph not initialized. Run 'skillgraph init <syllabus.md>' first.")
+    except ValueError as exc:  # e.g. a graph saved before init rejected cycles
+        try:
+            cycles = find_cycles(load_graph(_graph_path(config), compile=False))
+        except (OSError, ValueError):
+            cycles = []
+        if cycles:
+            _fail(f"{_cycle_report(cycles)}. Fix the syllabus and run 'skillgraph init' again.")
+        _fail(f"Cannot load the concept graph: {exc}")
+
+
+def _cycle_report(cycles: list[list[str]]) -> str:
+    return "Prerequisite cycle detected among concepts: " + "; ".join(
+        ", ".join(cycle) for cycle in cycles
+    )
+
+
+def _parse_at(at: str | None) -> datetime | None:
+    """``--at`` timestamp (ISO 8601; naive means UTC), or None for now."""
+    if not at:
+        return None
+    now = datetime.fromisoformat(at)
+    return now if now.tzinfo else now.replace(tzinfo=timezone.utc)
+
+
+@profiling.profiled
+def apply_study(student: StudentState, concept: str) -> TutorTurn:
+    from .tutors import SocraticTutor
+
+    turn = SocraticTutor().teach(concept, response="")
+    student.concept(concept)
+    return turn
+
+
+@profiling.profiled
+def apply_quiz(
+    cfg: SkillGraphConfig,
+    student: StudentState,
+    concept: str,
+    correct: bool,
+    confidence: float,
+    now: datetime | None = None,
+) -> tuple[float, float]:
+    before = student.concept(concept).mastery
+    after = student.update_mastery(concept, correct=correct, confidence=confidence, now=now)
+    quality = 4 if correct else 2
+    sm2_update(student.concept(concept), quality=quality, config=cfg.spaced_repetition, now=now)
+    tracer = trace_writer(cfg.logging)
+    if tracer is not None:
+        tracer.emit(
+            {
+                "student_id": student.student_id,
+                "concept": concept,
+                "chosen_action": "quiz",
+                "tutor_type": "socratic",
+                "mastery_before": before,
+                "mastery_after": after,
+                "due_count": lambda: count_reviews(student),
+                "quiz_score": int(correct),
+            }
+        )
+    return before, after
+
+
+@profiling.profiled
+def apply_review(
+    cfg: SkillGraphConfig, student: StudentState, now: datetime | None = None
+) -> list[str]:
+    queue = build_review_queue(
+        student, low_mastery_threshold=cfg.policy.review_mastery_threshold, now=now
+    )
+    for concept in queue:
+        sm2_update(student.concept(concept), quality=4, config=cfg.spaced_repetition, now=now)
+    return queue
+
+
+@profiling.profiled
+def plan_actions(
+    cfg: SkillGraphConfig,
+    graph,
+    student: StudentState,
+    horizon: str = "7d",
+    per_day: int | None = None,
+) -> list[PlannedAction]:
+    if horizon == "next":
+        return [next_action(graph, student)]
+    if not _multi_day_plan(horizon, per_day):
+        return seven_day_plan(graph, student)  # the week the report shows
+    from .horizon import plan_horizon
+
+    planner = cfg.planner
+    if per_day is not None:
+        planner = copy.copy(planner)
+        planner.actions_per_day = per_day
+    return plan_horizon(
+        graph,
+        student,
+        horizon,
+        planner,
+        cfg.spaced_repetition,
+        review_threshold=cfg.policy.review_mastery_threshold,
+    )
 
 
-@app.command("init")
+def _multi_day_plan(horizon: str, per_day: int | None) -> bool:
+    """Whether ``plan`` runs the horizon planner; ``next`` and the default week do not."""
+    if horizon == "next":
+        return False
+    from .horizon import parse_horizon
+
+    return per_day is not None or parse_horizon(horizon) != 7
+
+
+@command("init")
 def init_cmd(syllabus: str, config_path: str | None = typer.Option(None, "--config")) -> None:
-    cfg = SkillGraphConfig.load(config_path)
-    text = Path(syllabus).read_text(encoding="utf-8")
-    graph = parse_syllabus_markdown(text)
+    cfg = _load_config(config_path)
+    paths = syllabus_files(syllabus)
+    if not paths:
+        _fail(f"No syllabus files match '{syllabus}'.")
+    graph, report = parse_syllabus_files(paths)
+    if report.cycles:
+        _fail(_cycle_report(report.cycles))
+    for req, concepts in list(report.unknown.items())[:10]:
+        more = f" and {len(concepts) - 3} more" if len(concepts) > 3 else ""
+        typer.echo(
+            f"Warning: unknown prerequisite '{req}' required by {', '.join(concepts[:3])}{more}"
+        )
+    if len(report.unknown) > 10:
+        typer.echo(f"Warning: {len(report.unknown) - 10} more unknown prerequisites")
     graph.save_json(_graph_path(cfg))
-    typer.echo(f"Initialized graph with {len(graph.nodes)} concepts.")
+    _student_store(cfg).save_graph(graph)
+    source = f" from {report.files} files" if report.files > 1 else ""
+    typer.echo(f"Initialized graph with {len(graph.nodes)} concepts{source}.")
 
 
-@app.command("add-student")
+@command("add-student")
 def add_student(
     student_id: str, name: str = typer.Option(..., "--name"), config_path: str | None = None
 ) -> None:
-    cfg = SkillGraphConfig.load(config_path)
+    cfg = _load_config(config_path)
     student = StudentState(
         student_id=student_id,
         name=name,
         forgetting_lambda=cfg.forgetting.lambda_default,
         mastery_learning_rate=cfg.policy.mastery_learning_rate,
     )
-    save_student(_student_path(cfg, student_id), student)
+    _student_store(cfg).save(student)
     typer.echo(f"Added student {student_id}.")
 
 
-@app.command("study")
+@command("study")
 def study(student_id: str, concept: str, config_path: str | None = None) -> None:
-    cfg = SkillGraphConfig.load(config_path)
-    student = _require_student(cfg, student_id)
-    tutor = SocraticTutor()
-    turn = tutor.teach(concept, response="")
-    student.concept(concept)
-    save_student(_student_path(cfg, student_id), student)
+    cfg = _load_config(config_path)
+    store = _student_store(cfg)
+    with store.locked(student_id):
+        student = _require_student(cfg, student_id, store)
+        turn = apply_study(student, concept)
+        _save_student(store, student)
     typer.echo(turn.question)
     typer.echo(f"Hint: {turn.hint}")
 
 
-@app.command("quiz")
+@command("quiz")
 def quiz(
     student_id: str,
     concept: str,
@@ -99,70 +287,202 @@ def quiz(
     confidence: float = typer.Option(0.7, "--confidence"),
     config_path: str | None = None,
 ) -> None:
-    cfg = SkillGraphConfig.load(config_path)
-    student = _require_student(cfg, student_id)
-    before = student.concept(concept).mastery
-    after = student.update_mastery(concept, correct=correct, confidence=confidence)
-    quality = 4 if correct else 2
-    sm2_update(student.concept(concept), quality=quality, config=cfg.spaced_repetition)
-    save_student(_student_path(cfg, student_id), student)
-    log_trace(
-        cfg.logging.trace_path,
-        {
-            "student_id": student_id,
-            "concept": concept,
-            "chosen_action": "quiz",
-            "tutor_type": "socratic",
-            "mastery_before": before,
-            "mastery_after": after,
-            "due_count": len(build_review_queue(student)),
-            "quiz_score": int(correct),
-        },
-    )
+    cfg = _load_config(config_path)
+    store = _student_store(cfg)
+    with store.locked(student_id):
+        student = _require_student(cfg, student_id, store)
+        before, after = apply_quiz(cfg, student, concept, correct=correct, confidence=confidence)
+        _save_student(store, student)
     typer.echo(f"Updated mastery {before:.2f} -> {after:.2f}")
 
 
-@app.command("review")
+@command("ingest")
+def ingest(
+    path: str,
+    chunk_rows: int = typer.Option(1_000_000, "--chunk-rows"),
+    config_path: str | None = typer.Option(None, "--config"),
+) -> None:
+    cfg = _load_config(config_path)
+    if not Path(path).exists():
+        _fail(f"Input file '{path}' not found.")
+    from .ingest import ingest_events, read_events
+
+    try:
+        stats = ingest_events(cfg, _student_store(cfg), read_events(path), chunk_rows=chunk_rows)
+    except (StaleStudentError, ValueError) as exc:
+        _fail(str(exc))
+    typer.echo(
+        f"Ingested {stats.rows} rows for {stats.students} students in {stats.seconds:.2f}s "
+        f"({stats.rows_per_sec:,.0f} rows/sec)."
+    )
+    if stats.skipped:
+        typer.echo(f"Skipped {stats.skipped} rows for unknown students.")
+
+
+@command("review")
 def review(student_id: str, config_path: str | None = None) -> None:
-    cfg = SkillGraphConfig.load(config_path)
-    student = _require_student(cfg, student_id)
-    queue = build_review_queue(student, low_mastery_threshold=cfg.policy.review_mastery_threshold)
+    cfg = _load_config(config_path)
+    store = _student_store(cfg)
+    with store.locked(student_id):
+        student = _require_student(cfg, student_id, store)
+        queue = apply_review(cfg, student)
+        if queue:
+            _save_student(store, student)
     if not queue:
         typer.echo("No due reviews.")
         return
     for concept in queue:
-        sm2_update(student.concept(concept), quality=4, config=cfg.spaced_repetition)
         typer.echo(f"Reviewed {concept}")
-    save_student(_student_path(cfg, student_id), student)
 
 
-@app.command("plan")
+@command("plan")
 def plan(
-    student_id: str, horizon: str = typer.Option("7d", "--horizon"), config_path: str | None = None
+    student_id: str,
+    horizon: str = typer.Option("7d", "--horizon"),
+    per_day: int | None = typer.Option(None, "--per-day"),
+    config_path: str | None = None,
 ) -> None:
-    cfg = SkillGraphConfig.load(config_path)
+    cfg = _load_config(config_path)
     graph = _require_graph(cfg)
     student = _require_student(cfg, student_id)
-    actions = seven_day_plan(graph, student) if horizon == "7d" else [next_action(graph, student)]
+    try:
+        actions = plan_actions(cfg, graph, student, horizon, per_day)
+    except ValueError as exc:
+        _fail(str(exc))
+    dated = _multi_day_plan(horizon, per_day)
     for item in actions:
-        typer.echo(f"{item.action}: {item.concept} ({item.reason})")
+        day = f"Day {item.day} " if dated else ""
+        typer.echo(f"{day}{item.action}: {item.concept} ({item.reason})")
+
+
+@command("plan-cohort")
+def plan_cohort_cmd(
+    out: str = typer.Option(..., "--out"),
+    at: str | None = typer.Option(None, "--at"),
+    config_path: str | None = typer.Option(None, "--config"),
+) -> None:
+    cfg = _load_config(config_path)
+    graph = _require_graph(cfg)
+    store = _student_store(cfg)
+    try:
+        from .cohort import plan_cohort
+
+        now = _parse_at(at)
+        if isinstance(store, CohortStudentStore):
+            students = store.cohort
+        else:
+            students = [store.load(student_id) for student_id in store.student_ids()]
+        table = plan_cohort(graph, students, now=now)
+    except (ModuleNotFoundError, ValueError) as exc:
+        _fail(str(exc))
+    if out.endswith(".npz"):
+        table.to_npz(out)
+    else:
+        table.to_csv(out)
+    typer.echo(f"Planned next actions for {len(table)} students -> {out}")
+
+
+@command("due")
+def due_cmd(
+    concept: str,
+    at: str | None = typer.Option(None, "--at"),
+    config_path: str | None = typer.Option(None, "--config"),
+) -> None:
+    cfg = _load_config(config_path)
+    try:
+        student_ids = _student_store(cfg).students_due(concept, now=_parse_at(at))
+    except ValueError as exc:
+        _fail(str(exc))
+    if not student_ids:
+        typer.echo(f"No students have {concept} due.")
+    for student_id in student_ids:
+        typer.echo(student_id)
 
 
-@app.command("report")
+@command("report")
 def report(
     student_id: str, out: str = typer.Option(..., "--out"), config_path: str | None = None
 ) -> None:
-    cfg = SkillGraphConfig.load(config_path)
+    cfg = _load_config(config_path)
     graph = _require_graph(cfg)
     student = _require_student(cfg, student_id)
-    write_report(out, student, graph)
-    write_evaluation(out, graph, student)
+    from .eval_harness import write_evaluation
+    from .reporting import write_report
+
+    with profiling.stage("reporting.write_report"):
+        write_report(out, student, graph)
+    with profiling.stage("eval_harness.write_evaluation"):
+        write_evaluation(out, graph, student)
     typer.echo(f"Report written to {out}")
 
 
-@app.command("doctor")
+@command("report-all")
+def report_all(
+    out: str = typer.Option(..., "--out"),
+    workers: int = typer.Option(0, "--workers"),
+    config_path: str | None = typer.Option(None, "--config"),
+) -> None:
+    cfg = _load_config(config_path)
+    _require_graph(cfg)
+    from .reporting import write_cohort_reports
+
+    summary = write_cohort_reports(cfg, out, workers=workers or None)
+    typer.echo(
+        f"Reports for {summary['students']} students written to {out} "
+        f"(mean mastery {summary['mean_mastery']}, "
+        f"{summary['students_with_due_reviews']} with due reviews)."
+    )
+
+
+@command("migrate-format")
+def migrate_format(
+    to: str = typer.Option(..., "--to"),
+    source: str | None = typer.Option(None, "--from"),
+    config_path: str | None = typer.Option(None, "--config"),
+) -> None:
+    cfg = _load_config(config_path)
+    source = source or cfg.storage.backend
+    if source == to:
+        _fail(f"Students are already stored with the '{to}' backend.")
+    try:
+        count = migrate_students(_student_store(cfg, source), _student_store(cfg, to))
+    except ValueError as exc:
+        _fail(str(exc))
+    typer.echo(f"Copied {count} students from '{source}' to '{to}' storage.")
+    typer.echo(f'Set backend = "{to}" under [storage] in your config to use it.')
+
+
+@command("rebalance")
+def rebalance(config_path: str | None = typer.Option(None, "--config")) -> None:
+    cfg = _load_config(config_path)
+    store = _student_store(cfg)
+    if not isinstance(store, FileStudentStore):
+        _fail(f"The '{cfg.storage.backend}' backend does not use per-student files.")
+    count = store.rebalance()
+    levels = cfg.storage.shard_levels
+    layout = f"{levels} level(s) of {cfg.storage.shard_fanout}" if levels else "a flat directory"
+    typer.echo(f"Rebalanced {count} students into {layout} under {store.root}.")
+
+
+@command("serve")
+def serve_cmd(config_path: str | None = typer.Option(None, "--config")) -> None:
+    import asyncio
+
+    # Imported here: the service module builds on the command helpers above.
+    from .service import serve
+
+    cfg = _load_config(config_path)
+
+    def announce(server) -> None:
+        address = server.sockets[0].getsockname() if server.sockets else cfg.service.unix_socket
+        typer.echo(f"Serving SkillGraph Tutor on {address} (Ctrl+C to stop)")
+
+    asyncio.run(serve(cfg, on_ready=announce))
+
+
+@command("doctor")
 def doctor(config_path: str | None = typer.Option(None, "--config")) -> None:
-    cfg = SkillGraphConfig.load(config_path)
+    cfg = _load_config(config_path)
     ws_path = Path(cfg.data_dir)
     workspace_writable = False
     try:
@@ -183,9 +503,9 @@ def doctor(config_path: str | None = typer.Option(None, "--config")) -> None:
         typer.echo(f"{name}: {'ok' if ok else 'missing'}")
 
 
-@app.command("demo")
+@command("demo")
 def demo() -> None:
-    cfg = SkillGraphConfig.load(None)
+    cfg = _load_config(None)
     ws = _workspace(cfg)
     syllabus = Path("data/sample_syllabus.md")
     init_cmd(str(syllabus), None)
@@ -196,6 +516,8 @@ def demo() -> None:
     review(sid, config_path=None)
     report_dir = Path("reports") / sid
     if report_dir.exists():
+        import shutil
+
         shutil.rmtree(report_dir)
     report(sid, out=str(report_dir), config_path=None)
     typer.echo(f"Demo complete. Workspace: {ws}")
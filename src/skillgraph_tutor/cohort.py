@@ -0,0 +1,942 @@
+from __future__ import annotations
+
+import csv
+import heapq
+import json
+import math
+import mmap
+import os
+from collections.abc import Iterable, Iterator, MutableMapping, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .config import SpacedRepetitionConfig
+from .fsutil import atomic_write, file_lock, fingerprint
+from .graph import ConceptGraph
+from .planner import PlannedAction
+from .scheduler import _walk_heap
+from .student import ConceptState, StudentState, epoch_us, parse_epoch_us
+
+try:  # pragma: no cover - exercised when deps are installed
+    import numpy as np
+except ModuleNotFoundError:  # pragma: no cover - numpy is an optional extra
+    np = None
+
+# Dense student x concept columns. ``due_at`` uses NaN for "never scheduled".
+MATRIX_FIELDS: dict[str, str] = {
+    "present": "bool",
+    "mastery": "float64",
+    "updated_at": "float64",
+    "repetitions": "int32",
+    "interval_days": "int32",
+    "ease_factor": "float64",
+    "due_at": "float64",
+}
+# Per-student scalar columns.
+ROW_FIELDS: dict[str, str] = {
+    "forgetting_lambda": "float64",
+    "mastery_learning_rate": "float64",
+}
+_META_FILE = "cohort.json"
+_LOG_FILE = "cohort.log"
+_LOCK_FILE = ".locks/cohort.lock"
+# Fold cohort.log into cohort.json once it outgrows this and cohort.json itself.
+_COMPACT_BYTES = 1 << 16
+
+
+def require_numpy():
+    if np is None:
+        raise ModuleNotFoundError(
+            "The cohort store requires numpy: pip install 'skillgraph-tutor[cohort]'"
+        )
+    return np
+
+
+def to_epoch(value: str | None) -> float:
+    """Epoch seconds for an ISO timestamp; naive ones are UTC, as in ``StudentState``."""
+    return _epoch_from_us(None if value is None else parse_epoch_us(value))
+
+
+def from_epoch(value: float) -> str | None:
+    if value != value:  # NaN marks an unscheduled review
+        return None
+    return datetime.fromtimestamp(value, tz=timezone.utc).isoformat()
+
+
+def _us_from_epoch(value: float) -> int | None:
+    """Epoch microseconds for stored epoch seconds (see ``_epoch_parts``)."""
+    if value != value:
+        return None
+    seconds = math.floor(value)
+    return seconds * 1_000_000 + round((value - seconds) * 1e6)
+
+
+def _epoch_from_us(value: int | None) -> float:
+    return float("nan") if value is None else value / 1_000_000
+
+
+class ReviewView:
+    """``ReviewState``-compatible accessor for one cell of a cohort store."""
+
+    __slots__ = ("_store", "_row", "_col")
+
+    def __init__(self, store: CohortStore, row: int, col: int):
+        self._store = store
+        self._row = row
+        self._col = col
+
+    @property
+    def repetitions(self) -> int:
+        return int(self._store.arrays["repetitions"][self._row, self._col])
+
+    @repetitions.setter
+    def repetitions(self, value: int) -> None:
+        self._store.arrays["repetitions"][self._row, self._col] = value
+
+    @property
+    def interval_days(self) -> int:
+        return int(self._store.arrays["interval_days"][self._row, self._col])
+
+    @interval_days.setter
+    def interval_days(self, value: int) -> None:
+        self._store.arrays["interval_days"][self._row, self._col] = value
+
+    @property
+    def ease_factor(self) -> float:
+        return float(self._store.arrays["ease_factor"][self._row, self._col])
+
+    @ease_factor.setter
+    def ease_factor(self, value: float) -> None:
+        self._store.arrays["ease_factor"][self._row, self._col] = value
+
+    @property
+    def due_us(self) -> int | None:
+        return _us_from_epoch(float(self._store.arrays["due_at"][self._row, self._col]))
+
+    @due_us.setter
+    def due_us(self, value: int | None) -> None:
+        self._store.arrays["due_at"][self._row, self._col] = _epoch_from_us(value)
+        self._store.note_due(self._row, self._col)
+
+    @property
+    def due_at(self) -> str | None:
+        return from_epoch(float(self._store.arrays["due_at"][self._row, self._col]))
+
+    @due_at.setter
+    def due_at(self, value: str | None) -> None:
+        self._store.arrays["due_at"][self._row, self._col] = to_epoch(value)
+        self._store.note_due(self._row, self._col)
+
+
+class ConceptView:
+    """``ConceptState``-compatible accessor for one cell of a cohort store."""
+
+    __slots__ = ("_store", "_row", "_col", "reviews")
+
+    def __init__(self, store: CohortStore, row: int, col: int):
+        self._store = store
+        self._row = row
+        self._col = col
+        self.reviews = ReviewView(store, row, col)
+
+    @property
+    def mastery(self) -> float:
+        return float(self._store.arrays["mastery"][self._row, self._col])
+
+    @mastery.setter
+    def mastery(self, value: float) -> None:
+        self._store.arrays["mastery"][self._row, self._col] = value
+
+    @property
+    def updated_us(self) -> int:
+        return _us_from_epoch(float(self._store.arrays["updated_at"][self._row, self._col]))
+
+    @updated_us.setter
+    def updated_us(self, value: int) -> None:
+        self._store.arrays["updated_at"][self._row, self._col] = _epoch_from_us(value)
+
+    @property
+    def updated_at(self) -> str:
+        return from_epoch(float(self._store.arrays["updated_at"][self._row, self._col]))
+
+    @updated_at.setter
+    def updated_at(self, value: str) -> None:
+        self._store.arrays["updated_at"][self._row, self._col] = to_epoch(value)
+
+    def detach(self) -> ConceptState:
+        state = ConceptState(mastery=self.mastery, updated_us=self.updated_us)
+        state.reviews.repetitions = self.reviews.repetitions
+        state.reviews.interval_days = self.reviews.interval_days
+        state.reviews.ease_factor = self.reviews.ease_factor
+        state.reviews.due_us = self.reviews.due_us
+        return state
+
+
+class CohortRow(MutableMapping):
+    """Mapping of concept name to ``ConceptView`` for one student row.
+
+    Used as ``StudentState.concepts`` so the rest of the engine keeps working
+    unchanged. Iteration follows the store's column order.
+    """
+
+    def __init__(self, store: CohortStore, row: int):
+        self.store = store
+        self.row = row
+
+    def __getitem__(self, name: str) -> ConceptView:
+        col = self.store.concept_index.get(name)
+        if col is None or not self.store.arrays["present"][self.row, col]:
+            raise KeyError(name)
+        return ConceptView(self.store, self.row, col)
+
+    def __setitem__(self, name: str, state) -> None:
+        self.store.write_concept(self.row, self.store.column(name), state)
+
+    def __delitem__(self, name: str) -> None:
+        col = self.store.concept_index.get(name)
+        if col is None or not self.store.arrays["present"][self.row, col]:
+            raise KeyError(name)
+        self.store.arrays["present"][self.row, col] = False
+
+    def __contains__(self, name: object) -> bool:
+        col = self.store.concept_index.get(name)
+        return col is not None and bool(self.store.arrays["present"][self.row, col])
+
+    def __iter__(self) -> Iterator[str]:
+        names = self.store.concepts
+        present = self.store.arrays["present"][self.row, : len(names)]
+        for col in np.flatnonzero(present):
+            yield names[col]
+
+    def __len__(self) -> int:
+        n_concepts = len(self.store.concepts)
+        return int(self.store.arrays["present"][self.row, :n_concepts].sum())
+
+    def __deepcopy__(self, memo) -> dict[str, ConceptState]:
+        # Simulations (e.g. ``seven_day_plan``) get a detached plain-dict copy.
+        return {name: self[name].detach() for name in self}
+
+
+class CohortStore:
+    """Dense, memory-mapped student x concept arrays for a whole cohort.
+
+    Layout on disk (one directory)::
+
+        cohort.json            student ids/names, concept names (as of the last compaction)
+        cohort.log             students and concepts added since, one JSON line each
+        <field>.npy            one ``.npy`` memmap per column in MATRIX_FIELDS/ROW_FIELDS
+        .locks/cohort.lock     store lock
+
+    Timestamps are stored as epoch seconds (float64). Capacity grows by doubling,
+    so adding students or concepts only rewrites the arrays occasionally.
+
+    Several handles (and processes) can share a store. Adding a student or
+    concept, or growing the arrays, holds the store lock exclusively after
+    catching up with the log, so every handle agrees on row and column
+    indices. Cell writes happen in place; hold ``synced()`` around them so the
+    arrays cannot be regrown underneath.
+    """
+
+    def __init__(self, root: str | Path):
+        require_numpy()
+        self.root = Path(root)
+        self.students: list[tuple[str, str]] = []
+        self.concepts: list[str] = []
+        self.student_index: dict[str, int] = {}
+        self.concept_index: dict[str, int] = {}
+        self.arrays: dict = {}
+        self._meta_id = None
+        self._log_offset = 0
+        self._due_index: CohortDueIndex | None = None
+        with self.synced():
+            pass
+
+    @classmethod
+    def create(
+        cls,
+        root: str | Path,
+        concepts: Iterable[str] = (),
+        student_capacity: int = 1024,
+        concept_capacity: int = 64,
+    ) -> CohortStore:
+        require_numpy()
+        target = Path(root)
+        target.mkdir(parents=True, exist_ok=True)
+        names = list(dict.fromkeys(concepts))
+        shape = (max(1, student_capacity), max(1, concept_capacity, len(names)))
+        with file_lock(target / _LOCK_FILE):
+            for name, dtype in MATRIX_FIELDS.items():
+                _allocate(target / f"{name}.npy", dtype, shape)
+            for name, dtype in ROW_FIELDS.items():
+                _allocate(target / f"{name}.npy", dtype, shape[:1])
+            (target / _LOG_FILE).unlink(missing_ok=True)
+            atomic_write(target / _META_FILE, json.dumps({"students": [], "concepts": names}))
+            return cls(target)
+
+    @classmethod
+    def open(cls, root: str | Path, concepts: Iterable[str] = ()) -> CohortStore:
+        with file_lock(Path(root) / _LOCK_FILE):
+            if (Path(root) / _META_FILE).exists():
+                return cls(root)
+            return cls.create(root, concepts=concepts)
+
+    @contextmanager
+    def synced(self, exclusive: bool = False) -> Iterator[None]:
+        """Hold the store lock (shared unless ``exclusive``), caught up with other handles."""
+        with file_lock(self.root / _LOCK_FILE, shared=not exclusive):
+            self._refresh()
+            yield
+
+    @property
+    def capacity(self) -> tuple[int, int]:
+        return self.arrays["present"].shape
+
+    def __len__(self) -> int:
+        return len(self.students)
+
+    def __contains__(self, student_id: object) -> bool:
+        return student_id in self.student_index
+
+    def student_ids(self) -> list[str]:
+        with self.synced():
+            return [sid for sid, _ in self.students]
+
+    def row(self, student_id: str) -> int:
+        row = self.student_index.get(student_id)
+        if row is None:
+            with self.synced():  # maybe added through another handle
+                row = self.student_index.get(student_id)
+        if row is None:
+            raise FileNotFoundError(f"Student '{student_id}' is not in the cohort store")
+        return row
+
+    def rows(self, student_ids: Sequence[str] | None = None):
+        """Row indices for ``student_ids`` (all students when ``None``)."""
+        if student_ids is None:
+            return np.arange(len(self.students))
+        return np.fromiter((self.row(sid) for sid in student_ids), dtype=np.intp)
+
+    def columns(self, concepts: Iterable[str]):
+        """Column indices for ``concepts``, adding unseen names to the store."""
+        return np.fromiter((self.column(name) for name in concepts), dtype=np.intp)
+
+    def column(self, concept: str) -> int:
+        col = self.concept_index.get(concept)
+        if col is None:
+            with self.synced(exclusive=True):
+                col = self.concept_index.get(concept)
+                if col is None:
+                    self._ensure_capacity(len(self.students), len(self.concepts) + 1)
+                    self._append({"concept": concept})
+                    col = self.concept_index[concept]
+        return col
+
+    def add_student(
+        self,
+        student_id: str,
+        name: str,
+        forgetting_lambda: float = StudentState.forgetting_lambda,
+        mastery_learning_rate: float = StudentState.mastery_learning_rate,
+    ) -> int:
+        with self.synced(exclusive=True):
+            row = self.student_index.get(student_id)
+            if row is None:
+                self._ensure_capacity(len(self.students) + 1, len(self.concepts))
+            if row is None or self.students[row][1] != name:
+                self._append({"student": [student_id, name]})
+                row = self.student_index[student_id]
+            self._clear_row(row)
+            self.arrays["forgetting_lambda"][row] = forgetting_lambda
+            self.arrays["mastery_learning_rate"][row] = mastery_learning_rate
+        return row
+
+    def write_concept(self, row: int, col: int, state) -> None:
+        arrays = self.arrays
+        arrays["present"][row, col] = True
+        arrays["mastery"][row, col] = state.mastery
+        arrays["updated_at"][row, col] = _epoch_from_us(state.updated_us)
+        arrays["repetitions"][row, col] = state.reviews.repetitions
+        arrays["interval_days"][row, col] = state.reviews.interval_days
+        arrays["ease_factor"][row, col] = state.reviews.ease_factor
+        arrays["due_at"][row, col] = _epoch_from_us(state.reviews.due_us)
+        self.note_due(row, col)
+
+    def due_index(self) -> CohortDueIndex:
+        """Cohort-wide due-time index, built on first use and kept current by writes."""
+        if self._due_index is None:
+            self._due_index = CohortDueIndex(self)
+        return self._due_index
+
+    def note_due(self, rows, cols) -> None:
+        if self._due_index is not None:
+            self._due_index.note(rows, cols)
+
+    def student(self, student_id: str) -> StudentState:
+        """Return a ``StudentState`` whose concepts are a live view into the store."""
+        row = self.row(student_id)
+        return StudentState(
+            student_id=student_id,
+            name=self.students[row][1],
+            forgetting_lambda=float(self.arrays["forgetting_lambda"][row]),
+            mastery_learning_rate=float(self.arrays["mastery_learning_rate"][row]),
+            concepts=CohortRow(self, row),
+        )
+
+    def save_student(self, student: StudentState) -> None:
+        """Write one student's row in place and flush just that row to disk."""
+        with self.synced():
+            concepts = student.concepts
+            if isinstance(concepts, CohortRow) and concepts.store is self:
+                row = concepts.row
+                if self.students[row][1] != student.name:
+                    with self.synced(exclusive=True):
+                        self._append({"student": [student.student_id, student.name]})
+                self.arrays["forgetting_lambda"][row] = student.forgetting_lambda
+                self.arrays["mastery_learning_rate"][row] = student.mastery_learning_rate
+            else:
+                row = self.add_student(
+                    student.student_id,
+                    student.name,
+                    forgetting_lambda=student.forgetting_lambda,
+                    mastery_learning_rate=student.mastery_learning_rate,
+                )
+                for name, state in concepts.items():
+                    self.write_concept(row, self.column(name), state)
+            for array in self.arrays.values():
+                _flush_row(array, row)
+
+    def flush(self) -> None:
+        """Write every column to disk (student and concept names are always current)."""
+        for array in self.arrays.values():
+            array.flush()
+
+    def _refresh(self) -> None:
+        # Caller holds the store lock. A new cohort.json means a compaction: start over.
+        meta_id = fingerprint(self.root / _META_FILE)
+        reopen = meta_id != self._meta_id or not self.arrays
+        if meta_id != self._meta_id:
+            meta = json.loads((self.root / _META_FILE).read_text(encoding="utf-8"))
+            self.students = [tuple(item) for item in meta["students"]]
+            self.concepts = list(meta["concepts"])
+            self.student_index = {sid: row for row, (sid, _) in enumerate(self.students)}
+            self.concept_index = {name: col for col, name in enumerate(self.concepts)}
+            self._meta_id, self._log_offset = meta_id, 0
+            self._due_index = None
+        try:
+            with (self.root / _LOG_FILE).open("rb") as handle:
+                handle.seek(self._log_offset)
+                data = handle.read()
+        except FileNotFoundError:
+            data = b""
+        data = data[: data.rfind(b"\n") + 1]  # ignore a torn last line
+        if data:
+            self._log_offset += len(data)
+            self._due_index = None  # rows or columns it has not seen
+            for line in data.splitlines():
+                reopen |= self._apply(json.loads(line))
+        if reopen:
+            self.arrays = {
+                name: np.lib.format.open_memmap(self.root / f"{name}.npy", mode="r+")
+                for name in (*MATRIX_FIELDS, *ROW_FIELDS)
+            }
+
+    def _apply(self, entry: dict) -> bool:
+        """Apply one log entry; True if the arrays were regrown."""
+        if "student" in entry:
+            sid, name = entry["student"]
+            row = self.student_index.setdefault(sid, len(self.students))
+            if row == len(self.students):
+                self.students.append((sid, name))
+            else:
+                self.students[row] = (sid, name)
+        elif "concept" in entry:
+            if self.concept_index.setdefault(entry["concept"], len(self.concepts)) == len(
+                self.concepts
+            ):
+                self.concepts.append(entry["concept"])
+        return "capacity" in entry
+
+    def _append(self, entry: dict) -> None:
+        # Caller holds the store lock exclusively and has refreshed.
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+        with (self.root / _LOG_FILE).open("ab") as handle:
+            handle.write(line)
+        self._log_offset += len(line)
+        self._apply(entry)
+        if self._log_offset > max(_COMPACT_BYTES, self._meta_id[2]):
+            meta = {"students": [list(item) for item in self.students], "concepts": self.concepts}
+            atomic_write(self.root / _META_FILE, json.dumps(meta))
+            # Log entries are idempotent, so a crash before this truncate only replays them.
+            (self.root / _LOG_FILE).write_bytes(b"")
+            self._meta_id, self._log_offset = fingerprint(self.root / _META_FILE), 0
+
+    def _clear_row(self, row: int) -> None:
+        self.arrays["present"][row] = False
+        self.arrays["due_at"][row] = np.nan
+
+    def _ensure_capacity(self, rows: int, cols: int) -> None:
+        # Caller holds the store lock exclusively, so no handle writes the old files.
+        cap_rows, cap_cols = self.capacity
+        if rows <= cap_rows and cols <= cap_cols:
+            return
+        while cap_rows < rows:
+            cap_rows *= 2
+        while cap_cols < cols:
+            cap_cols *= 2
+        for name in (*MATRIX_FIELDS, *ROW_FIELDS):
+            old = self.arrays[name]
+            shape = (cap_rows, cap_cols) if old.ndim == 2 else (cap_rows,)
+            tmp = self.root / f"{name}.npy.tmp"
+            grown = _allocate(tmp, old.dtype, shape)
+            grown[tuple(slice(0, n) for n in old.shape)] = old
+            grown.flush()
+            del grown
+            old.flush()
+            del old
+            os.replace(tmp, self.root / f"{name}.npy")
+            self.arrays[name] = np.lib.format.open_memmap(self.root / f"{name}.npy", mode="r+")
+        self._append({"capacity": [cap_rows, cap_cols]})
+
+
+class CohortDueIndex:
+    """Due-time index over every (student, concept) cell of a cohort store.
+
+    A sorted snapshot of the due column answers "what is due before T" with a
+    binary search; cells rescheduled after the snapshot go into a small heap.
+    Entries are validated against the live arrays, so superseded snapshot
+    entries are skipped, and the snapshot is rebuilt once the heap grows large.
+    """
+
+    def __init__(self, store: CohortStore):
+        self.store = store
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        present = self.store.arrays["present"][: len(self.store), : len(self.store.concepts)]
+        rows, cols = np.nonzero(present)
+        keys = _due_keys(self.store.arrays["due_at"][rows, cols])
+        order = np.argsort(keys, kind="stable")
+        self._keys, self._rows, self._cols = keys[order], rows[order], cols[order]
+        self._updates: list[tuple[float, int, int]] = []
+
+    def note(self, rows, cols) -> None:
+        rows, cols = np.atleast_1d(rows), np.atleast_1d(cols)
+        keys = _due_keys(self.store.arrays["due_at"][rows, cols])
+        for entry in zip(keys.tolist(), rows.tolist(), cols.tolist(), strict=True):
+            heapq.heappush(self._updates, entry)
+        if len(self._updates) > max(1024, self._keys.size // 4):
+            self.rebuild()
+
+    def due(
+        self, now: datetime | float | None = None, limit: int | None = None
+    ) -> list[tuple[str, str]]:
+        """(student_id, concept) pairs due at ``now``, earliest due first."""
+        bound = float(_as_epoch(now))
+        arrays = self.store.arrays
+        cut = int(np.searchsorted(self._keys, bound, side="right"))
+        keys, rows, cols = self._keys[:cut], self._rows[:cut], self._cols[:cut]
+        live = arrays["present"][rows, cols] & (_due_keys(arrays["due_at"][rows, cols]) == keys)
+        snapshot = zip(keys[live].tolist(), rows[live].tolist(), cols[live].tolist(), strict=True)
+        updates = (
+            (key, row, col)
+            for key, row, col in _walk_heap(self._updates, bound)
+            if arrays["present"][row, col] and _due_keys(arrays["due_at"][row, col]) == key
+        )
+        pairs: list[tuple[str, str]] = []
+        seen: set[tuple[int, int]] = set()
+        for _, row, col in heapq.merge(snapshot, updates):
+            if (row, col) in seen:
+                continue
+            seen.add((row, col))
+            pairs.append((self.store.students[row][0], self.store.concepts[col]))
+            if limit is not None and len(pairs) >= limit:
+                break
+        return pairs
+
+
+def _due_keys(due_at):
+    """Sort keys for the due column: never-scheduled (NaN) cells are due first."""
+    return np.where(np.isnan(due_at), -np.inf, due_at)
+
+
+def _flush_row(array, row: int) -> None:
+    """Flush the pages holding ``array[row]`` instead of the whole memmap."""
+    size = array[row].nbytes if array.ndim == 2 else array.itemsize
+    # The mmap starts at the allocation granule below the data offset.
+    start = array.offset % mmap.ALLOCATIONGRANULARITY + row * size
+    aligned = start - start % mmap.PAGESIZE
+    array.base.flush(aligned, start + size - aligned)
+
+
+def _allocate(path: Path, dtype, shape: tuple[int, ...]):
+    array = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+    if path.stem.startswith("due_at"):
+        array[...] = np.nan
+    return array
+
+
+def _epoch_parts(epoch):
+    """Split epoch seconds into whole seconds and microseconds (int64 arrays).
+
+    Timestamps originate from microsecond-precision datetimes, so rounding the
+    fractional part recovers the exact value ``datetime`` arithmetic works with.
+    """
+    epoch = np.asarray(epoch, dtype=np.float64)
+    seconds = np.floor(epoch)
+    micros = np.rint((epoch - seconds) * 1e6)
+    return seconds.astype(np.int64), micros.astype(np.int64)
+
+
+def _elapsed_days(past, now):
+    """``max((now - past).total_seconds() / 86400, 0)`` on epoch arrays."""
+    past_s, past_us = _epoch_parts(past)
+    now_s, now_us = _epoch_parts(now)
+    delta_us = (now_s - past_s) * 1_000_000 + (now_us - past_us)
+    return np.maximum(delta_us / 1e6 / 86400, 0)
+
+
+def _exp(values, exact: bool):
+    if not exact:
+        return np.exp(values)
+    # numpy's SIMD exp can differ from libm in the last ulp; route through
+    # math.exp so results match StudentState.apply_forgetting bit for bit.
+    flat = values.ravel().tolist()
+    return np.fromiter(map(math.exp, flat), dtype=np.float64, count=len(flat)).reshape(values.shape)
+
+
+def _as_epoch(now: datetime | float | None):
+    if now is None:
+        now = datetime.now(timezone.utc)
+    if isinstance(now, datetime):
+        return epoch_us(now) / 1_000_000  # naive means UTC, as everywhere else
+    return np.asarray(now, dtype=np.float64)
+
+
+def apply_forgetting_batch(
+    store: CohortStore,
+    students: Sequence[str] | None = None,
+    now: datetime | float | None = None,
+    exact: bool = True,
+):
+    """Decay every known concept of ``students`` (default: whole cohort) to ``now``.
+
+    Vectorized equivalent of calling ``StudentState.apply_forgetting`` on each
+    concept. Returns the updated mastery block (rows x concepts).
+    """
+    rows = store.rows(students)
+    n_concepts = len(store.concepts)
+    arrays = store.arrays
+    present = arrays["present"][rows, :n_concepts]
+    mastery = arrays["mastery"][rows, :n_concepts]
+    updated = arrays["updated_at"][rows, :n_concepts]
+    lam = arrays["forgetting_lambda"][rows][:, None]
+    now_epoch = _as_epoch(now)
+
+    delta_days = _elapsed_days(np.where(present, updated, now_epoch), now_epoch)
+    decayed = np.clip(mastery * _exp(-lam * delta_days, exact), 0.0, 1.0)
+    mastery = np.where(present, decayed, mastery)
+    arrays["mastery"][rows, :n_concepts] = mastery
+    arrays["updated_at"][rows, :n_concepts] = np.where(present, now_epoch, updated)
+    return mastery
+
+
+def update_mastery_batch(
+    store: CohortStore,
+    students: Sequence[str],
+    concepts: Sequence[str],
+    correct,
+    confidence,
+    now: datetime | float | Sequence[float] | None = None,
+    exact: bool = True,
+):
+    """Apply a batch of quiz outcomes, matching ``StudentState.update_mastery``.
+
+    ``now`` may be a single timestamp or one epoch value per event. Events that
+    hit the same student/concept pair are applied in input order. Concepts the
+    student has not seen yet start from ``ConceptState`` defaults at the event
+    time. Returns the resulting mastery per event.
+    """
+    rows = store.rows(students)
+    cols = store.columns(concepts)
+    signal = np.where(np.asarray(correct, dtype=bool), 1.0, -1.0) * np.clip(
+        np.asarray(confidence, dtype=np.float64), 0.0, 1.0
+    )
+    signal = np.broadcast_to(signal, rows.shape)
+    now_epoch = np.broadcast_to(_as_epoch(now), rows.shape)
+    result = np.empty(rows.shape, dtype=np.float64)
+    arrays = store.arrays
+
+    for batch in _unique_pair_rounds(rows, cols):
+        r, c, t = rows[batch], cols[batch], now_epoch[batch]
+        _init_missing(store, r, c, t)
+        lam = arrays["forgetting_lambda"][r]
+        rate = arrays["mastery_learning_rate"][r]
+        delta_days = _elapsed_days(arrays["updated_at"][r, c], t)
+        decayed = np.clip(arrays["mastery"][r, c] * _exp(-lam * delta_days, exact), 0.0, 1.0)
+        mastery = np.clip(decayed + rate * signal[batch], 0.0, 1.0)
+        arrays["mastery"][r, c] = mastery
+        arrays["updated_at"][r, c] = t
+        result[batch] = mastery
+    return result
+
+
+def sm2_update_many(
+    store: CohortStore,
+    students: Sequence[str],
+    concepts: Sequence[str],
+    quality,
+    now: datetime | float | Sequence[float] | None = None,
+    config: SpacedRepetitionConfig | None = None,
+):
+    """Apply a batch of review outcomes, matching ``scheduler.sm2_update``.
+
+    Updates repetitions, interval, ease and due date for every event in one
+    pass per round of distinct student/concept pairs; repeated events for the
+    same pair are applied in input order. Returns the new ``due_at`` (epoch
+    seconds) per event.
+    """
+    cfg = config or SpacedRepetitionConfig()
+    rows = store.rows(students)
+    cols = store.columns(concepts)
+    quality = np.broadcast_to(np.clip(np.asarray(quality, dtype=np.int64), 0, 5), rows.shape)
+    now_epoch = np.broadcast_to(_as_epoch(now), rows.shape)
+    result = np.empty(rows.shape, dtype=np.float64)
+    arrays = store.arrays
+    initial = cfg.initial_interval_days
+    second = max(2, round(cfg.initial_interval_days * 6))
+
+    for batch in _unique_pair_rounds(rows, cols):
+        r, c, t, q = rows[batch], cols[batch], now_epoch[batch], quality[batch]
+        _init_missing(store, r, c, t)
+        reps = arrays["repetitions"][r, c].astype(np.int64)
+        interval = arrays["interval_days"][r, c].astype(np.int64)
+        ease = arrays["ease_factor"][r, c]
+
+        grown = np.maximum(1, np.rint(interval * ease).astype(np.int64))
+        passed_interval = np.where(reps == 0, initial, np.where(reps == 1, second, grown))
+        passed = q >= 3
+        interval = np.where(passed, passed_interval, initial)
+        reps = np.where(passed, reps + 1, 0)
+
+        miss = 5 - q
+        ease = np.maximum(cfg.min_ease, ease + (0.1 - miss * (0.08 + miss * 0.02)))
+        bonus = np.rint(interval * cfg.easy_bonus).astype(np.int64)
+        interval = np.where(q == 5, np.maximum(interval, bonus), interval)
+
+        now_s, now_us = _epoch_parts(t)
+        due = ((now_s + interval * 86400) * 1_000_000 + now_us) / 1e6
+        arrays["repetitions"][r, c] = reps
+        arrays["interval_days"][r, c] = interval
+        arrays["ease_factor"][r, c] = ease
+        arrays["due_at"][r, c] = due
+        arrays["updated_at"][r, c] = t
+        store.note_due(r, c)
+        result[batch] = due
+    return result
+
+
+# Action codes in ``CohortPlan.action``, mirroring ``planner.next_action``.
+PLAN_ACTIONS: tuple[tuple[str, str], ...] = (
+    ("review", "due_or_low_mastery"),
+    ("learn", "prerequisites_satisfied"),
+    ("review", "no_eligible_new_concepts"),
+)
+
+
+@dataclass
+class CohortPlan:
+    """One planned action per student as two small integer columns.
+
+    ``action[i]`` indexes :data:`PLAN_ACTIONS` and ``concept[i]`` indexes
+    ``concepts`` for ``student_ids[i]``.
+    """
+
+    student_ids: list[str]
+    concepts: list[str]
+    action: np.ndarray
+    concept: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.student_ids)
+
+    def __iter__(self) -> Iterator[tuple[str, PlannedAction]]:
+        for student_id, code, col in zip(
+            self.student_ids, self.action.tolist(), self.concept.tolist(), strict=True
+        ):
+            action, reason = PLAN_ACTIONS[code]
+            yield student_id, PlannedAction(action, self.concepts[col], reason)
+
+    def to_csv(self, path: str | Path) -> None:
+        with Path(path).open("w", encoding="utf-8", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["student_id", "action", "concept", "reason"])
+            for student_id, item in self:
+                writer.writerow([student_id, item.action, item.concept, item.reason])
+
+    def to_npz(self, path: str | Path) -> None:
+        np.savez_compressed(
+            path,
+            student_ids=np.array(self.student_ids, dtype=str),
+            concepts=np.array(self.concepts, dtype=str),
+            action=self.action,
+            concept=self.concept,
+        )
+
+    @classmethod
+    def load_npz(cls, path: str | Path) -> CohortPlan:
+        with np.load(path) as data:
+            return cls(
+                student_ids=data["student_ids"].tolist(),
+                concepts=data["concepts"].tolist(),
+                action=data["action"],
+                concept=data["concept"],
+            )
+
+
+def plan_cohort(
+    graph: ConceptGraph,
+    students: CohortStore | Sequence[StudentState],
+    now: datetime | None = None,
+    review_threshold: float = 0.6,
+    mastery_threshold: float = 0.7,
+    chunk_size: int = 1024,
+) -> CohortPlan:
+    """``next_action`` for every student at once.
+
+    Works on student x concept matrices (the store's own arrays for a
+    :class:`CohortStore`): the review pick is a masked row-wise argmin over
+    mastery, and prerequisite checks OR-reduce the unmet flags gathered along
+    the compiled graph's CSR adjacency. Rows are processed in chunks of
+    ``chunk_size`` to bound the temporary prerequisite matrix.
+    """
+    require_numpy()
+    if isinstance(students, CohortStore):
+        n_students, vocab = len(students), list(students.concepts)
+        arrays, n_cols = students.arrays, len(vocab)
+        student_ids = students.student_ids()
+
+        def block(lo: int, hi: int):
+            present = arrays["present"][lo:hi, :n_cols]
+            ordinal = np.broadcast_to(np.arange(n_cols), present.shape)  # CohortRow order
+            mastery, due_at = arrays["mastery"][lo:hi, :n_cols], arrays["due_at"][lo:hi, :n_cols]
+            return present, mastery, due_at, ordinal
+    else:
+        vocab, n_students = _vocabulary(students), len(students)
+        student_ids = [student.student_id for student in students]
+
+        def block(lo: int, hi: int):
+            return _student_matrices(students[lo:hi], vocab)
+
+    compiled = graph.compiled
+    vocab_index = {name: col for col, name in enumerate(vocab)}
+    for name in compiled.names:
+        if name not in vocab_index:
+            vocab_index[name] = len(vocab)
+            vocab.append(name)
+    node_cols = np.fromiter((vocab_index[n] for n in compiled.names), dtype=np.intp)
+    indptr = np.frombuffer(compiled.indptr, dtype=np.int32).astype(np.intp)
+    indices = np.frombuffer(compiled.indices, dtype=np.int32).astype(np.intp)
+    has_reqs = np.flatnonzero(indptr[1:] > indptr[:-1])
+    fallback = vocab_index[min(graph.nodes)] if graph.nodes else 0
+    bound = _as_epoch(now)
+
+    action = np.full(n_students, 2, dtype=np.int8)
+    concept = np.full(n_students, fallback, dtype=np.int32)
+    for lo in range(0, n_students, chunk_size):
+        hi = min(lo + chunk_size, n_students)
+        present, mastery, due_at, ordinal = block(lo, hi)
+        width = present.shape[1]
+
+        # Review: lowest mastery among due or low-mastery concepts, ties by ordinal.
+        review = present & ((mastery < review_threshold) | ~(_due_keys(due_at) > bound))
+        has_review = review.any(axis=1)
+        pick = 0
+        if width:
+            masked = np.where(review, mastery, np.inf)
+            tied = review & (masked == masked.min(axis=1, keepdims=True))
+            pick = np.argmin(np.where(tied, ordinal, np.iinfo(np.int64).max), axis=1)
+
+        # Learn: first concept in graph order that is unstarted with every prerequisite met.
+        known = node_cols < width
+        cols = np.where(known, node_cols, 0)
+        node_present = present[:, cols] & known
+        met = node_present & (mastery[:, cols] >= mastery_threshold)
+        # Segments of concepts without prerequisites are empty, so reducing at the
+        # remaining segment starts still covers exactly each concept's own slice.
+        blocked = np.zeros((hi - lo, compiled.node_count), dtype=bool)
+        if indices.size:
+            starts = indptr[has_reqs]
+            blocked[:, has_reqs] = np.logical_or.reduceat(~met[:, indices], starts, axis=1)
+        eligible = ~node_present[:, : compiled.node_count] & ~blocked
+        has_new = eligible.any(axis=1)
+        first = (
+            node_cols[: compiled.node_count][np.argmax(eligible, axis=1)] if eligible.size else 0
+        )
+
+        rows = slice(lo, hi)
+        action[rows] = np.where(has_review, 0, np.where(has_new, 1, 2))
+        concept[rows] = np.where(has_review, pick, np.where(has_new, first, fallback))
+    return CohortPlan(student_ids, vocab, action, concept)
+
+
+def _vocabulary(students: Sequence[StudentState]) -> list[str]:
+    vocab: dict[str, None] = {}
+    for student in students:
+        vocab.update(dict.fromkeys(student.concepts))
+    return list(vocab)
+
+
+def _student_matrices(students: Sequence[StudentState], vocab: list[str]):
+    index = {name: col for col, name in enumerate(vocab)}
+    shape = (len(students), len(vocab))
+    present = np.zeros(shape, dtype=bool)
+    mastery = np.zeros(shape)
+    due_at = np.full(shape, np.nan)
+    ordinal = np.zeros(shape, dtype=np.int64)
+    for row, student in enumerate(students):
+        for position, (name, state) in enumerate(student.concepts.items()):
+            col = index[name]
+            present[row, col] = True
+            mastery[row, col] = state.mastery
+            due_at[row, col] = _epoch_from_us(state.reviews.due_us)
+            ordinal[row, col] = position
+    return present, mastery, due_at, ordinal
+
+
+def _init_missing(store: CohortStore, r, c, t) -> None:
+    """Give cells not yet present ``ConceptState`` defaults stamped at ``t``."""
+    arrays = store.arrays
+    new = ~arrays["present"][r, c]
+    if not new.any():
+        return
+    r, c = r[new], c[new]
+    default = ConceptState()
+    arrays["present"][r, c] = True
+    arrays["mastery"][r, c] = default.mastery
+    arrays["updated_at"][r, c] = t[new]
+    arrays["repetitions"][r, c] = default.reviews.repetitions
+    arrays["interval_days"][r, c] = default.reviews.interval_days
+    arrays["ease_factor"][r, c] = default.reviews.ease_factor
+    arrays["due_at"][r, c] = np.nan
+    store.note_due(r, c)
+
+
+def _unique_pair_rounds(rows, cols) -> Iterator:
+    """Yield index batches in which each (row, col) pair occurs at most once.
+
+    Round ``k`` holds the ``k``-th occurrence of every pair, so repeated events
+    for one cell are applied sequentially in their original order.
+    """
+    if rows.size == 0:
+        return
+    keys = rows.astype(np.int64) * (int(cols.max()) + 1) + cols
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = np.r_[0, np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1]
+    group_start = np.repeat(starts, np.diff(np.r_[starts, sorted_keys.size]))
+    occurrence = np.empty_like(order)
+    occurrence[order] = np.arange(order.size) - group_start
+    for k in range(int(occurrence.max()) + 1):
+        yield np.flatnonzero(occurrence == k)
@@ -23,6 +23,14 @@ except ModuleNotFoundError:  # pragma: no cover - offline fallback
             def __init__(self, help: str | None = None):
                 self.help = help
                 self._commands: dict[str, object] = {}
+                self._callback = None
+
+            def callback(self):
+                def decorator(func):
+                    self._callback = func
+                    return func
+
+                return decorator
 
             def command(self, name: str):
                 def decorator(func):
@@ -32,15 +40,20 @@ except ModuleNotFoundError:  # pragma: no cover - offline fallback
                 return decorator
 
             def _convert(self, value: str, annotation):
-                if annotation is bool:
+                # Annotations are strings under ``from __future__ import annotations``.
+                if not isinstance(value, str):
+                    return value
+                if annotation in (bool, "bool"):
                     return value.lower() in {"1", "true", "yes", "on"}
-                if annotation is int:
+                if annotation in (int, "int", "int | None"):
                     return int(value)
-                if annotation is float:
+                if annotation in (float, "float"):
                     return float(value)
                 return value
 
             def _run(self, argv: list[str]) -> int:
+                if self._callback is not None:
+                    argv = self._run_callback(argv)
                 if not argv:
                     return 0
                 cmd = argv[0]
@@ -50,8 +63,16 @@ except ModuleNotFoundError:  # pragma: no cover - offline fallback
                 sig = inspect.signature(func)
                 params = list(sig.parameters.values())
                 parsed = {}
-                positionals = [a for a in argv[1:] if not a.startswith("--")]
+                positionals = []
                 options = argv[1:]
+                names = {p.name for p in params}
+                flags = {p.name for p in params if p.annotation in (bool, "bool")}
+                aliases = {
+                    decl.lstrip("-").replace("-", "_"): p.name
+                    for p in params
+                    if isinstance(p.default, _OptionInfo)
+                    for decl in p.default.param_decls
+                }
 
                 pos_idx = 0
                 i = 0
@@ -59,17 +80,25 @@ except ModuleNotFoundError:  # pragma: no cover - offline fallback
                     token = options[i]
                     if token.startswith("--"):
                         name = token.lstrip("-").replace("-", "_")
+                        name = aliases.get(name, name)
+                        if name.removeprefix("no_") not in names:
+                            self._no_such_option(token)
                         if name.startswith("no_"):
                             parsed[name[3:]] = False
                             i += 1
                             continue
-                        if i + 1 < len(options) and not options[i + 1].startswith("--"):
+                        if (
+                            name not in flags
+                            and i + 1 < len(options)
+                            and not options[i + 1].startswith("--")
+                        ):
                             parsed[name] = options[i + 1]
                             i += 2
                         else:
                             parsed[name] = True
                             i += 1
                     else:
+                        positionals.append(token)
                         i += 1
 
                 for p in params:
@@ -92,6 +121,29 @@ except ModuleNotFoundError:  # pragma: no cover - offline fallback
                 func(**kwargs)
                 return 0
 
+            def _run_callback(self, argv: list[str]) -> list[str]:
+                # Global options come before the command name.
+                params = inspect.signature(self._callback).parameters
+                kwargs = {
+                    p.name: p.default.default if isinstance(p.default, _OptionInfo) else p.default
+                    for p in params.values()
+                }
+                while argv and argv[0].startswith("--"):
+                    name = argv[0].lstrip("-").replace("-", "_")
+                    if name not in params:
+                        self._no_such_option(argv[0])
+                    if params[name].annotation in (bool, "bool"):
+                        kwargs[name], argv = True, argv[1:]
+                    else:
+                        kwargs[name], argv = argv[1], argv[2:]
+                self._callback(**kwargs)
+                return argv
+
+            @staticmethod
+            def _no_such_option(token: str) -> None:
+                print(f"Error: No such option: {token}")
+                raise SystemExit(2)
+
             def __call__(self):
                 import sys
 
@@ -114,7 +166,8 @@ except ModuleNotFoundError:  # pragma: no cover - offline fallback
                     code = app._run(args)
                 except SystemExit as exc:
                     code = int(exc.code)
-            return SimpleNamespace(exit_code=code, stdout=buffer.getvalue())
+            output = buffer.getvalue()
+            return SimpleNamespace(exit_code=code, stdout=output, output=output)
 
     typer = _TyperFallback()
     CliRunner = _CliRunnerFallback
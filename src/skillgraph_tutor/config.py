@@ -4,11 +4,6 @@ from pathlib import Path
 
 from .compat import BaseModel, Field
 
-try:
-    import tomllib
-except ModuleNotFoundError:  # pragma: no cover
-    import tomli as tomllib
-
 
 class ModelConfig(BaseModel):
     provider: str = Field(default="mock", description="mock|openai")
@@ -32,8 +27,40 @@ class PolicyConfig(BaseModel):
     mastery_learning_rate: float = 0.18
 
 
+class PlannerConfig(BaseModel):
+    actions_per_day: int = 3
+    mastery_threshold: float = 0.7
+    beam_width: int = 8
+    branching: int = 4
+    expected_confidence: float = 0.8
+    overdue_penalty: float = 0.1
+
+
 class LoggingConfig(BaseModel):
-    trace_path: str = "artifacts/traces.jsonl"
+    trace_path: str = Field(default="artifacts/traces.jsonl", description="empty disables tracing")
+    flush_events: int = 256
+    flush_seconds: float = 1.0
+    max_bytes: int = Field(default=0, description="rotate the trace file past this size; 0 never")
+    backups: int = 3
+    compress: bool = Field(default=False, description="gzip rotated trace files")
+    profile_path: str = Field(default="artifacts/profile.jsonl", description="--profile reports")
+
+
+class StorageConfig(BaseModel):
+    backend: str = Field(default="json", description="json|binary|cohort|eventlog|sqlite")
+    compact_after_events: int = 200
+    shard_levels: int = Field(default=0, description="hashed directory levels for json|binary")
+    shard_fanout: int = 256
+    fsync_writes: bool = Field(default=True, description="fsync json|binary files before renaming")
+
+
+class ServiceConfig(BaseModel):
+    host: str = "127.0.0.1"
+    port: int = 8765
+    unix_socket: str = Field(default="", description="listen on this socket path instead of TCP")
+    flush_interval_seconds: float = 2.0
+    max_hot_students: int = 10000
+    journal_fsync: bool = True
 
 
 class SkillGraphConfig(BaseModel):
@@ -43,11 +70,19 @@ class SkillGraphConfig(BaseModel):
     forgetting: ForgettingConfig = ForgettingConfig()
     spaced_repetition: SpacedRepetitionConfig = SpacedRepetitionConfig()
     policy: PolicyConfig = PolicyConfig()
+    planner: PlannerConfig = PlannerConfig()
     logging: LoggingConfig = LoggingConfig()
+    storage: StorageConfig = StorageConfig()
+    service: ServiceConfig = ServiceConfig()
 
     @classmethod
     def load(cls, path: str | Path | None = None) -> SkillGraphConfig:
         if path is None:
             return cls()
+        try:
+            import tomllib
+        except ModuleNotFoundError:  # pragma: no cover
+            import tomli as tomllib
+
         raw = tomllib.loads(Path(path).read_text(encoding="utf-8"))
         return cls.model_validate(raw)
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import copy
 import json
 from pathlib import Path
 
@@ -10,7 +9,7 @@ from .tutors import DirectAnswerTutor, SocraticTutor
 
 
 def _simulate_pre_post_gain(student: StudentState, concept: str) -> float:
-    sim = copy.deepcopy(student)
+    sim = student.simulate()
     pre = sim.concept(concept).mastery
     post = sim.update_mastery(concept, correct=True, confidence=0.9)
     return round(post - pre, 4)
@@ -37,7 +36,7 @@ def evaluate(graph, student) -> dict:
     return metrics
 
 
-def write_evaluation(out_dir: str | Path, graph, student) -> None:
+def write_evaluation(out_dir: str | Path, graph, student) -> dict:
     metrics = evaluate(graph, student)
     root = Path(out_dir)
     root.mkdir(parents=True, exist_ok=True)
@@ -45,3 +44,4 @@ def write_evaluation(out_dir: str | Path, graph, student) -> None:
     lines = ["# Evaluation", "", "## Metrics"]
     lines.extend(f"- {k}: {v}" for k, v in metrics.items())
     (root / "eval_report.md").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return metrics
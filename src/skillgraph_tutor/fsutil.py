@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover - Windows: locking is a no-op
+    fcntl = None
+
+_held = threading.local()
+
+
+def atomic_write(path: str | Path, data: str | bytes, fsync: bool = True) -> None:
+    """Replace ``path`` with ``data`` so readers see the old or new file, never a torn one.
+
+    Writes a uniquely named temp file in the same directory, then renames it
+    over ``path``; concurrent writers each rename a complete file.
+    """
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = _temp_file(target)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data.encode("utf-8") if isinstance(data, str) else data)
+            if fsync:
+                handle.flush()
+                os.fsync(handle.fileno())
+        os.replace(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _temp_file(target: Path) -> tuple[int, Path]:
+    # ``tempfile.mkstemp`` without importing tempfile (and shutil, bz2, lzma) on every CLI start.
+    while True:
+        tmp = target.with_name(f".{target.name}.{os.urandom(6).hex()}.tmp")
+        try:
+            return os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), tmp
+        except FileExistsError:
+            continue
+
+
+@contextmanager
+def file_lock(path: str | Path, shared: bool = False) -> Iterator[None]:
+    """Hold an advisory lock on ``path`` (created if missing), exclusive unless ``shared``.
+
+    Re-entrant within a thread, so a locked read-modify-write can call code
+    that takes the same lock again. Asking for an exclusive lock while holding
+    a shared one upgrades it for the inner block; the upgrade is not atomic, so
+    re-read shared state after it.
+    """
+    lock = os.path.abspath(path)
+    held: dict[str, list] = _held.__dict__.setdefault("locks", {})  # path -> [fd, shared]
+    entry = held.get(lock)
+    if entry is not None:
+        if shared or not entry[1] or fcntl is None:
+            yield
+            return
+        fcntl.flock(entry[0], fcntl.LOCK_EX)
+        entry[1] = False
+        try:
+            yield
+        finally:
+            fcntl.flock(entry[0], fcntl.LOCK_SH)
+            entry[1] = True
+        return
+    Path(lock).parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        held[lock] = [fd, shared]
+        yield
+    finally:
+        held.pop(lock, None)
+        os.close(fd)  # closing the descriptor releases the lock
+
+
+def fingerprint(path: str | Path) -> tuple[int, int, int] | None:
+    """Identity of the file currently at ``path`` (inode, mtime, size), or None if absent.
+
+    Every ``atomic_write`` creates a new inode, so a changed fingerprint means
+    the file was rewritten.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
@@ -2,9 +2,15 @@ from __future__ import annotations
 
 import json
 import re
+import time
+from array import array
+from collections import deque
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from pathlib import Path
 
+from .fsutil import atomic_write
+
 
 @dataclass
 class ConceptNode:
@@ -12,9 +18,108 @@ class ConceptNode:
     requires: list[str] = field(default_factory=list)
 
 
+@dataclass
+class CompiledGraph:
+    """Integer-id form of a ``ConceptGraph`` for fast planner queries.
+
+    Ids ``0..node_count-1`` are graph nodes in insertion order; prerequisites
+    that name no node get ids after that so they still resolve by name.
+    Prerequisites of node ``i`` are ``indices[indptr[i]:indptr[i + 1]]`` and
+    dependents use the same CSR layout in ``dep_indptr``/``dep_indices``.
+    """
+
+    names: list[str]
+    ids: dict[str, int]
+    node_count: int
+    indptr: array
+    indices: array
+    dep_indptr: array
+    dep_indices: array
+    topo_order: array
+
+    def prerequisites(self, node_id: int) -> array:
+        return self.indices[self.indptr[node_id] : self.indptr[node_id + 1]]
+
+    def dependents(self, node_id: int) -> array:
+        return self.dep_indices[self.dep_indptr[node_id] : self.dep_indptr[node_id + 1]]
+
+
+def compile_graph(graph: ConceptGraph) -> CompiledGraph:
+    """Intern names, build CSR adjacency and a topological order.
+
+    Raises ``ValueError`` naming the concepts involved if prerequisites form a cycle.
+    """
+    names = list(graph.nodes)
+    ids = {name: idx for idx, name in enumerate(names)}
+    node_count = len(names)
+    indptr = array("i", [0])
+    indices = array("i")
+    for node in graph.nodes.values():
+        for req in dict.fromkeys(node.requires):
+            if req not in ids:
+                ids[req] = len(names)
+                names.append(req)
+            indices.append(ids[req])
+        indptr.append(len(indices))
+
+    dep_lists: list[list[int]] = [[] for _ in range(len(names))]
+    for node_id in range(node_count):
+        for req_id in indices[indptr[node_id] : indptr[node_id + 1]]:
+            dep_lists[req_id].append(node_id)
+    dep_indptr = array("i", [0])
+    dep_indices = array("i")
+    for deps in dep_lists:
+        dep_indices.extend(deps)
+        dep_indptr.append(len(dep_indices))
+
+    # Kahn's algorithm over graph nodes; unknown prerequisites have no edges in.
+    pending = [indptr[idx + 1] - indptr[idx] for idx in range(node_count)]
+    pending.extend([0] * (len(names) - node_count))
+    ready = deque(idx for idx in range(len(names)) if pending[idx] == 0)
+    order = array("i")
+    while ready:
+        current = ready.popleft()
+        if current < node_count:
+            order.append(current)
+        for dep in dep_indices[dep_indptr[current] : dep_indptr[current + 1]]:
+            pending[dep] -= 1
+            if pending[dep] == 0:
+                ready.append(dep)
+    if len(order) != node_count:
+        stuck = [names[idx] for idx in range(node_count) if pending[idx] > 0]
+        raise ValueError(f"Prerequisite cycle detected among concepts: {', '.join(stuck)}")
+
+    return CompiledGraph(
+        names=names,
+        ids=ids,
+        node_count=node_count,
+        indptr=indptr,
+        indices=indices,
+        dep_indptr=dep_indptr,
+        dep_indices=dep_indices,
+        topo_order=order,
+    )
+
+
 @dataclass
 class ConceptGraph:
     nodes: dict[str, ConceptNode]
+    _compiled: CompiledGraph | None = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def compiled(self) -> CompiledGraph:
+        """Compiled form, built on first use; call ``compile()`` after editing ``nodes``."""
+        if self._compiled is None:
+            self.compile()
+        return self._compiled
+
+    def compile(self) -> CompiledGraph:
+        self._compiled = compile_graph(self)
+        return self._compiled
+
+    def topological_order(self) -> list[str]:
+        compiled = self.compiled
+        return [compiled.names[idx] for idx in compiled.topo_order]
 
     def to_dict(self) -> dict:
         return {
@@ -34,44 +139,179 @@ class ConceptGraph:
         return "\n".join(lines)
 
     def save_json(self, path: str | Path) -> None:
-        output = Path(path)
-        output.parent.mkdir(parents=True, exist_ok=True)
-        output.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        atomic_write(path, json.dumps(self.to_dict(), indent=2))
 
 
 def slug(text: str) -> str:
     return re.sub(r"[^a-zA-Z0-9]+", "_", text).strip("_")
 
 
+@dataclass
+class SyllabusReport:
+    files: int = 0
+    lines: int = 0
+    unknown: dict[str, list[str]] = field(default_factory=dict)  # prerequisite -> concepts
+    cycles: list[list[str]] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def lines_per_sec(self) -> float:
+        return self.lines / self.seconds if self.seconds else 0.0
+
+
+class SyllabusParser:
+    """Builds a ``ConceptGraph`` from markdown fed one stream of lines at a time.
+
+    ``## ``/``### `` headings are concepts. A ``requires:`` line lists a
+    concept's prerequisites, which may be defined in any stream; without one a
+    concept requires the heading before it in the same stream. Only the graph
+    and the heading being read are kept, so memory does not grow with the text.
+    """
+
+    def __init__(self):
+        self.nodes: dict[str, ConceptNode] = {}
+        self.files = 0
+        self.lines = 0
+        self._explicit: set[str] = set()
+
+    def feed(self, lines: Iterable[str]) -> None:
+        """Parse one file's lines (a file object works)."""
+        current: str | None = None
+        previous: str | None = None
+        requires: list[str] | None = None
+        count = 0
+        for count, raw_line in enumerate(lines, 1):  # noqa: B007 - read after the loop
+            line = raw_line.strip()
+            if line.startswith(("## ", "### ")):
+                self._close(current, requires, previous)
+                previous, current, requires = current, line.split(" ", 1)[1].strip(), None
+            elif current and line[:9].lower() == "requires:":
+                requires = [item.strip() for item in line[9:].split(",") if item.strip()]
+        self._close(current, requires, previous)
+        self.files += 1
+        self.lines += count
+
+    def _close(self, name: str | None, requires: list[str] | None, previous: str | None) -> None:
+        # A repeated heading keeps the last explicit ``requires:`` seen for it.
+        if name is None:
+            return
+        if requires is not None:
+            self.nodes[name] = ConceptNode(name=name, requires=requires)
+            self._explicit.add(name)
+        elif name not in self._explicit:
+            self.nodes[name] = ConceptNode(
+                name=name, requires=[] if previous is None else [previous]
+            )
+
+    def graph(self) -> ConceptGraph:
+        return ConceptGraph(nodes=self.nodes)
+
+
 def parse_syllabus_markdown(markdown: str) -> ConceptGraph:
-    headings: list[str] = []
-    explicit_requires: dict[str, list[str]] = {}
-    current: str | None = None
-
-    for raw_line in markdown.splitlines():
-        line = raw_line.strip()
-        if line.startswith("## ") or line.startswith("### "):
-            current = line.split(" ", 1)[1].strip()
-            headings.append(current)
-        elif line.lower().startswith("requires:") and current:
-            reqs = [item.strip() for item in line.split(":", 1)[1].split(",") if item.strip()]
-            explicit_requires[current] = reqs
-
-    nodes: dict[str, ConceptNode] = {}
-    for idx, heading in enumerate(headings):
-        if heading in explicit_requires:
-            reqs = explicit_requires[heading]
-        else:
-            reqs = [headings[idx - 1]] if idx > 0 else []
-        nodes[heading] = ConceptNode(name=heading, requires=reqs)
-
-    return ConceptGraph(nodes=nodes)
-
-
-def load_graph(path: str | Path) -> ConceptGraph:
-    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    parser = SyllabusParser()
+    parser.feed(markdown.splitlines())
+    return parser.graph()
+
+
+def syllabus_files(source: str | Path) -> list[Path]:
+    """Markdown files named by ``source``: a file, a directory (searched recursively) or a glob."""
+    path = Path(source)
+    if path.is_dir():
+        return sorted(path.rglob("*.md"))
+    if path.exists():
+        return [path]
+    import glob
+
+    return sorted(Path(match) for match in glob.glob(str(source), recursive=True))
+
+
+def parse_syllabus_files(paths: Iterable[str | Path]) -> tuple[ConceptGraph, SyllabusReport]:
+    """Stream every file into one graph and report unknown prerequisites and cycles.
+
+    The graph is compiled unless its prerequisites form a cycle.
+    """
+    start = time.perf_counter()
+    parser = SyllabusParser()
+    for path in paths:
+        with open(path, encoding="utf-8") as handle:
+            parser.feed(handle)
+    graph = parser.graph()
+    report = SyllabusReport(files=parser.files, lines=parser.lines)
+    for node in graph.nodes.values():
+        for req in node.requires:
+            if req not in graph.nodes:
+                report.unknown.setdefault(req, []).append(node.name)
+    try:
+        graph.compile()
+    except ValueError:
+        report.cycles = find_cycles(graph)
+    report.seconds = time.perf_counter() - start
+    return graph, report
+
+
+def find_cycles(graph: ConceptGraph) -> list[list[str]]:
+    """Concepts on prerequisite cycles, one list per strongly connected component.
+
+    Concepts that merely depend on a cycle are not listed. Iterative Tarjan, so
+    long prerequisite chains do not hit the recursion limit.
+    """
+    order = {name: idx for idx, name in enumerate(graph.nodes)}
+    edges = {
+        name: [req for req in dict.fromkeys(node.requires) if req in order]
+        for name, node in graph.nodes.items()
+    }
+    index: dict[str, int] = {}
+    low: dict[str, int] = {}
+    stack: list[str] = []
+    on_stack: set[str] = set()
+    cycles = []
+    for root in graph.nodes:
+        if root in index:
+            continue
+        work = [(root, 0)]
+        while work:
+            name, pos = work.pop()
+            if pos == 0:
+                index[name] = low[name] = len(index)
+                stack.append(name)
+                on_stack.add(name)
+            reqs = edges[name]
+            if pos < len(reqs):
+                work.append((name, pos + 1))
+                req = reqs[pos]
+                if req not in index:
+                    work.append((req, 0))
+                elif req in on_stack:
+                    low[name] = min(low[name], index[req])
+                continue
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[name])
+            if low[name] == index[name]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == name:
+                        break
+                if len(component) > 1 or name in edges[name]:
+                    cycles.append(sorted(component, key=order.__getitem__))
+    return sorted(cycles, key=lambda cycle: order[cycle[0]])
+
+
+def load_graph(path: str | Path, compile: bool = True) -> ConceptGraph:
+    return graph_from_dict(json.loads(Path(path).read_text(encoding="utf-8")), compile)
+
+
+def graph_from_dict(data: dict, compile: bool = True) -> ConceptGraph:
+    """Graph from its ``to_dict`` form, compiled unless ``compile`` is False (e.g. to
+    inspect a saved graph that has a cycle)."""
     nodes = {
         item["name"]: ConceptNode(name=item["name"], requires=item.get("requires", []))
         for item in data["nodes"]
     }
-    return ConceptGraph(nodes)
+    graph = ConceptGraph(nodes)
+    if compile:
+        graph.compile()
+    return graph
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import heapq
+import math
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+
+from .config import PlannerConfig, SpacedRepetitionConfig
+from .graph import ConceptGraph
+from .planner import PlannedAction, learnable_frontier
+from .scheduler import review_index, sm2_update
+from .student import ConceptState, StudentState, epoch_us
+
+_HORIZON = re.compile(r"(\d+)\s*([dw]?)")
+
+
+def parse_horizon(text: str) -> int:
+    """Number of days in a horizon such as ``7d``, ``30d``, ``2w`` or ``90``."""
+    match = _HORIZON.fullmatch(str(text).strip().lower())
+    if match is None or int(match.group(1)) < 1:
+        raise ValueError(f"Invalid horizon '{text}' (expected e.g. 7d, 30d, 2w)")
+    days = int(match.group(1))
+    return days * 7 if match.group(2) == "w" else days
+
+
+@dataclass
+class _Node:
+    student: StudentState  # simulation holding this plan's changes
+    score: float  # summed value change at the horizon end vs. doing nothing
+    signature: int  # order-independent hash of the changed concept states
+    unlocked: frozenset[int]  # concepts made learnable by this plan's practice
+    today: frozenset[str]  # concepts already practised on the current day
+    action: PlannedAction | None = None
+    parent: _Node | None = None
+
+
+class HorizonPlanner:
+    """Bounded beam search over day-by-day practice plans.
+
+    Every planned action is simulated with the real models: a successful
+    ``update_mastery`` at ``expected_confidence`` followed by an SM-2 review
+    at quality 4. Plans are scored by the mastery each concept retains at
+    the end of the horizon under the forgetting model, minus
+    ``overdue_penalty`` for every concept whose SM-2 review is due by then.
+    Each slot expands up to ``branching`` review and ``branching`` new
+    concepts per plan and keeps the best ``beam_width`` plans. Reviews are
+    concepts due or below ``review_threshold``, as for ``next_action``; a plan
+    with neither reinforces its weakest concepts, so every day gets
+    ``actions_per_day`` actions while any concept is left to practise. Plans that
+    reach the same concept states in a different order are merged, and both
+    single-concept transitions and concept values are memoized on the state.
+    """
+
+    def __init__(
+        self,
+        graph: ConceptGraph,
+        student: StudentState,
+        config: PlannerConfig | None = None,
+        spaced_repetition: SpacedRepetitionConfig | None = None,
+        now: datetime | None = None,
+        review_threshold: float = 0.6,
+    ):
+        self.graph = graph
+        self.compiled = graph.compiled
+        self.student = student
+        self.config = config or PlannerConfig()
+        self.spaced_repetition = spaced_repetition or SpacedRepetitionConfig()
+        self.now = now or datetime.now(timezone.utc)
+        self.review_threshold = review_threshold
+        self._values: dict[tuple, float] = {}
+
+    def plan(self, days: int) -> list[PlannedAction]:
+        cfg = self.config
+        self._end = epoch_us(self.now + timedelta(days=days))
+        self._values.clear()
+        self._steps: dict[tuple, ConceptState] = {}
+        slots = days * cfg.actions_per_day
+        frontier = learnable_frontier(self.graph, self.student, cfg.mastery_threshold)
+        self._new = [self.compiled.ids[n] for n in frontier.eligible(cfg.branching + slots)]
+        reviews = review_index(self.student)
+
+        beam = [_Node(self.student.simulate(), 0.0, 0, frozenset(), frozenset())]
+        for day in range(days):
+            when = self.now + timedelta(days=day)
+            # A plan can have touched at most the names practised so far.
+            limit = cfg.branching + (day + 1) * cfg.actions_per_day
+            due = reviews.queue(self.review_threshold, now=when, limit=limit)
+            self._due = [(self.student.concepts[name].mastery, name) for name in due]
+            for _ in range(cfg.actions_per_day):
+                children: dict[int, _Node] = {}
+                for node in beam:
+                    for action, name, reason in self._candidates(node, when):
+                        child = self._step(node, action, name, reason, day, when)
+                        best = children.get(child.signature)
+                        if best is None or child.score > best.score:
+                            children[child.signature] = child
+                if not children:
+                    break
+                beam = heapq.nlargest(cfg.beam_width, children.values(), key=lambda n: n.score)
+            beam = [
+                _Node(n.student, n.score, n.signature, n.unlocked, frozenset(), n.action, n.parent)
+                for n in beam
+            ]
+
+        actions: list[PlannedAction] = []
+        node: _Node | None = beam[0]
+        while node is not None and node.action is not None:
+            actions.append(node.action)
+            node = node.parent
+        return actions[::-1]
+
+    def _candidates(self, node: _Node, when: datetime) -> list[tuple[str, str, str]]:
+        cfg = self.config
+        concepts = node.student.concepts
+        changes = concepts.changes
+        bound = epoch_us(when)
+
+        # ``self._due`` is already ranked, so the first few untouched names suffice.
+        ranked = list(islice(((m, 0, n) for m, n in self._due if n not in changes), cfg.branching))
+        ranked.extend(
+            (state.mastery, 1, name)
+            for name, state in changes.items()
+            if name not in node.today
+            and (state.mastery < self.review_threshold or self._due_ts(state) <= bound)
+        )
+        reviews = [n for _, _, n in heapq.nsmallest(cfg.branching, ranked)]
+
+        names = self.compiled.names
+        new: list[str] = []
+        previous = -1
+        for idx in heapq.merge(sorted(node.unlocked), self._new):
+            if idx == previous:
+                continue
+            previous = idx
+            if self._learnable(concepts, idx):
+                new.append(names[idx])
+                if len(new) >= cfg.branching:
+                    break
+        if not reviews and not new:
+            # Nothing due and nothing new: reinforce the weakest concepts not yet practised today.
+            weakest = heapq.nsmallest(
+                cfg.branching,
+                ((concepts[name].mastery, name) for name in concepts if name not in node.today),
+            )
+            return [("review", n, "no_eligible_new_concepts") for _, n in weakest]
+        return [("review", n, "due_or_low_mastery") for n in reviews] + [
+            ("learn", n, "prerequisites_satisfied") for n in new
+        ]
+
+    def _step(
+        self, node: _Node, action: str, name: str, reason: str, day: int, when: datetime
+    ) -> _Node:
+        cfg = self.config
+        sim = node.student.simulate()
+        before = sim.concepts.get(name)
+        # Sibling plans keep practising the same concept states, so each distinct
+        # (state, day) transition is simulated once and its result shared; shared
+        # states are safe because a simulation copies a concept before writing it.
+        step = (name, day, None if before is None else _key(before))
+        after = self._steps.get(step)
+        if after is None:
+            sim.update_mastery(name, correct=True, confidence=cfg.expected_confidence, now=when)
+            after = sim.concept(name)
+            sm2_update(after, quality=4, config=self.spaced_repetition, now=when)
+            self._steps[step] = after
+        else:
+            sim.concepts[name] = after
+
+        signature = node.signature ^ hash((name, _key(after)))
+        if name in node.student.concepts.changes:
+            signature ^= hash((name, step[2]))
+
+        unlocked = node.unlocked
+        idx = self.compiled.ids.get(name)
+        threshold = cfg.mastery_threshold
+        was_met = before is not None and before.mastery >= threshold
+        if idx is not None and was_met != (after.mastery >= threshold):
+            deps = self.compiled.dependents(idx)
+            if was_met:
+                unlocked = unlocked.difference(deps)
+            else:
+                unlocked = unlocked.union(d for d in deps if self._learnable(sim.concepts, d))
+        if idx in unlocked:
+            unlocked = unlocked - {idx}
+
+        return _Node(
+            student=sim,
+            score=node.score + self._value(after) - self._value(before),
+            signature=signature,
+            unlocked=unlocked,
+            today=node.today | {name},
+            action=PlannedAction(action=action, concept=name, reason=reason, day=day + 1),
+            parent=node,
+        )
+
+    def _learnable(self, concepts, idx: int) -> bool:
+        compiled = self.compiled
+        if idx >= compiled.node_count or compiled.names[idx] in concepts:
+            return False
+        for req in compiled.prerequisites(idx):
+            state = concepts.get(compiled.names[req])
+            if state is None or state.mastery < self.config.mastery_threshold:
+                return False
+        return True
+
+    def _due_ts(self, state: ConceptState) -> float:
+        due_us = state.reviews.due_us
+        return -math.inf if due_us is None else due_us
+
+    def _value(self, state: ConceptState | None) -> float:
+        """Mastery retained at the horizon end, less the penalty if review is due by then."""
+        if state is None:
+            return 0.0
+        key = _key(state)
+        value = self._values.get(key)
+        if value is None:
+            age = max(self._end - state.updated_us, 0) / 1_000_000
+            value = state.mastery * math.exp(-self.student.forgetting_lambda * age / 86400)
+            if self._due_ts(state) <= self._end:
+                value -= self.config.overdue_penalty
+            self._values[key] = value
+        return value
+
+
+def _key(state: ConceptState) -> tuple:
+    reviews = state.reviews
+    return (
+        state.mastery,
+        state.updated_us,
+        reviews.repetitions,
+        reviews.interval_days,
+        reviews.ease_factor,
+        reviews.due_us,
+    )
+
+
+def plan_horizon(
+    graph: ConceptGraph,
+    student: StudentState,
+    horizon: str | int = "7d",
+    config: PlannerConfig | None = None,
+    spaced_repetition: SpacedRepetitionConfig | None = None,
+    now: datetime | None = None,
+    review_threshold: float = 0.6,
+) -> list[PlannedAction]:
+    """Plan up to ``actions_per_day`` actions per day over ``horizon`` (e.g. ``30d``)."""
+    days = horizon if isinstance(horizon, int) else parse_horizon(horizon)
+    planner = HorizonPlanner(graph, student, config, spaced_repetition, now, review_threshold)
+    return planner.plan(days)
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import csv
+import json
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+
+from .config import SkillGraphConfig
+from .scheduler import sm2_update
+from .storage import CohortStudentStore, StaleStudentError, StudentStore
+from .student import StudentState
+
+_TRUE = {"1", "true", "yes", "y", "t", "on"}
+_STALE_RETRIES = 3
+
+
+@dataclass
+class QuizEvent:
+    student_id: str
+    concept: str
+    correct: bool
+    confidence: float
+    timestamp: datetime
+
+
+@dataclass
+class IngestStats:
+    rows: int = 0
+    students: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def parse_timestamp(value) -> datetime:
+    if value in (None, ""):
+        return datetime.now(timezone.utc)
+    try:
+        return datetime.fromtimestamp(float(value), tz=timezone.utc)
+    except ValueError:
+        stamp = datetime.fromisoformat(str(value))
+    return stamp if stamp.tzinfo else stamp.replace(tzinfo=timezone.utc)
+
+
+def _event(row: dict) -> QuizEvent:
+    correct = row["correct"]
+    confidence = row.get("confidence")
+    return QuizEvent(
+        student_id=str(row["student_id"]),
+        concept=str(row["concept"]),
+        correct=correct if isinstance(correct, bool) else str(correct).lower() in _TRUE,
+        confidence=0.7 if confidence in (None, "") else float(confidence),
+        timestamp=parse_timestamp(row.get("timestamp")),
+    )
+
+
+def read_events(path: str | Path) -> Iterator[QuizEvent]:
+    """Stream quiz outcomes from a CSV (with header) or JSONL file."""
+    source = Path(path)
+    with source.open(encoding="utf-8", newline="") as handle:
+        if source.suffix.lower() == ".csv":
+            reader = csv.DictReader(handle)
+            rows: Iterable[tuple[int, dict]] = ((reader.line_num, row) for row in reader)
+        else:
+            rows = ((n, json.loads(line)) for n, line in enumerate(handle, 1) if line.strip())
+        try:
+            for line_no, row in rows:
+                try:
+                    yield _event(row)
+                except (KeyError, TypeError, ValueError) as exc:
+                    raise ValueError(f"{source}:{line_no}: invalid quiz row ({exc})") from exc
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"{source}: invalid JSON line ({exc})") from exc
+
+
+def apply_events(
+    config: SkillGraphConfig, student: StudentState, events: Iterable[QuizEvent]
+) -> None:
+    """Apply one student's events in timestamp order, as ``skillgraph quiz`` would."""
+    for event in sorted(events, key=lambda item: item.timestamp):
+        student.update_mastery(
+            event.concept, correct=event.correct, confidence=event.confidence, now=event.timestamp
+        )
+        sm2_update(
+            student.concept(event.concept),
+            quality=4 if event.correct else 2,
+            config=config.spaced_repetition,
+            now=event.timestamp,
+        )
+
+
+def ingest_events(
+    config: SkillGraphConfig,
+    store: StudentStore,
+    events: Iterable[QuizEvent],
+    chunk_rows: int = 1_000_000,
+) -> IngestStats:
+    """Apply a stream of quiz events to ``store``.
+
+    Rows are grouped by student in chunks of ``chunk_rows`` to bound memory;
+    each student touched by a chunk is loaded and saved once for that chunk.
+    Rows for unknown students are counted in ``skipped``.
+    """
+    stats = IngestStats()
+    touched: set[str] = set()
+    start = time.perf_counter()
+    iterator = iter(events)
+    while chunk := list(islice(iterator, chunk_rows)):
+        stats.rows += len(chunk)
+        applied: dict[str, int] = {}
+        try:
+            if isinstance(store, CohortStudentStore):
+                applied = _ingest_cohort_chunk(config, store, chunk)
+            else:
+                _ingest_chunk(config, store, chunk, applied)
+        except StaleStudentError as exc:
+            done = stats.rows - len(chunk) - stats.skipped + sum(applied.values())
+            raise StaleStudentError(
+                f"{exc} Ingest stopped after applying {done} rows; applied rows are kept, "
+                "so re-run only the rows that were not applied."
+            ) from exc
+        stats.skipped += len(chunk) - sum(applied.values())
+        touched.update(applied)
+    stats.students = len(touched)
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def _ingest_chunk(
+    config: SkillGraphConfig, store: StudentStore, chunk: list[QuizEvent], applied: dict[str, int]
+) -> None:
+    groups: dict[str, list[QuizEvent]] = {}
+    for event in chunk:
+        groups.setdefault(event.student_id, []).append(event)
+    with store.batch():
+        for student_id, events in groups.items():
+            if _apply_locked(config, store, student_id, events):
+                applied[student_id] = len(events)
+
+
+def _apply_locked(
+    config: SkillGraphConfig, store: StudentStore, student_id: str, events: list[QuizEvent]
+) -> bool:
+    """Load, update and save one student under its lock; False for an unknown student.
+
+    A save rejected as stale (another writer that skipped the lock) is retried
+    on a fresh copy a few times before giving up.
+    """
+    for attempt in range(_STALE_RETRIES):
+        with store.locked(student_id):
+            try:
+                student = store.load(student_id)
+            except FileNotFoundError:
+                return False
+            apply_events(config, student, events)
+            try:
+                store.save(student)
+                return True
+            except StaleStudentError:
+                if attempt == _STALE_RETRIES - 1:
+                    raise
+    return False
+
+
+def _ingest_cohort_chunk(
+    config: SkillGraphConfig, store: CohortStudentStore, chunk: list[QuizEvent]
+) -> dict[str, int]:
+    with store.locked_many({event.student_id for event in chunk}):
+        return _apply_cohort_chunk(config, store.cohort, chunk)
+
+
+def _apply_cohort_chunk(config: SkillGraphConfig, cohort, chunk: list[QuizEvent]) -> dict[str, int]:
+    from .cohort import sm2_update_many, update_mastery_batch
+
+    known = sorted(
+        (event for event in chunk if event.student_id in cohort), key=lambda e: e.timestamp
+    )
+    if not known:
+        return {}
+    # Per cell, events are in timestamp order and both passes stamp updated_at with the
+    # event time, so running all mastery updates before all SM-2 updates is equivalent
+    # to interleaving them event by event.
+    students = [event.student_id for event in known]
+    concepts = [event.concept for event in known]
+    stamps = [event.timestamp.timestamp() for event in known]
+    correct = [event.correct for event in known]
+    update_mastery_batch(
+        cohort, students, concepts, correct, [e.confidence for e in known], now=stamps
+    )
+    quality = [4 if ok else 2 for ok in correct]
+    sm2_update_many(
+        cohort, students, concepts, quality, now=stamps, config=config.spaced_repetition
+    )
+    cohort.flush()
+    applied: dict[str, int] = {}
+    for student_id in students:
+        applied[student_id] = applied.get(student_id, 0) + 1
+    return applied
@@ -1,16 +1,200 @@
 from __future__ import annotations
 
+import atexit
 import json
+import os
+import queue
+import threading
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 
+from .config import LoggingConfig
+
+_writers: dict[str, TraceWriter] = {}
+_writers_lock = threading.Lock()
+
+
+class TraceWriter:
+    """Buffered JSONL trace sink.
+
+    ``emit`` only enqueues the event; a background thread writes queued
+    events in one ``write`` once ``flush_events`` are pending or
+    ``flush_seconds`` have passed. When the file would grow past
+    ``max_bytes`` it is rotated to ``<path>.1`` (optionally gzipped), keeping
+    ``backups`` old files. Pending events are written at interpreter exit.
+    Values JSON cannot encode are written as ``str``; events that still fail
+    (e.g. circular references) are dropped and counted in ``dropped``.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        flush_events: int = 256,
+        flush_seconds: float = 1.0,
+        max_bytes: int = 0,
+        backups: int = 3,
+        compress: bool = False,
+    ):
+        self.path = Path(path)
+        self.flush_events = max(1, flush_events)
+        self.flush_seconds = flush_seconds
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.compress = compress
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._handle = None
+        self._closed = False
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self._thread.start()
+
+    def emit(self, payload: dict) -> None:
+        """Queue one event.
+
+        Zero-argument callables among the values are called here, so callers can
+        pass costly fields that are only computed while tracing is on.
+        """
+        if self._closed:
+            return
+        event = {k: v() if callable(v) else v for k, v in payload.items()}
+        self._queue.put((time.time(), event))
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every event emitted so far is written; False if that timed out."""
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        deadline = time.monotonic() + timeout
+        # Poll so a writer thread that died can never hang the caller.
+        while not done.wait(0.05):
+            if not self._thread.is_alive() or time.monotonic() >= deadline:
+                return False
+        return True
+
+    def close(self, timeout: float = 10.0) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        lines: list[str] = []
+        deadline = time.monotonic() + self.flush_seconds
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = False  # flush interval elapsed
+            if isinstance(item, tuple):
+                stamp, event = item
+                moment = datetime.fromtimestamp(stamp, timezone.utc).isoformat()
+                try:
+                    lines.append(json.dumps({"timestamp": moment, **event}, default=str) + "\n")
+                except (TypeError, ValueError):
+                    self.dropped += 1
+                if len(lines) < self.flush_events:
+                    continue
+            try:
+                self._write("".join(lines))
+            except Exception:
+                # A full disk or a failed rotation drops traces rather than failing
+                # quizzes or killing this thread (which flush and close wait on).
+                self.dropped += len(lines)
+                if self._handle is not None and self._handle.closed:
+                    self._handle = None  # closed by a failed rotation; reopen on the next write
+            lines.clear()
+            deadline = time.monotonic() + self.flush_seconds
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                if self._handle is not None:
+                    self._handle.close()
+                return
+
+    def _write(self, text: str) -> None:
+        if not text:
+            return
+        data = text.encode("utf-8")
+        if self._handle is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = self.path.open("ab")
+        size = self._handle.tell()
+        if self.max_bytes and size and size + len(data) > self.max_bytes:
+            self._rotate()
+        self._handle.write(data)
+        self._handle.flush()
+
+    def _rotate(self) -> None:
+        self._handle.close()
+        suffix = ".gz" if self.compress else ""
+
+        def backup(n: int) -> Path:
+            return self.path.with_name(f"{self.path.name}.{n}{suffix}")
+
+        if not self.backups:
+            self.path.unlink()
+        else:
+            for n in range(self.backups - 1, 0, -1):
+                if backup(n).exists():
+                    os.replace(backup(n), backup(n + 1))
+            if self.compress:
+                import gzip
+                import shutil
+
+                with self.path.open("rb") as src, gzip.open(backup(1), "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                self.path.unlink()
+            else:
+                os.replace(self.path, backup(1))
+        self._handle = self.path.open("ab")
+
+
+def trace_writer(config: LoggingConfig) -> TraceWriter | None:
+    """The process-wide writer for ``config.trace_path`` (None when tracing is off)."""
+    if not config.trace_path:
+        return None
+    key = os.path.abspath(config.trace_path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = TraceWriter(
+                key,
+                flush_events=config.flush_events,
+                flush_seconds=config.flush_seconds,
+                max_bytes=config.max_bytes,
+                backups=config.backups,
+                compress=config.compress,
+            )
+        return writer
+
 
 def log_trace(path: str | Path, payload: dict) -> None:
-    target = Path(path)
-    target.parent.mkdir(parents=True, exist_ok=True)
-    enriched = {
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-        **payload,
-    }
-    with target.open("a", encoding="utf-8") as handle:
-        handle.write(json.dumps(enriched) + "\n")
+    writer = trace_writer(LoggingConfig(trace_path=str(path)))
+    if writer is not None:
+        writer.emit(payload)
+
+
+def flush_traces() -> None:
+    """Write every pending event of every open writer."""
+    for writer in list(_writers.values()):
+        writer.flush()
+
+
+@atexit.register
+def _close_writers() -> None:
+    for writer in list(_writers.values()):
+        writer.close()
+
+
+def _forget_writers() -> None:
+    # A forked child has the parent's writers (and maybe a held lock) but not their threads.
+    global _writers_lock
+    _writers.clear()
+    _writers_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_writers)
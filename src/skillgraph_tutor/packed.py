@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import struct
+import sys
+from collections.abc import Iterator, MutableMapping
+from itertools import islice
+from pathlib import Path
+
+from .fsutil import atomic_write
+from .student import ConceptState, ReviewState, StudentState
+
+# File layout (little-endian)::
+#
+#     header     magic, version, forgetting_lambda, mastery_learning_rate,
+#                student_id / name / concept-name byte lengths, concept count
+#     strings    student_id, name, then concept names joined by NUL (UTF-8)
+#     records    per concept, same order: fixed-size _RECORD
+#
+# Records are fixed-size, so the name table doubles as the offset index:
+# concept ``i`` lives at ``records + i * _RECORD.size``.
+MAGIC = b"SGB\x01"
+VERSION = 1
+_HEADER = struct.Struct("<4sHddIIII")
+_RECORD = struct.Struct("<dqiidq")  # mastery, updated_us, repetitions, interval, ease, due_us
+_NO_DUE = -(2**63)
+
+
+class PackedConcepts(MutableMapping):
+    """Concept mapping over the records of a packed student file.
+
+    Used as ``StudentState.concepts``. A record is decoded into a
+    ``ConceptState`` the first time it is read; records never read are
+    written back byte for byte by :func:`pack_student`.
+    """
+
+    def __init__(self, data: bytes, names: list[str], offset: int):
+        self._data = data
+        self._offset = offset
+        self._count = len(names)
+        self._slots: dict[str, int] = {name: idx for idx, name in enumerate(names)}
+        self._decoded: dict[str, ConceptState] = {}
+        self._deleted = False
+
+    def __getitem__(self, name: str) -> ConceptState:
+        state = self._decoded.get(name)
+        if state is None:
+            slot = self._slots[name]
+            state = self._decoded[name] = _unpack_concept(self._data, self._record_at(slot))
+        return state
+
+    def __setitem__(self, name: str, state: ConceptState) -> None:
+        self._slots.setdefault(name, -1)
+        self._decoded[name] = state
+
+    def __delitem__(self, name: str) -> None:
+        del self._slots[name]
+        self._decoded.pop(name, None)
+        self._deleted = True
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._slots
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._slots)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def records(self) -> bytes:
+        """Records of every concept in iteration order, re-packing only decoded ones."""
+        size = _RECORD.size
+        if self._deleted:
+            # Slots no longer line up with iteration order; copy record by record.
+            parts = []
+            for name, slot in self._slots.items():
+                state = self._decoded.get(name)
+                if state is None:
+                    start = self._record_at(slot)
+                    parts.append(self._data[start : start + size])
+                else:
+                    parts.append(_pack_concept(state))
+            return b"".join(parts)
+        # Stored concepts keep their slots in order and new ones follow them, so the
+        # stored block is copied once and only decoded records are patched over it.
+        block = bytearray(self._data[self._offset : self._record_at(self._count)])
+        for name, state in self._decoded.items():
+            slot = self._slots[name]
+            if slot >= 0:
+                block[slot * size : (slot + 1) * size] = _pack_concept(state)
+        for name in islice(self._slots, self._count, None):
+            block += _pack_concept(self._decoded[name])
+        return bytes(block)
+
+    def _record_at(self, slot: int) -> int:
+        return self._offset + slot * _RECORD.size
+
+
+def _pack_concept(state: ConceptState) -> bytes:
+    reviews = state.reviews
+    return _RECORD.pack(
+        state.mastery,
+        state.updated_us,
+        reviews.repetitions,
+        reviews.interval_days,
+        reviews.ease_factor,
+        _NO_DUE if reviews.due_us is None else reviews.due_us,
+    )
+
+
+def _unpack_concept(data: bytes, offset: int) -> ConceptState:
+    mastery, updated_us, repetitions, interval, ease, due_us = _RECORD.unpack_from(data, offset)
+    return ConceptState(
+        mastery,
+        updated_us,
+        ReviewState(repetitions, interval, ease, None if due_us == _NO_DUE else due_us),
+    )
+
+
+def pack_student(student: StudentState) -> bytes:
+    concepts = student.concepts
+    names = list(concepts)
+    student_id = student.student_id.encode("utf-8")
+    display = student.name.encode("utf-8")
+    table = "\0".join(names).encode("utf-8")
+    if names and table.count(b"\0") != len(names) - 1:
+        raise ValueError("concept names cannot contain NUL characters")
+    parts = [
+        _HEADER.pack(
+            MAGIC,
+            VERSION,
+            student.forgetting_lambda,
+            student.mastery_learning_rate,
+            len(student_id),
+            len(display),
+            len(table),
+            len(names),
+        ),
+        student_id,
+        display,
+        table,
+    ]
+    if isinstance(concepts, PackedConcepts):
+        parts.append(concepts.records())
+    else:
+        parts.extend(_pack_concept(concepts[name]) for name in names)
+    return b"".join(parts)
+
+
+def unpack_student(data: bytes) -> StudentState:
+    """Decode the profile and concept names; concept records stay packed until read."""
+    header = _HEADER.unpack_from(data)
+    magic, version, forgetting_lambda, learning_rate, id_len, name_len, table_len, count = header
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a packed student file (or an unsupported version)")
+    offset = _HEADER.size
+    student_id = data[offset : offset + id_len].decode("utf-8")
+    offset += id_len
+    name = data[offset : offset + name_len].decode("utf-8")
+    offset += name_len
+    table = data[offset : offset + table_len].decode("utf-8")
+    names = [sys.intern(concept) for concept in table.split("\0")] if count else []
+    if len(names) != count:
+        raise ValueError("concept name table does not match the concept count")
+    offset += table_len
+    return StudentState(
+        student_id=student_id,
+        name=name,
+        forgetting_lambda=forgetting_lambda,
+        mastery_learning_rate=learning_rate,
+        concepts=PackedConcepts(data, names, offset),
+    )
+
+
+def save_packed(path: str | Path, student: StudentState, fsync: bool = True) -> None:
+    atomic_write(path, pack_student(student), fsync=fsync)
+
+
+def load_packed(path: str | Path) -> StudentState:
+    source = Path(path)
+    try:
+        return unpack_student(source.read_bytes())
+    except (ValueError, struct.error, UnicodeDecodeError) as exc:
+        raise ValueError(f"{source}: corrupt packed student file ({exc})") from exc
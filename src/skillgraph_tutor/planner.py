@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-import copy
+import heapq
+from array import array
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 
-from .graph import ConceptGraph
-from .scheduler import is_due
+from .graph import CompiledGraph, ConceptGraph
+from .profiling import profiled
+from .scheduler import review_index
 from .student import StudentState
 
 
@@ -14,55 +16,178 @@ class PlannedAction:
     action: str
     concept: str
     reason: str
+    day: int = 1
 
 
-def _eligible_new_concepts(
+class LearnableFrontier:
+    """Concepts a student has not started whose prerequisites are all mastered.
+
+    Keeps, per concept id, the number of prerequisites below ``threshold``.
+    Registered as a student watcher, so only names handed out by
+    ``StudentState.concept`` are re-examined; when one crosses the threshold
+    (either way, since forgetting can undo mastery) only its dependents'
+    counts change. Eligible ids sit in a min-heap so the first concept in
+    graph order is an O(log n) lookup.
+    """
+
+    def __init__(self, compiled: CompiledGraph, student: StudentState, threshold: float):
+        self.compiled = compiled
+        self.student = student
+        self.threshold = threshold
+        self._pending: set[str] = set()
+        self._rebuild()
+
+    def touch(self, name: str) -> None:
+        self._pending.add(name)
+
+    def eligible(self, limit: int | None = None) -> list[str]:
+        self._sync()
+        heap, flags, names = self._heap, self._eligible, self.compiled.names
+        if limit == 1:
+            while heap and not flags[heap[0]]:
+                heapq.heappop(heap)
+            return [names[heap[0]]] if heap else []
+        ids = {idx for idx in heap if flags[idx]}
+        if len(heap) > 2 * len(ids) + 64:
+            self._heap = sorted(ids)
+        ordered = sorted(ids) if limit is None else heapq.nsmallest(limit, ids)
+        return [names[idx] for idx in ordered]
+
+    def _rebuild(self) -> None:
+        compiled, concepts = self.compiled, self.student.concepts
+        size = len(compiled.names)
+        self._seen = bytearray(size)
+        self._satisfied = bytearray(size)
+        self._outside: set[str] = set()
+        for name, state in concepts.items():
+            idx = compiled.ids.get(name)
+            if idx is None:
+                self._outside.add(name)
+                continue
+            self._seen[idx] = 1
+            self._satisfied[idx] = state.mastery >= self.threshold
+        self._size = len(concepts)
+
+        indptr, indices, satisfied = compiled.indptr, compiled.indices, self._satisfied
+        self._unsatisfied = array(
+            "i",
+            (
+                sum(1 for req in indices[indptr[idx] : indptr[idx + 1]] if not satisfied[req])
+                for idx in range(compiled.node_count)
+            ),
+        )
+        self._eligible = bytearray(compiled.node_count)
+        for idx in range(compiled.node_count):
+            self._eligible[idx] = not self._seen[idx] and self._unsatisfied[idx] == 0
+        self._heap = [idx for idx in range(compiled.node_count) if self._eligible[idx]]
+        self._pending.clear()
+
+    def _sync(self) -> None:
+        compiled, concepts = self.compiled, self.student.concepts
+        for name in self._pending:
+            state = concepts.get(name)
+            idx = compiled.ids.get(name)
+            if idx is None:
+                if state is None and name in self._outside:
+                    self._outside.remove(name)
+                    self._size -= 1
+                elif state is not None and name not in self._outside:
+                    self._outside.add(name)
+                    self._size += 1
+                continue
+            seen = state is not None
+            satisfied = seen and state.mastery >= self.threshold
+            if seen != self._seen[idx]:
+                self._seen[idx] = seen
+                self._size += 1 if seen else -1
+                self._refresh(idx)
+            if satisfied != self._satisfied[idx]:
+                self._satisfied[idx] = satisfied
+                step = -1 if satisfied else 1
+                for dep in compiled.dependents(idx):
+                    self._unsatisfied[dep] += step
+                    self._refresh(dep)
+        self._pending.clear()
+        # Concepts added or removed behind the watcher's back force a rebuild.
+        if self._size != len(concepts):
+            self._rebuild()
+
+    def _refresh(self, idx: int) -> None:
+        if idx >= self.compiled.node_count:
+            return
+        eligible = not self._seen[idx] and self._unsatisfied[idx] == 0
+        if eligible and not self._eligible[idx]:
+            heapq.heappush(self._heap, idx)
+        self._eligible[idx] = eligible
+
+
+def learnable_frontier(
     graph: ConceptGraph, student: StudentState, threshold: float
+) -> LearnableFrontier:
+    """Return the student's frontier for ``graph``/``threshold``, creating it on first use."""
+    compiled = graph.compiled
+    for idx, watcher in enumerate(student._watchers):
+        if isinstance(watcher, LearnableFrontier) and watcher.threshold == threshold:
+            if watcher.compiled is compiled:
+                return watcher
+            frontier = LearnableFrontier(compiled, student, threshold)
+            student._watchers[idx] = frontier
+            return frontier
+    frontier = LearnableFrontier(compiled, student, threshold)
+    student._watchers.append(frontier)
+    return frontier
+
+
+def _eligible_new_concepts(
+    graph: ConceptGraph, student: StudentState, threshold: float, limit: int | None = None
 ) -> list[str]:
-    eligible: list[str] = []
-    for name, node in graph.nodes.items():
-        if name in student.concepts:
-            continue
-        prereq_ok = all(
-            student.concepts.get(req, None) and student.concepts[req].mastery >= threshold
-            for req in node.requires
-        )
-        if prereq_ok:
-            eligible.append(name)
-    return eligible
+    return learnable_frontier(graph, student, threshold).eligible(limit)
+
+
+def build_review_queue(
+    student: StudentState,
+    low_mastery_threshold: float = 0.6,
+    now: datetime | None = None,
+    limit: int | None = None,
+) -> list[str]:
+    """Due or low-mastery concepts, lowest mastery first (top ``limit`` if given)."""
+    return review_index(student).queue(low_mastery_threshold, now=now, limit=limit)
 
 
-def build_review_queue(student: StudentState, low_mastery_threshold: float = 0.6) -> list[str]:
-    queue: list[str] = []
-    for name, concept in student.concepts.items():
-        if is_due(concept) or concept.mastery < low_mastery_threshold:
-            queue.append(name)
-    queue.sort(key=lambda n: student.concepts[n].mastery)
-    return queue
+def count_reviews(
+    student: StudentState, low_mastery_threshold: float = 0.6, now: datetime | None = None
+) -> int:
+    """``len(build_review_queue(...))`` without building the ranked queue."""
+    return review_index(student).count(low_mastery_threshold, now=now)
 
 
 def next_action(
-    graph: ConceptGraph, student: StudentState, mastery_threshold: float = 0.7
+    graph: ConceptGraph,
+    student: StudentState,
+    mastery_threshold: float = 0.7,
+    now: datetime | None = None,
 ) -> PlannedAction:
-    queue = build_review_queue(student)
+    queue = build_review_queue(student, now=now, limit=1)
     if queue:
         concept = queue[0]
         return PlannedAction(action="review", concept=concept, reason="due_or_low_mastery")
 
-    eligible = _eligible_new_concepts(graph, student, mastery_threshold)
+    eligible = _eligible_new_concepts(graph, student, mastery_threshold, limit=1)
     if eligible:
         return PlannedAction(action="learn", concept=eligible[0], reason="prerequisites_satisfied")
 
-    fallback = sorted(graph.nodes.keys())[0]
+    fallback = min(graph.nodes)
     return PlannedAction(action="review", concept=fallback, reason="no_eligible_new_concepts")
 
 
+@profiled
 def seven_day_plan(graph: ConceptGraph, student: StudentState) -> list[PlannedAction]:
     actions: list[PlannedAction] = []
-    simulated_student = copy.deepcopy(student)
+    simulated_student = student.simulate()
     simulated_now = datetime.now(timezone.utc)
     for day in range(7):
         action = next_action(graph, simulated_student)
+        action.day = day + 1
         actions.append(action)
         if action.concept not in simulated_student.concepts:
             simulated_student.concept(action.concept).mastery = 0.3
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import functools
+import os
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+_options = {"enabled": False, "alloc": False, "dump": None}
+_session: ProfileSession | None = None
+
+
+class ProfileSession:
+    """Per-stage wall time, call count and net allocated bytes for one command."""
+
+    def __init__(self, command: str, alloc: bool = False, dump: str | None = None):
+        self.command = command
+        self.output = "artifacts/profile.jsonl"
+        self.stages: dict[str, list] = {}
+        self.dump = dump
+        self._tracing = False
+        if alloc:
+            import tracemalloc
+
+            self._tracing = not tracemalloc.is_tracing()
+            if self._tracing:
+                tracemalloc.start()
+        self._profile = None
+        if dump:
+            import cProfile
+
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self._start = time.perf_counter()
+
+    def record(self, name: str, seconds: float, allocated: int | None) -> None:
+        entry = self.stages.get(name)
+        if entry is None:
+            entry = self.stages[name] = [0, 0.0, None]
+        entry[0] += 1
+        entry[1] += seconds
+        if allocated is not None:
+            entry[2] = (entry[2] or 0) + allocated
+
+    def finish(self) -> dict:
+        seconds = time.perf_counter() - self._start
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(self.dump)
+        report = {"command": self.command, "seconds": round(seconds, 6)}
+        if self._tracing:
+            import tracemalloc
+
+            report["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        report["stages"] = {
+            name: {
+                "calls": calls,
+                "seconds": round(total, 6),
+                **({} if allocated is None else {"alloc_bytes": allocated}),
+            }
+            for name, (calls, total, allocated) in sorted(
+                self.stages.items(), key=lambda item: -item[1][1]
+            )
+        }
+        from .logging_utils import log_trace
+
+        log_trace(self.output, report)
+        return report
+
+
+def configure(enabled: bool = False, alloc: bool = False, dump: str | None = None) -> None:
+    """Profile the next command (set from the CLI's global options)."""
+    _options.update(enabled=enabled or alloc or bool(dump), alloc=alloc, dump=dump or None)
+
+
+def set_output(path: str) -> None:
+    """Send the running command's report to ``path`` (the configured profile log)."""
+    if _session is not None and path:
+        _session.output = path
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block as ``name`` when a command is being profiled."""
+    session = _session
+    if session is None:
+        yield
+        return
+    if session._tracing:
+        import tracemalloc
+
+        before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        allocated = tracemalloc.get_traced_memory()[0] - before if session._tracing else None
+        session.record(name, seconds, allocated)
+
+
+def profiled(func: F) -> F:
+    """Record calls of ``func`` as the stage ``<module>.<qualname>``."""
+    # The file name rather than ``__module__``, which is ``__main__`` under ``python -m``.
+    name = f"{os.path.splitext(os.path.basename(func.__code__.co_filename))[0]}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _session is None:
+            return func(*args, **kwargs)
+        with stage(name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def command(name: str) -> Callable[[F], F]:
+    """Profile the CLI command ``name`` when asked to.
+
+    ``--profile`` (or ``SKILLGRAPH_PROFILE=1``) times stages, ``--profile-alloc``
+    (``SKILLGRAPH_PROFILE=alloc``) adds allocation stats and ``--profile-dump
+    PATH`` (``SKILLGRAPH_PROFILE_DUMP``) also writes a cProfile pstats file.
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            global _session
+            if _session is not None:  # a command run by another one, e.g. ``demo``
+                with stage(f"command.{name}"):
+                    return func(*args, **kwargs)
+            env = os.environ.get("SKILLGRAPH_PROFILE", "")
+            dump = _options["dump"] or os.environ.get("SKILLGRAPH_PROFILE_DUMP") or None
+            alloc = _options["alloc"] or env == "alloc"
+            if not (_options["enabled"] or env not in ("", "0") or dump):
+                return func(*args, **kwargs)
+            _session = ProfileSession(name, alloc=alloc, dump=dump)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                session, _session = _session, None
+                session.finish()
+
+        return wrapper
+
+    return decorator
@@ -1,16 +1,22 @@
 from __future__ import annotations
 
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from .config import SkillGraphConfig
+from .eval_harness import write_evaluation
 from .graph import ConceptGraph
 from .planner import seven_day_plan
 from .scheduler import is_due
-from .student import StudentState
+from .storage import StudentStore, load_workspace_graph, open_configured_store
+from .student import StudentState, utc_now
 
 
 def render_report(student: StudentState, graph: ConceptGraph) -> tuple[str, dict]:
-    due = [name for name, concept in student.concepts.items() if is_due(concept)]
+    now = utc_now()
+    due = [name for name, concept in student.concepts.items() if is_due(concept, now)]
     plan = seven_day_plan(graph, student)
     plan_rows = [
         {"day": i + 1, "action": item.action, "concept": item.concept}
@@ -43,9 +49,104 @@ def render_report(student: StudentState, graph: ConceptGraph) -> tuple[str, dict
     return "\n".join(md), payload
 
 
-def write_report(out_dir: str | Path, student: StudentState, graph: ConceptGraph) -> None:
+def write_report(out_dir: str | Path, student: StudentState, graph: ConceptGraph) -> dict:
     root = Path(out_dir)
     root.mkdir(parents=True, exist_ok=True)
     md, payload = render_report(student, graph)
     (root / "report.md").write_text(md, encoding="utf-8")
     (root / "report.json").write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return payload
+
+
+# Per-process state for ``write_cohort_reports``: the graph is loaded (and
+# compiled) once per worker rather than once per student or task.
+_WORKER: dict = {}
+
+
+def _init_worker(config: SkillGraphConfig) -> None:
+    store = open_configured_store(config)
+    _WORKER["graph"] = load_workspace_graph(config, store)
+    _WORKER["store"] = store
+
+
+def _report_shard(out_dir: str, student_ids: list[str]) -> list[dict]:
+    graph: ConceptGraph = _WORKER["graph"]
+    store: StudentStore = _WORKER["store"]
+    rows = []
+    for student_id in student_ids:
+        try:
+            student = store.load(student_id)
+        except FileNotFoundError:
+            continue  # removed since the cohort was listed
+        target = Path(out_dir) / student_id
+        payload = write_report(target, student, graph)
+        metrics = write_evaluation(target, graph, student)
+        masteries = [concept.mastery for concept in student.concepts.values()]
+        first = payload["plan"][0] if payload["plan"] else None
+        rows.append(
+            {
+                "student_id": student_id,
+                "name": student.name,
+                "concepts": len(masteries),
+                "mean_mastery": round(sum(masteries) / len(masteries), 3) if masteries else 0.0,
+                "due_reviews": len(payload["due_reviews"]),
+                "next": f"{first['action']} {first['concept']}" if first else "",
+                "simulated_gain": metrics["simulated_pre_post_gain"],
+            }
+        )
+    return rows
+
+
+def write_cohort_reports(
+    config: SkillGraphConfig,
+    out_dir: str | Path,
+    workers: int | None = None,
+    student_ids: list[str] | None = None,
+    shard_size: int = 64,
+) -> dict:
+    """Write per-student reports for the whole cohort plus a cohort summary.
+
+    Students are split into shards of ``shard_size`` and rendered by a pool of
+    ``workers`` processes (default: CPU count), each of which loads the graph
+    and opens the student store once. ``workers=1`` runs in-process.
+    """
+    root = Path(out_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    if student_ids is None:
+        student_ids = open_configured_store(config).student_ids()
+    shards = [student_ids[i : i + shard_size] for i in range(0, len(student_ids), shard_size)]
+    workers = min(workers or os.cpu_count() or 1, max(len(shards), 1))
+    if workers == 1:
+        _init_worker(config)
+        results = [_report_shard(str(root), shard) for shard in shards]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(config,)) as pool:
+            results = list(pool.map(_report_shard, [str(root)] * len(shards), shards))
+    rows = [row for shard in results for row in shard]
+    summary = {
+        "students": len(rows),
+        "mean_mastery": (
+            round(sum(row["mean_mastery"] for row in rows) / len(rows), 3) if rows else 0.0
+        ),
+        "students_with_due_reviews": sum(1 for row in rows if row["due_reviews"]),
+        "due_reviews": sum(row["due_reviews"] for row in rows),
+        "rows": rows,
+    }
+    md = [
+        "# Cohort Summary",
+        "",
+        f"- Students: {summary['students']}",
+        f"- Mean mastery: {summary['mean_mastery']}",
+        f"- Students with due reviews: {summary['students_with_due_reviews']}",
+        "",
+        "| Student | Concepts | Mean mastery | Due | Next |",
+        "|---|---:|---:|---:|---|",
+    ]
+    md.extend(
+        f"| [{row['name']}]({row['student_id']}/report.md) | {row['concepts']} | "
+        f"{row['mean_mastery']} | {row['due_reviews']} | {row['next']} |"
+        for row in rows
+    )
+    (root / "cohort_summary.md").write_text("\n".join(md) + "\n", encoding="utf-8")
+    (root / "cohort_summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    return summary
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+import heapq
+import math
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from itertools import islice
 
 from .config import SpacedRepetitionConfig
-from .student import ConceptState
+from .student import ConceptState, StudentState, epoch_us
+
+_DAY_US = 86400 * 1_000_000
 
 
 def _now() -> datetime:
@@ -42,14 +48,157 @@ def sm2_update(
             review.interval_days, round(review.interval_days * cfg.easy_bonus)
         )
 
-    review.due_at = (now + timedelta(days=review.interval_days)).isoformat()
-    concept.updated_at = now.isoformat()
+    now_us = epoch_us(now)
+    review.due_us = now_us + review.interval_days * _DAY_US
+    concept.updated_us = now_us
     return concept
 
 
 def is_due(concept: ConceptState, now: datetime | None = None) -> bool:
-    now = now or _now()
-    due_at = concept.reviews.due_at
-    if due_at is None:
-        return True
-    return datetime.fromisoformat(due_at) <= now
+    due_us = concept.reviews.due_us
+    return due_us is None or due_us <= epoch_us(now or _now())
+
+
+def _due_key(concept: ConceptState) -> float:
+    due_us = concept.reviews.due_us
+    return -math.inf if due_us is None else due_us
+
+
+def _walk_heap(heap: list, bound: float, inclusive: bool = True) -> Iterator[tuple]:
+    """Yield heap entries with key <= ``bound`` (< when not inclusive) in key order.
+
+    Walks the implicit heap tree with a small frontier heap, so the cost is
+    O(k log k) for k yielded entries regardless of the heap size.
+    """
+    if not heap:
+        return
+    frontier = [(heap[0], 0)]
+    size = len(heap)
+    while frontier:
+        entry, idx = heapq.heappop(frontier)
+        if entry[0] > bound or (not inclusive and entry[0] == bound):
+            return
+        yield entry
+        for child in (2 * idx + 1, 2 * idx + 2):
+            if child < size:
+                heapq.heappush(frontier, (heap[child], child))
+
+
+class ReviewIndex:
+    """Due-time and mastery heaps over one student's concepts.
+
+    Registered as a watcher on the student, so ``StudentState.concept`` (and
+    therefore ``update_mastery`` and ``sm2_update(student.concept(...))``) marks
+    names as touched; the next query re-keys only those names. Replaced heap
+    entries are skipped lazily and the heaps are rebuilt once mostly stale.
+    Ties are broken by first-seen order, matching a stable sort of
+    ``student.concepts``.
+    """
+
+    def __init__(self, student: StudentState):
+        self.student = student
+        self._ordinal: dict[str, int] = {}
+        self._keys: dict[str, tuple[float, float]] = {}
+        self._pending: set[str] = set()
+        self._rebuild()
+
+    def touch(self, name: str) -> None:
+        self._pending.add(name)
+
+    def due(self, now: datetime | None = None, limit: int | None = None) -> list[str]:
+        """Names due at ``now``, earliest due first."""
+        self._sync()
+        bound = epoch_us(now or _now())
+        names: list[str] = []
+        for name in self._valid(_walk_heap(self._due_heap, bound), slot=0):
+            names.append(name)
+            if limit is not None and len(names) >= limit:
+                break
+        return names
+
+    def queue(
+        self,
+        low_mastery_threshold: float = 0.6,
+        now: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[str]:
+        """Due or low-mastery names, lowest mastery first."""
+        self._sync()
+        bound = epoch_us(now or _now())
+        low = self._valid(_walk_heap(self._mastery_heap, low_mastery_threshold, False), slot=1)
+        due = self._valid(_walk_heap(self._due_heap, bound), slot=0)
+        if limit is None:
+            ranked = sorted((self._keys[n][1], self._ordinal[n], n) for n in {*low, *due})
+            return [name for _, _, name in ranked]
+        # Low-mastery names already come out of the heap in rank order and all of
+        # them outrank due names at or above the threshold, so only a shortfall
+        # needs the due names ranked.
+        names = list(islice(low, limit))
+        if len(names) < limit:
+            ranked = (
+                (self._keys[n][1], self._ordinal[n], n)
+                for n in due
+                if self._keys[n][1] >= low_mastery_threshold
+            )
+            names.extend(name for _, _, name in heapq.nsmallest(limit - len(names), ranked))
+        return names
+
+    def count(self, low_mastery_threshold: float = 0.6, now: datetime | None = None) -> int:
+        """``len(self.queue(...))`` without ranking the names."""
+        self._sync()
+        bound = epoch_us(now or _now())
+        names = set(self._valid(_walk_heap(self._mastery_heap, low_mastery_threshold, False), 1))
+        names.update(self._valid(_walk_heap(self._due_heap, bound), slot=0))
+        return len(names)
+
+    def _valid(self, entries: Iterator[tuple], slot: int) -> Iterator[str]:
+        seen: set[str] = set()
+        for key, _, name in entries:
+            current = self._keys.get(name)
+            if current is not None and current[slot] == key and name not in seen:
+                seen.add(name)
+                yield name
+
+    def _rebuild(self) -> None:
+        concepts = self.student.concepts
+        for name in concepts:
+            self._ordinal.setdefault(name, len(self._ordinal))
+        self._keys = {name: (_due_key(state), state.mastery) for name, state in concepts.items()}
+        self._due_heap = [(due, self._ordinal[n], n) for n, (due, _) in self._keys.items()]
+        self._mastery_heap = [(m, self._ordinal[n], n) for n, (_, m) in self._keys.items()]
+        heapq.heapify(self._due_heap)
+        heapq.heapify(self._mastery_heap)
+        self._pending.clear()
+
+    def _sync(self) -> None:
+        concepts = self.student.concepts
+        for name in self._pending:
+            state = concepts.get(name)
+            if state is None:
+                self._keys.pop(name, None)
+                continue
+            key = (_due_key(state), state.mastery)
+            old = self._keys.get(name)
+            if old == key:
+                continue
+            ordinal = self._ordinal.setdefault(name, len(self._ordinal))
+            self._keys[name] = key
+            if old is None or old[0] != key[0]:
+                heapq.heappush(self._due_heap, (key[0], ordinal, name))
+            if old is None or old[1] != key[1]:
+                heapq.heappush(self._mastery_heap, (key[1], ordinal, name))
+        self._pending.clear()
+        # Concepts added behind the index's back (or a replaced dict) force a rebuild.
+        stale = len(self._due_heap) + len(self._mastery_heap) > 4 * len(self._keys) + 64
+        if stale or len(self._keys) != len(concepts):
+            self._rebuild()
+
+
+def review_index(student: StudentState) -> ReviewIndex:
+    """Return the student's ``ReviewIndex``, building and registering it on first use."""
+    for watcher in student._watchers:
+        if isinstance(watcher, ReviewIndex):
+            return watcher
+    index = ReviewIndex(student)
+    student._watchers.append(index)
+    return index
@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import signal
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+from .cli import apply_quiz, apply_review, apply_study, plan_actions
+from .config import SkillGraphConfig
+from .eval_harness import evaluate, write_evaluation
+from .graph import ConceptGraph
+from .reporting import render_report, write_report
+from .storage import StaleStudentError, load_workspace_graph, open_configured_store
+from .student import StudentState, concept_from_dict, concept_to_dict
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+class Journal:
+    """Append-only JSONL of post-update concept states awaiting a flush.
+
+    Entries carry resulting state rather than operations, so replaying a
+    journal over students that were already (partly) flushed is idempotent.
+    """
+
+    def __init__(self, path: str | Path, fsync: bool = True):
+        self.path = Path(path)
+        self.fsync = fsync
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = self.path.open("a", encoding="utf-8")
+
+    def append(self, entry: dict) -> None:
+        self._handle.write(json.dumps(entry) + "\n")
+        self._handle.flush()
+        if self.fsync:
+            os.fsync(self._handle.fileno())
+
+    def entries(self) -> list[dict]:
+        entries = []
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                break  # torn final write from a crash; nothing after it was acknowledged
+        return entries
+
+    def reset(self) -> None:
+        self._handle.seek(0)
+        self._handle.truncate()
+        self._handle.flush()
+        if self.fsync:
+            os.fsync(self._handle.fileno())
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+class TutorService:
+    """In-memory tutoring engine behind ``skillgraph serve``.
+
+    Keeps the concept graph and recently used students in memory, journals
+    every change before acknowledging it, and writes dirty students back to
+    the configured student store in batches (``flush``).
+    """
+
+    def __init__(self, config: SkillGraphConfig):
+        self.config = config
+        self.workspace = Path(config.data_dir)
+        (self.workspace / "students").mkdir(parents=True, exist_ok=True)
+        self.store = open_configured_store(config)
+        self.journal = Journal(self.workspace / "service.journal", config.service.journal_fsync)
+        self._graph: ConceptGraph | None = None
+        self._hot: OrderedDict[str, StudentState] = OrderedDict()
+        # Dirty student id -> concepts changed here since the last flush.
+        self._dirty: dict[str, set[str]] = {}
+        # Requests and flushes run on executor threads, one at a time.
+        self._lock = threading.RLock()
+        self._recover()
+
+    @property
+    def graph(self) -> ConceptGraph:
+        if self._graph is None:
+            self._graph = load_workspace_graph(self.config, self.store)
+        return self._graph
+
+    def student(self, student_id: str) -> StudentState:
+        student = self._hot.get(student_id)
+        if student is None:
+            student = self.store.load(student_id)
+            self._hot[student_id] = student
+            self._evict()
+        else:
+            self._hot.move_to_end(student_id)
+        return student
+
+    def handle(self, method: str, route: str, params: dict) -> tuple[int, dict]:
+        handler = self._routes().get((method, route))
+        if handler is None:
+            return 404, {"error": f"No endpoint {method} {route}"}
+        try:
+            with self._lock:
+                return 200, handler(params)
+        except FileNotFoundError as exc:
+            return 404, {"error": str(exc)}
+        except (KeyError, ValueError) as exc:
+            return 400, {"error": f"Invalid request: {exc}"}
+
+    def flush(self) -> int:
+        """Write every dirty student to the store, then clear the journal."""
+        with self._lock:
+            count = len(self._dirty)
+            with self.store.batch():
+                for student_id in sorted(self._dirty):
+                    self._save(student_id)
+            self._dirty.clear()
+            self.journal.reset()
+            self._evict()
+            return count
+
+    def close(self) -> None:
+        self.flush()
+        self.journal.close()
+
+    def _save(self, student_id: str) -> None:
+        student = self._hot[student_id]
+        with self.store.locked(student_id):
+            try:
+                self.store.save(student)
+            except StaleStudentError:
+                # Another writer (e.g. the CLI) saved this student meanwhile: keep
+                # its changes and reapply only the concepts changed here.
+                fresh = self.store.load(student_id)
+                for name in self._dirty[student_id]:
+                    fresh.concept(name)
+                    fresh.concepts[name] = student.concepts[name]
+                self.store.save(fresh)
+                self._hot[student_id] = fresh
+
+    def _routes(self) -> dict:
+        return {
+            ("GET", "/health"): lambda _: {"status": "ok", "hot": len(self._hot)},
+            ("POST", "/students"): self._add_student,
+            ("POST", "/study"): self._study,
+            ("POST", "/quiz"): self._quiz,
+            ("POST", "/review"): self._review,
+            ("GET", "/plan"): self._plan,
+            ("POST", "/report"): self._report,
+            ("POST", "/flush"): lambda _: {"flushed": self.flush()},
+        }
+
+    def _add_student(self, params: dict) -> dict:
+        student = StudentState(
+            student_id=params["student_id"],
+            name=params["name"],
+            forgetting_lambda=self.config.forgetting.lambda_default,
+            mastery_learning_rate=self.config.policy.mastery_learning_rate,
+        )
+        self._hot[student.student_id] = student
+        self._record(student, [], reset=True)
+        return {"student_id": student.student_id}
+
+    def _study(self, params: dict) -> dict:
+        student = self.student(params["student_id"])
+        turn = apply_study(student, params["concept"])
+        self._record(student, [params["concept"]])
+        return {"question": turn.question, "hint": turn.hint}
+
+    def _quiz(self, params: dict) -> dict:
+        student = self.student(params["student_id"])
+        before, after = apply_quiz(
+            self.config,
+            student,
+            params["concept"],
+            correct=_flag(params["correct"]),
+            confidence=float(params.get("confidence", 0.7)),
+        )
+        self._record(student, [params["concept"]])
+        return {"mastery_before": before, "mastery_after": after}
+
+    def _review(self, params: dict) -> dict:
+        student = self.student(params["student_id"])
+        reviewed = apply_review(self.config, student)
+        if reviewed:
+            self._record(student, reviewed)
+        return {"reviewed": reviewed}
+
+    def _plan(self, params: dict) -> dict:
+        student = self.student(params["student_id"])
+        per_day = int(params["per_day"]) if "per_day" in params else None
+        actions = plan_actions(
+            self.config, self.graph, student, params.get("horizon", "7d"), per_day
+        )
+        return {"plan": [asdict(item) for item in actions]}
+
+    def _report(self, params: dict) -> dict:
+        student = self.student(params["student_id"])
+        if params.get("out"):
+            out = self._report_dir(params["out"])
+            write_report(out, student, self.graph)
+            write_evaluation(out, self.graph, student)
+        markdown, payload = render_report(student, self.graph)
+        return {**payload, "markdown": markdown, "eval": evaluate(self.graph, student)}
+
+    def _report_dir(self, out: str) -> Path:
+        """``out`` resolved against the data directory; clients may not write outside it."""
+        root = self.workspace.resolve()
+        path = (root / out).resolve()
+        if path != root and root not in path.parents:
+            raise ValueError(f"out must be a directory inside {self.workspace}, got '{out}'")
+        return path
+
+    def _record(self, student: StudentState, concepts: list[str], reset: bool = False) -> None:
+        self.journal.append(
+            {
+                "reset": reset,
+                "student_id": student.student_id,
+                "name": student.name,
+                "forgetting_lambda": student.forgetting_lambda,
+                "mastery_learning_rate": student.mastery_learning_rate,
+                "concepts": {name: concept_to_dict(student.concepts[name]) for name in concepts},
+            }
+        )
+        self._dirty.setdefault(student.student_id, set()).update(concepts)
+
+    def _recover(self) -> None:
+        entries = self.journal.entries()
+        for entry in entries:
+            try:
+                if entry["reset"]:
+                    raise FileNotFoundError(entry["student_id"])
+                student = self.student(entry["student_id"])
+            except FileNotFoundError:
+                student = StudentState.from_dict({**entry, "concepts": {}})
+                self._hot[student.student_id] = student
+            for name, raw in entry["concepts"].items():
+                student.concept(name)  # let watchers (e.g. event-log tracking) see the change
+                student.concepts[name] = concept_from_dict(raw)
+            self._dirty.setdefault(student.student_id, set()).update(entry["concepts"])
+        if entries:
+            self.flush()
+
+    def _evict(self) -> None:
+        limit = max(1, self.config.service.max_hot_students)
+        for student_id in list(self._hot):
+            if len(self._hot) <= limit:
+                break
+            if student_id not in self._dirty:
+                del self._hot[student_id]
+
+
+def _flag(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in {"1", "true", "yes", "on"}
+
+
+async def _handle_connection(
+    service: TutorService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+            url = urlsplit(target)
+            params = dict(parse_qsl(url.query))
+            try:
+                if body:
+                    params.update(json.loads(body))
+                # Off the event loop, so slow saves and report writes do not stall other clients.
+                status, payload = await asyncio.get_running_loop().run_in_executor(
+                    None, service.handle, method.upper(), url.path, params
+                )
+            except json.JSONDecodeError as exc:
+                status, payload = 400, {"error": f"Invalid JSON body: {exc}"}
+            except Exception as exc:  # keep serving other requests
+                status, payload = 500, {"error": f"{type(exc).__name__}: {exc}"}
+
+            data = json.dumps(payload).encode("utf-8")
+            keep_alive = headers.get("connection", "").lower() != "close"
+            writer.write(
+                (
+                    f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                ).encode("latin-1")
+                + data
+            )
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(service: TutorService) -> asyncio.Server:
+    """Listen on the configured Unix socket, or TCP host/port when none is set."""
+    cfg = service.config.service
+
+    async def handler(reader, writer):
+        await _handle_connection(service, reader, writer)
+
+    if cfg.unix_socket:
+        return await asyncio.start_unix_server(handler, path=cfg.unix_socket)
+    return await asyncio.start_server(handler, host=cfg.host, port=cfg.port)
+
+
+async def serve(
+    config: SkillGraphConfig, on_ready: Callable[[asyncio.Server], None] | None = None
+) -> None:
+    """Run until SIGINT/SIGTERM, flushing dirty students every ``flush_interval_seconds``."""
+    service = TutorService(config)
+    server = await start_server(service)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):  # pragma: no cover - non-main thread
+            pass
+
+    async def flush_periodically() -> None:
+        while True:
+            await asyncio.sleep(config.service.flush_interval_seconds)
+            await loop.run_in_executor(None, service.flush)
+
+    flusher = asyncio.create_task(flush_periodically())
+    if on_ready is not None:
+        on_ready(server)
+    try:
+        await stop.wait()
+    finally:
+        flusher.cancel()
+        server.close()
+        await server.wait_closed()
+        service.close()
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import json
+import queue
+import sqlite3
+import sys
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from .graph import ConceptGraph, graph_from_dict
+from .storage import ChangeTracker, StaleStudentError, StudentStore, find_tracker
+from .student import ConceptState, ReviewState, StudentState, epoch_us, utc_now
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    student_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    forgetting_lambda REAL NOT NULL,
+    mastery_learning_rate REAL NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS concepts (
+    student_id TEXT NOT NULL REFERENCES students (student_id) ON DELETE CASCADE,
+    concept TEXT NOT NULL,
+    mastery REAL NOT NULL,
+    updated_us INTEGER NOT NULL,
+    repetitions INTEGER NOT NULL,
+    interval_days INTEGER NOT NULL,
+    ease_factor REAL NOT NULL,
+    due_us INTEGER,
+    UNIQUE (student_id, concept)
+);
+CREATE INDEX IF NOT EXISTS concepts_due ON concepts (concept, due_us);
+CREATE INDEX IF NOT EXISTS concepts_mastery ON concepts (concept, mastery);
+CREATE TABLE IF NOT EXISTS graph (id INTEGER PRIMARY KEY CHECK (id = 0), payload TEXT NOT NULL);
+"""
+
+_UPSERT_STUDENT = """
+INSERT INTO students (student_id, name, forgetting_lambda, mastery_learning_rate, version)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (student_id) DO UPDATE SET
+    name = excluded.name,
+    forgetting_lambda = excluded.forgetting_lambda,
+    mastery_learning_rate = excluded.mastery_learning_rate,
+    version = excluded.version
+"""
+
+_UPSERT_CONCEPT = """
+INSERT INTO concepts (
+    student_id, concept, mastery, updated_us, repetitions, interval_days, ease_factor, due_us
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (student_id, concept) DO UPDATE SET
+    mastery = excluded.mastery,
+    updated_us = excluded.updated_us,
+    repetitions = excluded.repetitions,
+    interval_days = excluded.interval_days,
+    ease_factor = excluded.ease_factor,
+    due_us = excluded.due_us
+"""
+
+
+class ConnectionPool:
+    """Connections to one SQLite file, reused across calls and threads.
+
+    Connections are opened on demand; up to ``size`` idle ones are kept.
+    Every connection runs in WAL mode, so readers never block the writer.
+    """
+
+    def __init__(self, path: str | Path, size: int = 4):
+        self.path = Path(path)
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue(maxsize=size)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class SqliteStudentStore(StudentStore):
+    """Students in one SQLite database, one row per student-concept pair.
+
+    Indexes on ``(concept, due_us)`` and ``(concept, mastery)`` turn
+    cross-student questions (``students_due``, ``students_below``) into
+    range scans. ``save`` writes only the concepts touched since the student
+    was loaded; saves inside ``batch()`` share one transaction. Each save
+    bumps the student's ``version``, which later saves of older copies check.
+    """
+
+    def __init__(self, path: str | Path, pool_size: int = 4):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.pool = ConnectionPool(self.path, pool_size)
+        self._local = threading.local()
+        with self.pool.connection() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(students)")}
+            if "version" not in columns:  # database created before versions existed
+                conn.execute("ALTER TABLE students ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = getattr(self._local, "batch", None)
+        if conn is not None:
+            yield conn
+        else:
+            with self.pool.connection() as conn:
+                yield conn
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        if getattr(self._local, "batch", None) is not None:
+            yield  # already inside a batch on this thread
+            return
+        with self.pool.connection() as conn, _transaction(conn):
+            self._local.batch = conn
+            try:
+                yield
+            finally:
+                self._local.batch = None
+
+    @contextmanager
+    def locked(self, student_id: str) -> Iterator[None]:
+        # SQLite has one writer at a time anyway; holding the write transaction
+        # from load to save makes the whole update atomic.
+        with self.batch():
+            yield
+
+    def load(self, student_id: str) -> StudentState:
+        # One read transaction, so the profile and concepts come from one snapshot.
+        with self._connection() as conn, _transaction(conn, "DEFERRED"):
+            profile = conn.execute(
+                "SELECT name, forgetting_lambda, mastery_learning_rate, version FROM students "
+                "WHERE student_id = ?",
+                (student_id,),
+            ).fetchone()
+            if profile is None:
+                raise FileNotFoundError(f"No student '{student_id}' in {self.path}")
+            rows = conn.execute(
+                "SELECT concept, mastery, updated_us, repetitions, interval_days, ease_factor, "
+                "due_us FROM concepts WHERE student_id = ? ORDER BY rowid",
+                (student_id,),
+            ).fetchall()
+        student = StudentState(
+            student_id=student_id,
+            name=profile[0],
+            forgetting_lambda=profile[1],
+            mastery_learning_rate=profile[2],
+            concepts={
+                sys.intern(name): ConceptState(
+                    mastery, updated_us, ReviewState(repetitions, interval, ease, due_us)
+                )
+                for name, mastery, updated_us, repetitions, interval, ease, due_us in rows
+            },
+        )
+        student._watchers.append(ChangeTracker(student, owner=self.path))
+        student._revision = (self.path, profile[3])
+        return student
+
+    def save(self, student: StudentState) -> None:
+        """Write ``student``'s changed concepts.
+
+        Raises ``StaleStudentError`` if it was loaded from this database and
+        has been saved since; other copies are written unconditionally.
+        """
+        student_id = student.student_id
+        concepts = student.concepts
+        tracker = find_tracker(student, self.path)
+        with self._connection() as conn, _transaction(conn):
+            row = conn.execute(
+                "SELECT version FROM students WHERE student_id = ?", (student_id,)
+            ).fetchone()
+            version = None if row is None else row[0]
+            loaded = student._revision
+            if loaded is not None and loaded[0] == self.path and loaded[1] != version:
+                raise StaleStudentError(
+                    f"Student '{student_id}' was changed by another writer since it was loaded."
+                )
+            version = (version or 0) + 1
+            conn.execute(
+                _UPSERT_STUDENT,
+                (
+                    student_id,
+                    student.name,
+                    student.forgetting_lambda,
+                    student.mastery_learning_rate,
+                    version,
+                ),
+            )
+            if tracker is None:
+                conn.execute("DELETE FROM concepts WHERE student_id = ?", (student_id,))
+                names = list(concepts)
+            else:
+                names = list(tracker.changes().get("concepts", ()))
+                conn.executemany(
+                    "DELETE FROM concepts WHERE student_id = ? AND concept = ?",
+                    [(student_id, name) for name in tracker.removed()],
+                )
+            conn.executemany(_UPSERT_CONCEPT, [_row(student_id, n, concepts[n]) for n in names])
+        if tracker is None:
+            tracker = ChangeTracker(student, owner=self.path)
+            student._watchers.append(tracker)
+        tracker.reset()
+        student._revision = (self.path, version)
+
+    def student_ids(self) -> list[str]:
+        with self._connection() as conn:
+            rows = conn.execute("SELECT student_id FROM students ORDER BY student_id")
+            return [student_id for (student_id,) in rows]
+
+    def students_due(self, concept: str, now: datetime | None = None) -> list[str]:
+        bound = epoch_us(now or utc_now())
+        with self._connection() as conn:
+            # Two range scans on ``concepts_due``; an OR would fall back to a full scan.
+            rows = conn.execute(
+                "SELECT student_id FROM concepts WHERE concept = ? AND due_us <= ? "
+                "UNION ALL "
+                "SELECT student_id FROM concepts WHERE concept = ? AND due_us IS NULL",
+                (concept, bound, concept),
+            )
+            return sorted(student_id for (student_id,) in rows)
+
+    def students_below(self, concept: str, threshold: float) -> list[str]:
+        """Ids of students whose mastery of ``concept`` is below ``threshold``."""
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT student_id FROM concepts WHERE concept = ? AND mastery < ?",
+                (concept, threshold),
+            )
+            return sorted(student_id for (student_id,) in rows)
+
+    def save_graph(self, graph: ConceptGraph) -> None:
+        with self._connection() as conn, _transaction(conn):
+            conn.execute(
+                "INSERT OR REPLACE INTO graph (id, payload) VALUES (0, ?)",
+                (json.dumps(graph.to_dict()),),
+            )
+
+    def load_graph(self) -> ConceptGraph | None:
+        with self._connection() as conn:
+            row = conn.execute("SELECT payload FROM graph WHERE id = 0").fetchone()
+        return None if row is None else graph_from_dict(json.loads(row[0]))
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+@contextmanager
+def _transaction(conn: sqlite3.Connection, mode: str = "IMMEDIATE") -> Iterator[None]:
+    if conn.in_transaction:
+        yield  # joined the enclosing batch; it commits
+        return
+    conn.execute(f"BEGIN {mode}")
+    try:
+        yield
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _row(student_id: str, name: str, state: ConceptState) -> tuple:
+    reviews = state.reviews
+    return (
+        student_id,
+        name,
+        state.mastery,
+        state.updated_us,
+        reviews.repetitions,
+        reviews.interval_days,
+        reviews.ease_factor,
+        reviews.due_us,
+    )
@@ -0,0 +1,577 @@
+from __future__ import annotations
+
+import json
+import os
+import zlib
+from collections.abc import Iterable, Iterator
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .config import SkillGraphConfig
+from .fsutil import atomic_write, file_lock, fingerprint
+from .graph import ConceptGraph, load_graph
+from .packed import load_packed, save_packed
+from .scheduler import is_due
+from .student import (
+    StudentState,
+    concept_from_dict,
+    concept_to_dict,
+    load_student,
+    save_student,
+    utc_now,
+)
+
+# Per-student locks share this many lock files per store.
+_LOCK_STRIPES = 256
+
+
+class StaleStudentError(RuntimeError):
+    """The stored student changed after this copy was loaded; reload and retry."""
+
+
+def _stripe_lock(root: Path, student_id: str) -> Path:
+    # Ids share a fixed set of lock files so locking never adds a file per student.
+    stripe = zlib.crc32(student_id.encode("utf-8")) % _LOCK_STRIPES
+    return root / ".locks" / f"{stripe:03x}.lock"
+
+
+class StudentStore:
+    """Persistence backend for student profiles inside a workspace."""
+
+    def load(self, student_id: str) -> StudentState:
+        raise NotImplementedError
+
+    def save(self, student: StudentState) -> None:
+        raise NotImplementedError
+
+    def student_ids(self) -> list[str]:
+        raise NotImplementedError
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Group several saves; transactional backends commit them together."""
+        yield
+
+    @contextmanager
+    def locked(self, student_id: str) -> Iterator[None]:
+        """Exclude other writers of ``student_id`` (across processes) for a load-modify-save."""
+        yield
+
+    def save_graph(self, graph: ConceptGraph) -> None:
+        """Keep a copy of the concept graph with the students (if the backend can)."""
+
+    def load_graph(self) -> ConceptGraph | None:
+        return None
+
+    def students_due(self, concept: str, now: datetime | None = None) -> list[str]:
+        """Ids of students whose review of ``concept`` is due at ``now``.
+
+        Scans every profile; indexed backends override this with a query.
+        """
+        now = now or utc_now()
+        due = []
+        for student_id in self.student_ids():
+            state = self.load(student_id).concepts.get(concept)
+            if state is not None and is_due(state, now):
+                due.append(student_id)
+        return due
+
+
+class ShardLayout:
+    """Where per-student files live under ``root``.
+
+    With ``levels=0`` files sit directly in ``root`` (the original layout).
+    Otherwise each level adds one directory chosen by hashing the student id
+    into ``fanout`` buckets, e.g. ``root/3f/a2/<id>.json`` for two levels of
+    256, so no directory grows past ``students / fanout**levels`` entries.
+    """
+
+    def __init__(self, root: str | Path, suffix: str, levels: int = 0, fanout: int = 256):
+        if levels < 0 or fanout < 2:
+            raise ValueError("shard_levels must be >= 0 and shard_fanout >= 2")
+        self.root = Path(root)
+        self.suffix = suffix
+        self.levels = levels
+        self.fanout = fanout
+        self._width = len(f"{fanout - 1:x}")
+
+    def path(self, student_id: str) -> Path:
+        if not self.levels:
+            return self.root / f"{student_id}{self.suffix}"
+        from hashlib import blake2b  # only sharded layouts pay for the import
+
+        bucket = int.from_bytes(blake2b(student_id.encode("utf-8")).digest()[:8], "big")
+        parts = []
+        for _ in range(self.levels):
+            bucket, shard = divmod(bucket, self.fanout)
+            parts.append(f"{shard:0{self._width}x}")
+        return self.root.joinpath(*parts, f"{student_id}{self.suffix}")
+
+    def scan(self) -> Iterator[Path]:
+        """Every student file under ``root``, whatever layout wrote it."""
+        if self.root.exists():
+            yield from self.root.rglob(f"*{self.suffix}")
+
+
+class Manifest:
+    """Index of student files: id, relative path, mtime and size.
+
+    Stored as JSON lines where the last entry for an id wins. ``record``
+    appends one line per save (a single ``O_APPEND`` write), so listing a
+    cohort reads one file instead of walking the shard directories. The log
+    is folded into one line per student once it holds twice that many.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def record(self, student_id: str, relative: str, stat: os.stat_result) -> None:
+        entry = {"id": student_id, "path": relative, "mtime": stat.st_mtime, "size": stat.st_size}
+        line = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+        # Appends are atomic on their own; the lock only keeps them out of a rewrite.
+        with file_lock(self._lock):
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+    def entries(self) -> dict[str, dict]:
+        entries, lines = self._fold()
+        if lines > 2 * len(entries) + 1000:
+            with file_lock(self._lock):
+                # Re-read under the lock so appends made meanwhile survive the rewrite.
+                entries, _ = self._fold()
+                self.write(entries.values())
+        return entries
+
+    def write(self, entries) -> None:
+        text = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries)
+        with file_lock(self._lock):
+            atomic_write(self.path, text, fsync=False)
+
+    @property
+    def _lock(self) -> Path:
+        return self.path.with_name(f".{self.path.name}.lock")
+
+    def _fold(self) -> tuple[dict[str, dict], int]:
+        entries: dict[str, dict] = {}
+        lines = 0
+        with self.path.open(encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn line from an interrupted append
+                entries[entry["id"]] = entry
+                lines += 1
+        return entries, lines
+
+
+class FileStudentStore(StudentStore):
+    """One file per student, laid out by :class:`ShardLayout` and indexed by a manifest."""
+
+    suffix = ""
+
+    def __init__(
+        self,
+        root: str | Path,
+        shard_levels: int = 0,
+        shard_fanout: int = 256,
+        fsync: bool = True,
+    ):
+        self.root = Path(root)
+        self.layout = ShardLayout(self.root, self.suffix, shard_levels, shard_fanout)
+        self.manifest = Manifest(self.root / "manifest.jsonl")
+        self.fsync = fsync
+
+    def path(self, student_id: str) -> Path:
+        return self.layout.path(student_id)
+
+    def lock_path(self, student_id: str) -> Path:
+        return _stripe_lock(self.root, student_id)
+
+    @contextmanager
+    def locked(self, student_id: str) -> Iterator[None]:
+        with file_lock(self.lock_path(student_id)):
+            yield
+
+    def load(self, student_id: str) -> StudentState:
+        path = self.path(student_id)
+        # Fingerprint before reading: a rewrite in between then fails the save's
+        # check instead of slipping past it.
+        revision = fingerprint(path)
+        student = self._read(path)
+        student._revision = (path, revision)
+        return student
+
+    def save(self, student: StudentState) -> None:
+        """Atomically write ``student``.
+
+        Raises ``StaleStudentError`` if it was loaded from this file and the
+        file has been rewritten since; other copies are written unconditionally.
+        """
+        target = self.path(student.student_id)
+        with self.locked(student.student_id):
+            loaded = student._revision
+            if loaded is not None and loaded[0] == target and fingerprint(target) != loaded[1]:
+                raise StaleStudentError(
+                    f"Student '{student.student_id}' was changed by another writer since it "
+                    "was loaded."
+                )
+            self._write(target, student)
+            stat = target.stat()
+            student._revision = (target, (stat.st_ino, stat.st_mtime_ns, stat.st_size))
+        if self.manifest.exists():
+            self.manifest.record(student.student_id, target.relative_to(self.root).as_posix(), stat)
+        else:
+            self.reindex()  # first save into a workspace written before the manifest existed
+
+    def student_ids(self) -> list[str]:
+        if not self.root.exists():
+            return []
+        if not self.manifest.exists():
+            self.reindex()  # workspace written before the manifest existed
+        return sorted(self.manifest.entries())
+
+    def reindex(self) -> int:
+        """Rebuild the manifest from the files on disk; returns the student count."""
+        # Held across the scan so a save recorded meanwhile is not overwritten.
+        with file_lock(self.manifest._lock):
+            entries = [self._entry(path) for path in self.layout.scan()]
+            self.manifest.write(sorted(entries, key=lambda entry: entry["id"]))
+        return len(entries)
+
+    def rebalance(self) -> int:
+        """Move every student file to its place in the current layout, then reindex."""
+        for source in list(self.layout.scan()):
+            target = self.path(source.name.removesuffix(self.suffix))
+            if source != target:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(source, target)
+        for directory in sorted(self.root.rglob("*"), reverse=True):
+            if directory.is_dir() and not any(directory.iterdir()):
+                directory.rmdir()  # shard directories left empty by the move
+        return self.reindex()
+
+    def _entry(self, path: Path) -> dict:
+        stat = path.stat()
+        return {
+            "id": path.name.removesuffix(self.suffix),
+            "path": path.relative_to(self.root).as_posix(),
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+        }
+
+    def _read(self, path: Path) -> StudentState:
+        raise NotImplementedError
+
+    def _write(self, path: Path, student: StudentState) -> None:
+        raise NotImplementedError
+
+
+class JsonStudentStore(FileStudentStore):
+    """One pretty-printed JSON file per student under ``<workspace>/students``."""
+
+    suffix = ".json"
+
+    def _read(self, path: Path) -> StudentState:
+        return load_student(path)
+
+    def _write(self, path: Path, student: StudentState) -> None:
+        save_student(path, student, fsync=self.fsync)
+
+
+class CohortStudentStore(StudentStore):
+    """Students as rows of a memory-mapped :class:`~skillgraph_tutor.cohort.CohortStore`."""
+
+    def __init__(self, root: str | Path):
+        from .cohort import CohortStore
+
+        self.cohort = CohortStore.open(root)
+
+    @contextmanager
+    def locked(self, student_id: str) -> Iterator[None]:
+        # The shared store lock keeps the arrays from being regrown mid-update.
+        with file_lock(_stripe_lock(self.cohort.root, student_id)), self.cohort.synced():
+            yield
+
+    @contextmanager
+    def locked_many(self, student_ids: Iterable[str]) -> Iterator[None]:
+        """``locked`` for a batch update of several students."""
+        # Stripes are taken in one order, so two batches cannot deadlock.
+        with ExitStack() as stack:
+            for path in sorted({_stripe_lock(self.cohort.root, sid) for sid in student_ids}):
+                stack.enter_context(file_lock(path))
+            stack.enter_context(self.cohort.synced())
+            yield
+
+    def load(self, student_id: str) -> StudentState:
+        return self.cohort.student(student_id)
+
+    def save(self, student: StudentState) -> None:
+        from .cohort import CohortRow
+
+        # A student loaded through another handle on the same store is saved
+        # through that handle so its view of the concept columns stays in sync.
+        concepts = student.concepts
+        if isinstance(concepts, CohortRow) and concepts.store.root == self.cohort.root:
+            concepts.store.save_student(student)
+        else:
+            self.cohort.save_student(student)
+
+    def student_ids(self) -> list[str]:
+        return self.cohort.student_ids()
+
+
+class PackedStudentStore(FileStudentStore):
+    """One compact binary file per student; see :mod:`skillgraph_tutor.packed`.
+
+    Loading decodes only the profile and concept names. Each concept is
+    decoded on first access, and untouched concepts are saved byte for byte.
+    """
+
+    suffix = ".sgb"
+
+    def _read(self, path: Path) -> StudentState:
+        return load_packed(path)
+
+    def _write(self, path: Path, student: StudentState) -> None:
+        save_packed(path, student, fsync=self.fsync)
+
+
+class ChangeTracker:
+    """Student watcher recording which concepts changed since load or last save.
+
+    ``owner`` identifies the store location the baseline was read from, so a
+    student loaded from one store and saved to another is written in full.
+    """
+
+    def __init__(self, student: StudentState, logged: int = 0, owner: object = None):
+        self.student = student
+        self.logged = logged  # events appended since the last snapshot
+        self.owner = owner
+        self.reset()
+
+    def touch(self, name: str) -> None:
+        if name not in self._baseline:
+            state = self.student.concepts.get(name) if name in self._known else None
+            self._baseline[name] = None if state is None else concept_to_dict(state)
+
+    def profile(self) -> dict:
+        return {
+            "name": self.student.name,
+            "forgetting_lambda": self.student.forgetting_lambda,
+            "mastery_learning_rate": self.student.mastery_learning_rate,
+        }
+
+    def changes(self) -> dict:
+        event: dict = {}
+        if (profile := self.profile()) != self._profile:
+            event["profile"] = profile
+        concepts = {}
+        for name, before in self._baseline.items():
+            state = self.student.concepts.get(name)
+            if state is not None and (after := concept_to_dict(state)) != before:
+                concepts[name] = after
+        if concepts:
+            event["concepts"] = concepts
+        return event
+
+    def removed(self) -> list[str]:
+        """Concepts present at the baseline that have since been deleted."""
+        return [name for name in self._known if name not in self.student.concepts]
+
+    def reset(self) -> None:
+        self._known = set(self.student.concepts)
+        self._baseline: dict[str, dict | None] = {}
+        self._profile = self.profile()
+
+
+class EventLogStudentStore(StudentStore):
+    """Snapshot plus append-only event log per student.
+
+    ``save`` appends one compact JSON line holding only the concepts changed
+    since the student was loaded, so write cost per event does not grow with
+    the profile. Every ``compact_after`` events the log is folded into a new
+    snapshot. Events carry resulting states, so replay is idempotent and the
+    log doubles as the student's recent history.
+    """
+
+    def __init__(self, root: str | Path, compact_after: int = 200):
+        self.root = Path(root)
+        self.compact_after = compact_after
+
+    def snapshot_path(self, student_id: str) -> Path:
+        return self.root / f"{student_id}.snapshot.json"
+
+    def log_path(self, student_id: str) -> Path:
+        return self.root / f"{student_id}.events.jsonl"
+
+    def load(self, student_id: str) -> StudentState:
+        # Taken before reading, so a save or compaction in between fails the
+        # save's check instead of slipping past it.
+        revision = self._revision(student_id)
+        student = load_student(self.snapshot_path(student_id))
+        logged = 0
+        for event in self.events(student_id):
+            _apply_event(student, event)
+            logged += 1
+        student._watchers.append(ChangeTracker(student, logged, owner=self.root))
+        student._revision = (self.root, revision)
+        return student
+
+    @contextmanager
+    def locked(self, student_id: str) -> Iterator[None]:
+        with file_lock(_stripe_lock(self.root, student_id)):
+            yield
+
+    def save(self, student: StudentState) -> None:
+        """Append ``student``'s changes (or write a snapshot).
+
+        Raises ``StaleStudentError`` if it was loaded from this store and its
+        snapshot or log has changed since; other copies are written unconditionally.
+        """
+        student_id = student.student_id
+        with self.locked(student_id):
+            loaded = student._revision
+            if loaded is not None and loaded[0] == self.root:
+                if self._revision(student_id) != loaded[1]:
+                    raise StaleStudentError(
+                        f"Student '{student_id}' was changed by another writer since it was loaded."
+                    )
+            self._save(student)
+            student._revision = (self.root, self._revision(student_id))
+
+    def _save(self, student: StudentState) -> None:
+        tracker = find_tracker(student, self.root)
+        if tracker is None:
+            tracker = ChangeTracker(student, owner=self.root)
+            student._watchers.append(tracker)
+            self._compact(student, tracker)
+        elif not self.snapshot_path(student.student_id).exists():
+            self._compact(student, tracker)
+        elif event := tracker.changes():
+            event["ts"] = datetime.now(timezone.utc).isoformat()
+            # One O_APPEND write per event keeps concurrent appenders from interleaving.
+            line = (json.dumps(event, separators=(",", ":")) + "\n").encode("utf-8")
+            fd = os.open(self.log_path(student.student_id), os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+            tracker.logged += 1
+            if tracker.logged >= self.compact_after:
+                self._compact(student, tracker)
+        tracker.reset()
+
+    def events(self, student_id: str) -> Iterator[dict]:
+        """Events logged since the last snapshot, oldest first."""
+        log = self.log_path(student_id)
+        if not log.exists():
+            return
+        with log.open(encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    return  # torn final line from an interrupted write
+
+    def student_ids(self) -> list[str]:
+        if not self.root.exists():
+            return []
+        return sorted(
+            path.name.removesuffix(".snapshot.json") for path in self.root.glob("*.snapshot.json")
+        )
+
+    def _revision(self, student_id: str) -> tuple:
+        # Compaction replaces the snapshot and every save grows the log (appends only).
+        try:
+            logged = self.log_path(student_id).stat().st_size
+        except FileNotFoundError:
+            logged = 0
+        return fingerprint(self.snapshot_path(student_id)), logged
+
+    def _compact(self, student: StudentState, tracker: ChangeTracker) -> None:
+        snapshot = self.snapshot_path(student.student_id)
+        atomic_write(snapshot, json.dumps(student.to_dict(), separators=(",", ":")))
+        self.log_path(student.student_id).unlink(missing_ok=True)
+        tracker.logged = 0
+
+
+def find_tracker(student: StudentState, owner: object) -> ChangeTracker | None:
+    return next(
+        (w for w in student._watchers if isinstance(w, ChangeTracker) and w.owner == owner), None
+    )
+
+
+def _apply_event(student: StudentState, event: dict) -> None:
+    profile = event.get("profile", {})
+    student.name = profile.get("name", student.name)
+    student.forgetting_lambda = profile.get("forgetting_lambda", student.forgetting_lambda)
+    student.mastery_learning_rate = profile.get(
+        "mastery_learning_rate", student.mastery_learning_rate
+    )
+    for name, raw in event.get("concepts", {}).items():
+        student.concepts[name] = concept_from_dict(raw)
+
+
+def open_student_store(
+    workspace: str | Path,
+    backend: str = "json",
+    compact_after_events: int = 200,
+    shard_levels: int = 0,
+    shard_fanout: int = 256,
+    fsync: bool = True,
+) -> StudentStore:
+    root = Path(workspace)
+    if backend == "json":
+        return JsonStudentStore(root / "students", shard_levels, shard_fanout, fsync)
+    if backend == "binary":
+        return PackedStudentStore(root / "packed", shard_levels, shard_fanout, fsync)
+    if backend == "cohort":
+        return CohortStudentStore(root / "cohort")
+    if backend == "eventlog":
+        return EventLogStudentStore(root / "events", compact_after=compact_after_events)
+    if backend == "sqlite":
+        from .sqlstore import SqliteStudentStore
+
+        return SqliteStudentStore(root / "students.sqlite3")
+    raise ValueError(
+        f"Unknown storage backend '{backend}' (expected json|binary|cohort|eventlog|sqlite)"
+    )
+
+
+def open_configured_store(config: SkillGraphConfig, backend: str | None = None) -> StudentStore:
+    """The workspace store described by ``config`` (``backend`` overrides its choice)."""
+    storage = config.storage
+    return open_student_store(
+        config.data_dir,
+        backend=backend or storage.backend,
+        compact_after_events=storage.compact_after_events,
+        shard_levels=storage.shard_levels,
+        shard_fanout=storage.shard_fanout,
+        fsync=storage.fsync_writes,
+    )
+
+
+def migrate_students(source: StudentStore, target: StudentStore) -> int:
+    """Copy every student from ``source`` into ``target``; returns the number copied."""
+    count = 0
+    with target.batch():
+        for student_id in source.student_ids():
+            target.save(source.load(student_id))
+            count += 1
+    return count
+
+
+def load_workspace_graph(
+    config: SkillGraphConfig, store: StudentStore | None = None
+) -> ConceptGraph:
+    """The concept graph kept by the student store (e.g. SQLite), else ``graph.json``."""
+    graph = (store or open_configured_store(config)).load_graph()
+    return graph if graph is not None else load_graph(Path(config.data_dir) / "graph.json")
@@ -1,29 +1,108 @@
 from __future__ import annotations
 
+import copy
 import json
 import math
-from dataclasses import asdict, dataclass, field
-from datetime import datetime, timezone
+import sys
+from collections.abc import Iterator, Mapping, MutableMapping
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
+
+from .fsutil import atomic_write
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
 
 
 def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
-@dataclass
+# Timestamps are held as integer epoch microseconds: exact like ``datetime``
+# arithmetic (so results match the ISO-string model bit for bit) but without
+# parsing or formatting on every update. ISO strings appear only in
+# ``to_dict``/``from_dict`` and the ``*_at`` compatibility properties.
+@lru_cache(maxsize=64)  # callers pass the same ``now`` for a whole batch of concepts
+def epoch_us(moment: datetime) -> int:
+    """Epoch microseconds for ``moment``; naive datetimes are taken as UTC."""
+    return _epoch_us(moment)
+
+
+def _epoch_us(moment: datetime) -> int:
+    # Uncached, for values that rarely repeat (parsed timestamps, fresh ``now``s).
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    delta = moment - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def parse_epoch_us(value: str) -> int:
+    return _epoch_us(datetime.fromisoformat(value))
+
+
+def format_epoch_us(value: int) -> str:
+    return (_EPOCH + timedelta(microseconds=value)).isoformat()
+
+
+@dataclass(slots=True, init=False)
 class ReviewState:
-    repetitions: int = 0
-    interval_days: int = 0
-    ease_factor: float = 2.5
-    due_at: str | None = None
+    repetitions: int
+    interval_days: int
+    ease_factor: float
+    due_us: int | None  # None: never scheduled, i.e. due now
 
+    def __init__(
+        self,
+        repetitions: int = 0,
+        interval_days: int = 0,
+        ease_factor: float = 2.5,
+        due_us: int | None = None,
+        *,
+        due_at: str | None = None,  # ISO form, as accepted before timestamps were integers
+    ):
+        self.repetitions = repetitions
+        self.interval_days = interval_days
+        self.ease_factor = ease_factor
+        self.due_us = due_us if due_at is None else parse_epoch_us(due_at)
 
-@dataclass
+    @property
+    def due_at(self) -> str | None:
+        return None if self.due_us is None else format_epoch_us(self.due_us)
+
+    @due_at.setter
+    def due_at(self, value: str | None) -> None:
+        self.due_us = None if value is None else parse_epoch_us(value)
+
+
+@dataclass(slots=True, init=False)
 class ConceptState:
-    mastery: float = 0.2
-    updated_at: str = field(default_factory=lambda: utc_now().isoformat())
-    reviews: ReviewState = field(default_factory=ReviewState)
+    mastery: float
+    updated_us: int
+    reviews: ReviewState
+
+    def __init__(
+        self,
+        mastery: float = 0.2,
+        updated_us: int | None = None,
+        reviews: ReviewState | None = None,
+        *,
+        updated_at: str | None = None,  # ISO form, as accepted before timestamps were integers
+    ):
+        self.mastery = mastery
+        if updated_at is not None:
+            updated_us = parse_epoch_us(updated_at)
+        self.updated_us = _epoch_us(utc_now()) if updated_us is None else updated_us
+        self.reviews = ReviewState() if reviews is None else reviews
+
+    @property
+    def updated_at(self) -> str:
+        return format_epoch_us(self.updated_us)
+
+    @updated_at.setter
+    def updated_at(self, value: str) -> None:
+        self.updated_us = parse_epoch_us(value)
 
 
 @dataclass
@@ -33,20 +112,49 @@ class StudentState:
     forgetting_lambda: float = 0.02
     mastery_learning_rate: float = 0.18
     concepts: dict[str, ConceptState] = field(default_factory=dict)
+    # Derived indexes (e.g. ``scheduler.ReviewIndex``) notified via ``touch(name)``
+    # whenever a concept is handed out for reading or mutation.
+    _watchers: list = field(default_factory=list, init=False, repr=False, compare=False)
+    # (path, fingerprint) of the stored copy this state was loaded from; file stores
+    # refuse to save over a copy that has changed since (see ``storage.StaleStudentError``).
+    _revision: tuple | None = field(default=None, init=False, repr=False, compare=False)
 
     def concept(self, name: str) -> ConceptState:
         if name not in self.concepts:
             self.concepts[name] = ConceptState()
+        for watcher in self._watchers:
+            watcher.touch(name)
         return self.concepts[name]
 
+    def __deepcopy__(self, memo) -> StudentState:
+        # Watchers are derived indexes; copies rebuild their own on first use.
+        clone = copy.copy(self)
+        memo[id(self)] = clone
+        clone.concepts = copy.deepcopy(self.concepts, memo)
+        clone._watchers = []
+        return clone
+
+    def simulate(self) -> StudentState:
+        """Copy-on-write view for what-if planning; this student is never modified.
+
+        Only concepts handed out by ``concept()`` on the view are copied, so
+        starting a simulation costs O(1) instead of a deepcopy of every concept.
+        """
+        return SimulatedStudent(
+            student_id=self.student_id,
+            name=self.name,
+            forgetting_lambda=self.forgetting_lambda,
+            mastery_learning_rate=self.mastery_learning_rate,
+            concepts=ConceptOverlay(self.concepts),
+        )
+
     def apply_forgetting(self, concept: str, now: datetime | None = None) -> float:
-        now = now or utc_now()
+        now_us = epoch_us(now or utc_now())
         c = self.concept(concept)
-        past = datetime.fromisoformat(c.updated_at)
-        delta_days = max((now - past).total_seconds() / 86400, 0)
+        delta_days = max((now_us - c.updated_us) / 1_000_000 / 86400, 0)
         decayed = c.mastery * math.exp(-self.forgetting_lambda * delta_days)
         c.mastery = float(max(0.0, min(1.0, decayed)))
-        c.updated_at = now.isoformat()
+        c.updated_us = now_us
         return c.mastery
 
     def update_mastery(
@@ -57,7 +165,7 @@ class StudentState:
         c = self.concept(concept)
         signal = (1.0 if correct else -1.0) * max(0.0, min(1.0, confidence))
         c.mastery = float(max(0.0, min(1.0, c.mastery + self.mastery_learning_rate * signal)))
-        c.updated_at = now.isoformat()
+        c.updated_us = epoch_us(now)
         return c.mastery
 
     def to_dict(self) -> dict:
@@ -66,27 +174,17 @@ class StudentState:
             "name": self.name,
             "forgetting_lambda": self.forgetting_lambda,
             "mastery_learning_rate": self.mastery_learning_rate,
-            "concepts": {
-                name: {
-                    "mastery": state.mastery,
-                    "updated_at": state.updated_at,
-                    "reviews": asdict(state.reviews),
-                }
-                for name, state in self.concepts.items()
-            },
+            "concepts": {name: concept_to_dict(state) for name, state in self.concepts.items()},
         }
 
     @classmethod
     def from_dict(cls, data: dict) -> StudentState:
         default_state = ConceptState()
-        concepts: dict[str, ConceptState] = {}
-        for name, raw in data.get("concepts", {}).items():
-            reviews = ReviewState(**raw.get("reviews", {}))
-            concepts[name] = ConceptState(
-                mastery=raw.get("mastery", default_state.mastery),
-                updated_at=raw.get("updated_at", default_state.updated_at),
-                reviews=reviews,
-            )
+        # Interned names share one string per concept across every loaded student.
+        concepts = {
+            sys.intern(name): concept_from_dict(raw, default_state)
+            for name, raw in data.get("concepts", {}).items()
+        }
         return cls(
             student_id=data["student_id"],
             name=data["name"],
@@ -96,10 +194,132 @@ class StudentState:
         )
 
 
-def save_student(path: str | Path, student: StudentState) -> None:
-    target = Path(path)
-    target.parent.mkdir(parents=True, exist_ok=True)
-    target.write_text(json.dumps(student.to_dict(), indent=2), encoding="utf-8")
+class ConceptOverlay(MutableMapping):
+    """Read-through view of ``base`` that keeps every write in ``changes``."""
+
+    def __init__(self, base: Mapping[str, ConceptState]):
+        self.base = base
+        self.changes: dict[str, ConceptState] = {}
+        self._added = 0  # names in ``changes`` that ``base`` lacks
+
+    def __getitem__(self, name: str) -> ConceptState:
+        state = self.changes.get(name)
+        return self.base[name] if state is None else state
+
+    def __setitem__(self, name: str, state: ConceptState) -> None:
+        if name not in self.changes and name not in self.base:
+            self._added += 1
+        self.changes[name] = state
+
+    def __delitem__(self, name: str) -> None:
+        if name in self.base:
+            raise TypeError(f"Cannot remove concept '{name}' from a simulation")
+        del self.changes[name]
+        self._added -= 1
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.changes or name in self.base
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.base
+        yield from (name for name in self.changes if name not in self.base)
+
+    def __len__(self) -> int:
+        return len(self.base) + self._added
+
+    def fork(self) -> ConceptOverlay:
+        """Sibling overlay on the same base, starting from a copy of these changes."""
+        forked = ConceptOverlay(self.base)
+        forked.changes = dict(self.changes)
+        forked._added = self._added
+        return forked
+
+
+@dataclass
+class SimulatedStudent(StudentState):
+    """``StudentState`` over a :class:`ConceptOverlay`, returned by ``simulate()``.
+
+    Reads through ``concepts`` may return the base student's objects; changes
+    must go through ``concept()`` (as every model update does), which copies
+    the concept into the overlay first.
+    """
+
+    # Names whose overlay entry this view copied itself and may mutate in place.
+    _owned: set = field(default_factory=set, init=False, repr=False, compare=False)
+
+    def simulate(self) -> StudentState:
+        # Fork flat rather than stacking overlays, so lookups stay O(1) however
+        # long a chain of simulations (e.g. a search over plans) grows.
+        forked = SimulatedStudent(
+            student_id=self.student_id,
+            name=self.name,
+            forgetting_lambda=self.forgetting_lambda,
+            mastery_learning_rate=self.mastery_learning_rate,
+            concepts=self.concepts.fork(),
+        )
+        self._owned.clear()  # the fork shares these entries; copy before the next write
+        return forked
+
+    def concept(self, name: str) -> ConceptState:
+        overlay = self.concepts
+        if name not in self._owned:
+            current = overlay.get(name)
+            overlay[name] = ConceptState() if current is None else _copy_concept(current)
+            self._owned.add(name)
+        for watcher in self._watchers:
+            watcher.touch(name)
+        return overlay.changes[name]
+
+
+def _copy_concept(state: ConceptState) -> ConceptState:
+    reviews = state.reviews
+    return ConceptState(
+        mastery=state.mastery,
+        updated_us=state.updated_us,
+        reviews=ReviewState(
+            repetitions=reviews.repetitions,
+            interval_days=reviews.interval_days,
+            ease_factor=reviews.ease_factor,
+            due_us=reviews.due_us,
+        ),
+    )
+
+
+_NO_REVIEWS: Mapping = MappingProxyType({})
+
+
+def concept_to_dict(state: ConceptState) -> dict:
+    return {
+        "mastery": state.mastery,
+        "updated_at": state.updated_at,
+        "reviews": {
+            "repetitions": state.reviews.repetitions,
+            "interval_days": state.reviews.interval_days,
+            "ease_factor": state.reviews.ease_factor,
+            "due_at": state.reviews.due_at,
+        },
+    }
+
+
+def concept_from_dict(raw: dict, default: ConceptState | None = None) -> ConceptState:
+    default = default or ConceptState()
+    fallback = default.reviews
+    reviews = raw.get("reviews") or _NO_REVIEWS
+    updated_at, due_at = raw.get("updated_at"), reviews.get("due_at")
+    return ConceptState(
+        raw.get("mastery", default.mastery),
+        default.updated_us if updated_at is None else parse_epoch_us(updated_at),
+        ReviewState(
+            reviews.get("repetitions", fallback.repetitions),
+            reviews.get("interval_days", fallback.interval_days),
+            reviews.get("ease_factor", fallback.ease_factor),
+            None if due_at is None else parse_epoch_us(due_at),
+        ),
+    )
+
+
+def save_student(path: str | Path, student: StudentState, fsync: bool = True) -> None:
+    atomic_write(path, json.dumps(student.to_dict(), indent=2), fsync=fsync)
 
 
 def load_student(path: str | Path) -> StudentState:
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path, monkeypatch):
+    # Keep the config cache out of the real ~/.cache/skillgraph.
+    monkeypatch.setenv("SKILLGRAPH_CACHE_DIR", str(tmp_path / "user-cache"))
@@ -0,0 +1,63 @@
+import os
+
+from skillgraph_tutor import cache
+from skillgraph_tutor.cache import load_cached
+from skillgraph_tutor.config import SkillGraphConfig
+from skillgraph_tutor.graph import load_graph, parse_syllabus_markdown
+
+
+def test_load_cached_rebuilds_only_when_content_changes(tmp_path):
+    source = tmp_path / "skillgraph.toml"
+    source.write_text("seed = 1\n", encoding="utf-8")
+    os.utime(source, (1_000_000, 1_000_000))  # well before the entry is written
+    cache = tmp_path / "cache"
+    builds = []
+
+    def build(path):
+        builds.append(path)
+        return SkillGraphConfig.load(path)
+
+    assert load_cached(source, build, cache).seed == 1
+    assert load_cached(source, build, cache).seed == 1
+    os.utime(source)  # touched, same content: hash check, no rebuild
+    assert load_cached(source, build, cache).seed == 1
+    assert len(builds) == 1
+
+    source.write_text("seed = 7\n", encoding="utf-8")
+    assert load_cached(source, build, cache).seed == 7
+    assert len(builds) == 2
+
+    (entry,) = cache.iterdir()
+    entry.write_bytes(b"torn")
+    assert load_cached(source, build, cache).seed == 7
+    assert len(builds) == 3
+    assert load_cached(source, build, None).seed == 7
+    assert len(builds) == 4
+
+
+def test_cached_graph_keeps_compiled_form(tmp_path):
+    graph = parse_syllabus_markdown("## A\n## B\n## C\nrequires: A\n")
+    path = tmp_path / "graph.json"
+    graph.save_json(path)
+    load_cached(path, load_graph, tmp_path / "cache")
+    cached = load_cached(path, load_graph, tmp_path / "cache")
+    assert cached.nodes == graph.nodes
+    assert cached._compiled is not None
+    assert cached.topological_order() == graph.topological_order()
+
+
+def test_cache_evicts_old_and_excess_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "_MAX_ENTRIES", 3)
+    directory = tmp_path / "cache"
+    sources = []
+    for idx in range(5):
+        source = tmp_path / f"config{idx}.toml"
+        source.write_text(f"seed = {idx}\n", encoding="utf-8")
+        load_cached(source, SkillGraphConfig.load, directory)
+        sources.append(source)
+    assert len(list(directory.iterdir())) == 3
+
+    (stale,) = [path for path in directory.iterdir() if path.name.startswith("config2-")]
+    os.utime(stale, (0, 0))
+    load_cached(sources[0], SkillGraphConfig.load, directory)
+    assert not stale.exists()
@@ -1,5 +1,11 @@
+import json
+import pstats
+import subprocess
+import sys
+
 from skillgraph_tutor.cli import app
 from skillgraph_tutor.compat import CliRunner
+from skillgraph_tutor.logging_utils import flush_traces
 
 
 def test_cli_doctor_smoke():
@@ -15,3 +21,79 @@ def test_study_unknown_student_is_user_friendly_error():
     result = runner.invoke(app, ["study", "missing-student", "Variables"])
     assert result.exit_code == 1
     assert "Student with ID 'missing-student' not found" in result.stdout
+
+
+def test_profile_option_records_stages_and_dumps_pstats(tmp_path):
+    config = tmp_path / "skillgraph.toml"
+    config.write_text(
+        f'data_dir = "{(tmp_path / "ws").as_posix()}"\n'
+        f'[logging]\ntrace_path = "{(tmp_path / "traces.jsonl").as_posix()}"\n'
+        f'profile_path = "{(tmp_path / "profile.jsonl").as_posix()}"\n',
+        encoding="utf-8",
+    )
+    runner = CliRunner()
+    cfg = ["--config-path", str(config)]
+    assert (
+        runner.invoke(app, ["init", "data/sample_syllabus.md", "--config", str(config)]).exit_code
+        == 0
+    )
+    assert runner.invoke(app, ["add-student", "s1", "--name", "Ada", *cfg]).exit_code == 0
+    dump = tmp_path / "quiz.pstats"
+    args = ["--profile-dump", str(dump), "quiz", "s1", "Variables", "--correct", *cfg]
+    assert runner.invoke(app, args).exit_code == 0
+    assert runner.invoke(app, ["plan", "s1", *cfg]).exit_code == 0  # not profiled
+    flush_traces()
+
+    (report,) = [json.loads(line) for line in (tmp_path / "profile.jsonl").read_text().splitlines()]
+    assert report["command"] == "quiz"
+    stages = report["stages"]
+    assert stages["cli.apply_quiz"]["calls"] == 1
+    assert stages["cli._save_student"]["calls"] == 1
+    assert {"cli._load_config", "cli._require_student"} <= set(stages)
+    # Inner hot paths are not wrapped; the pstats dump still breaks them down.
+    assert not any(name.startswith(("student.", "scheduler.")) for name in stages)
+    functions = {func for _, _, func in pstats.Stats(str(dump)).stats}
+    assert {"apply_quiz", "update_mastery", "sm2_update"} <= functions
+
+
+def test_cli_import_leaves_command_modules_unloaded():
+    lazy = ["reporting", "eval_harness", "ingest", "horizon", "tutors"]
+    code = (
+        "import sys, skillgraph_tutor.cli; "
+        f"print([m for m in {lazy!r} if 'skillgraph_tutor.' + m in sys.modules])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_unknown_option_is_a_usage_error():
+    runner = CliRunner()
+    for args in (["--bogus", "doctor"], ["doctor", "--bogus"]):
+        result = runner.invoke(app, args)
+        assert result.exit_code == 2
+        assert "No such option: --bogus" in result.output  # stderr under typer
+
+
+def test_legacy_cyclic_graph_is_a_clean_error(tmp_path):
+    workspace = tmp_path / "ws"
+    config = tmp_path / "skillgraph.toml"
+    config.write_text(
+        f'data_dir = "{workspace.as_posix()}"\n'
+        f'[logging]\ntrace_path = "{(tmp_path / "traces.jsonl").as_posix()}"\n',
+        encoding="utf-8",
+    )
+    workspace.mkdir()
+    nodes = [{"name": "A", "requires": ["B"]}, {"name": "B", "requires": ["A"]}, {"name": "C"}]
+    (workspace / "graph.json").write_text(json.dumps({"nodes": nodes}), encoding="utf-8")
+    runner = CliRunner()
+    assert (
+        runner.invoke(
+            app, ["add-student", "s1", "--name", "Ada", "--config-path", str(config)]
+        ).exit_code
+        == 0
+    )
+    result = runner.invoke(app, ["plan", "s1", "--config-path", str(config)])
+    assert result.exit_code == 1
+    assert "Prerequisite cycle detected among concepts: A, B." in result.stdout
@@ -0,0 +1,285 @@
+import copy
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from skillgraph_tutor.cohort import (  # noqa: E402
+    CohortPlan,
+    CohortStore,
+    apply_forgetting_batch,
+    plan_cohort,
+    sm2_update_many,
+    update_mastery_batch,
+)
+from skillgraph_tutor.config import SpacedRepetitionConfig  # noqa: E402
+from skillgraph_tutor.graph import parse_syllabus_markdown  # noqa: E402
+from skillgraph_tutor.planner import next_action  # noqa: E402
+from skillgraph_tutor.scheduler import sm2_update  # noqa: E402
+from skillgraph_tutor.storage import open_student_store  # noqa: E402
+from skillgraph_tutor.student import StudentState  # noqa: E402
+
+
+def test_cohort_row_behaves_like_student_state(tmp_path):
+    store = CohortStore.create(tmp_path / "cohort", concepts=["A", "B"], student_capacity=1)
+    store.add_student("s1", "Ada", forgetting_lambda=0.1)
+    student = store.student("s1")
+    assert student.concepts == {}
+
+    student.update_mastery("A", correct=True, confidence=1.0)
+    sm2_update(student.concept("A"), quality=4)
+    store.save_student(student)
+
+    reopened = CohortStore(tmp_path / "cohort").student("s1")
+    assert reopened.forgetting_lambda == 0.1
+    assert list(reopened.concepts) == ["A"]
+    assert reopened.concepts["A"].reviews.interval_days == 1
+    assert reopened.to_dict() == student.to_dict()
+
+
+def test_cohort_reads_naive_timestamps_as_utc(tmp_path, monkeypatch):
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        store = CohortStore.create(tmp_path, concepts=["A"])
+        store.add_student("s1", "Ada")
+        view, plain = store.student("s1").concept("A"), StudentState("s2", "Bo").concept("A")
+        for state in (view, plain):
+            state.updated_at = "2026-03-01T08:00:00"
+            state.reviews.due_at = "2026-03-02T08:00:00"
+        assert view.updated_us == plain.updated_us
+        assert view.reviews.due_at == plain.reviews.due_at == "2026-03-02T08:00:00+00:00"
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+def test_cohort_grows_and_imports_plain_students(tmp_path):
+    store = CohortStore.create(tmp_path, student_capacity=1, concept_capacity=1)
+    for idx in range(3):
+        plain = StudentState(student_id=f"s{idx}", name=f"S{idx}")
+        for name in ["A", "B", "C"]:
+            plain.concept(name).mastery = idx / 10
+        store.save_student(plain)
+        assert store.student(f"s{idx}").to_dict() == plain.to_dict()
+    assert store.capacity[0] >= 3 and store.capacity[1] >= 3
+    assert store.student_ids() == ["s0", "s1", "s2"]
+
+
+def test_deepcopy_detaches_from_store(tmp_path):
+    store = CohortStore.create(tmp_path, concepts=["A"])
+    store.add_student("s1", "Ada")
+    student = store.student("s1")
+    student.concept("A").mastery = 0.5
+    sim = copy.deepcopy(student)
+    sim.concept("A").mastery = 0.9
+    assert isinstance(sim.concepts, dict)
+    assert student.concept("A").mastery == 0.5
+
+
+def test_cohort_backend_round_trip(tmp_path):
+    store = open_student_store(tmp_path, backend="cohort")
+    store.save(StudentState(student_id="s1", name="Ada"))
+    student = open_student_store(tmp_path, backend="cohort").load("s1")
+    student.concept("A").mastery = 0.4
+    open_student_store(tmp_path, backend="cohort").save(student)
+    assert open_student_store(tmp_path, backend="cohort").load("s1").concept("A").mastery == 0.4
+    with pytest.raises(FileNotFoundError):
+        store.load("missing")
+
+
+def test_cohort_handles_share_students_and_concepts(tmp_path):
+    first = CohortStore.create(tmp_path, student_capacity=1, concept_capacity=1)
+    second = CohortStore(tmp_path)
+    first.save_student(StudentState(student_id="x", name="X"))
+    second.save_student(StudentState(student_id="y", name="Y"))  # grows the arrays
+    x, y = first.student("x"), second.student("y")
+    x.concept("Alpha").mastery = 0.1
+    first.save_student(x)
+    y.concept("Beta").mastery = 0.2
+    second.save_student(y)
+
+    reopened = CohortStore(tmp_path)
+    assert reopened.student_ids() == ["x", "y"]
+    assert reopened.concepts == ["Alpha", "Beta"]
+    assert reopened.student("x").concepts["Alpha"].mastery == 0.1
+    assert reopened.student("y").concepts["Beta"].mastery == 0.2
+    assert first.student("y").name == "Y"
+
+
+def _random_cohort(tmp_path, n_students=20, concepts=("A", "B", "C", "D")):
+    rng = random.Random(7)
+    base = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    store = CohortStore.create(tmp_path, concepts=concepts)
+    plain = []
+    for idx in range(n_students):
+        student = StudentState(
+            student_id=f"s{idx}", name=f"S{idx}", forgetting_lambda=rng.uniform(0.01, 0.2)
+        )
+        for name in rng.sample(concepts, k=rng.randint(1, len(concepts))):
+            state = student.concept(name)
+            state.mastery = rng.random()
+            stamp = base - timedelta(seconds=rng.uniform(0, 90 * 86400))
+            state.updated_at = stamp.isoformat()
+        store.save_student(student)
+        plain.append(student)
+    return store, plain
+
+
+def test_apply_forgetting_batch_matches_scalar_path(tmp_path):
+    store, plain = _random_cohort(tmp_path)
+    now = datetime(2026, 3, 2, 12, 30, 0, 123457, tzinfo=timezone.utc)
+    apply_forgetting_batch(store, now=now)
+    for student in plain:
+        for name in student.concepts:
+            student.apply_forgetting(name, now=now)
+        assert store.student(student.student_id).to_dict() == student.to_dict()
+
+
+def test_update_mastery_batch_matches_scalar_path_with_repeats(tmp_path):
+    store, plain = _random_cohort(tmp_path, n_students=5)
+    rng = random.Random(3)
+    start = datetime(2026, 3, 2, tzinfo=timezone.utc)
+    events = [
+        (
+            f"s{rng.randrange(5)}",
+            rng.choice("ABCDE"),
+            rng.random() < 0.6,
+            rng.random(),
+            start + timedelta(hours=idx, microseconds=rng.randrange(10**6)),
+        )
+        for idx in range(60)
+    ]
+    students, concepts, correct, confidence, stamps = zip(*events, strict=True)
+    result = update_mastery_batch(
+        store, students, concepts, correct, confidence, now=[t.timestamp() for t in stamps]
+    )
+    by_id = {student.student_id: student for student in plain}
+    expected = []
+    for sid, name, ok, conf, stamp in events:
+        student = by_id[sid]
+        if name not in student.concepts:
+            student.concept(name).updated_at = stamp.isoformat()
+        expected.append(student.update_mastery(name, correct=ok, confidence=conf, now=stamp))
+    assert result.tolist() == expected
+    for student in plain:
+        assert store.student(student.student_id).to_dict() == student.to_dict()
+
+
+def test_sm2_update_many_matches_scalar_path(tmp_path):
+    store, plain = _random_cohort(tmp_path, n_students=4)
+    cfg = SpacedRepetitionConfig(initial_interval_days=2, easy_bonus=1.5, min_ease=1.4)
+    rng = random.Random(11)
+    start = datetime(2026, 3, 2, tzinfo=timezone.utc)
+    events = [
+        (f"s{rng.randrange(4)}", rng.choice("ABCDE"), rng.randint(0, 6), start + timedelta(hours=i))
+        for i in range(80)
+    ]
+    students, concepts, quality, stamps = zip(*events, strict=True)
+    sm2_update_many(
+        store, students, concepts, quality, now=[t.timestamp() for t in stamps], config=cfg
+    )
+    by_id = {student.student_id: student for student in plain}
+    for sid, name, q, stamp in events:
+        student = by_id[sid]
+        if name not in student.concepts:
+            student.concept(name).updated_at = stamp.isoformat()
+        sm2_update(student.concept(name), quality=q, config=cfg, now=stamp)
+    for student in plain:
+        assert store.student(student.student_id).to_dict() == student.to_dict()
+
+
+def test_cohort_due_index_follows_bulk_and_view_updates(tmp_path):
+    store, plain = _random_cohort(tmp_path, n_students=6)
+    now = datetime(2026, 3, 2, tzinfo=timezone.utc)
+    index = store.due_index()
+    assert len(index.due(now)) == sum(len(s.concepts) for s in plain)  # never scheduled
+
+    sm2_update_many(store, ["s0", "s1"], ["A", "A"], [4, 1], now=now)
+    store.student("s2").concept("B").reviews.due_at = (now + timedelta(days=3)).isoformat()
+
+    soon = index.due(now + timedelta(hours=12))
+    assert ("s0", "A") not in soon and ("s1", "A") not in soon
+    later = index.due(now + timedelta(days=2))
+    assert ("s0", "A") in later and ("s1", "A") in later and ("s2", "B") not in later
+    assert later[-2:] == [("s0", "A"), ("s1", "A")]
+    assert index.due(now + timedelta(days=3))[-1] == ("s2", "B")
+    assert len(index.due(now + timedelta(days=3), limit=2)) == 2
+
+
+def test_plan_cohort_matches_next_action(tmp_path):
+    rng = random.Random(3)
+    now = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    graph = parse_syllabus_markdown(
+        "## A\n## B\n## C\nrequires: A\n## D\nrequires: B, C\n## E\nrequires: Ghost\n## F\n"
+    )
+    names = ["A", "B", "C", "D", "E", "F", "Ghost", "Extra"]
+    students = []
+    for idx in range(60):
+        student = StudentState(student_id=f"s{idx}", name=f"S{idx}")
+        for name in rng.sample(names, k=rng.randint(0, len(names))):
+            state = student.concept(name)
+            state.mastery = rng.choice([0.5, 0.65, 0.8, 0.95, 0.95])  # repeats force ties
+            offset = rng.choice([None, -2.0, 0.0, 3.0, 3.0, 3.0, 3.0])
+            if offset is not None:
+                state.reviews.due_at = (now + timedelta(days=offset)).isoformat()
+        students.append(student)
+    done = StudentState(student_id="done", name="Done")
+    for name in "ABCDEF":
+        done.concept(name).mastery = 0.9
+        done.concept(name).reviews.due_at = (now + timedelta(days=1)).isoformat()
+    students.append(done)
+    expected = [(s.student_id, next_action(graph, s, now=now)) for s in students]
+
+    plan = plan_cohort(graph, students, now=now, chunk_size=7)
+    assert list(plan) == expected
+    assert {item.reason for _, item in expected} == {
+        "due_or_low_mastery",
+        "prerequisites_satisfied",
+        "no_eligible_new_concepts",
+    }
+    assert len({item.concept for _, item in expected if item.action == "learn"}) >= 2
+
+    store = CohortStore.create(tmp_path / "cohort", concepts=["Extra", "F"])
+    for student in students:
+        store.save_student(student)
+    from_store = [
+        (s.student_id, next_action(graph, s, now=now))
+        for s in map(store.student, store.student_ids())
+    ]
+    plan = plan_cohort(graph, store, now=now)
+    assert list(plan) == from_store
+
+    plan.to_npz(tmp_path / "plan.npz")
+    assert list(CohortPlan.load_npz(tmp_path / "plan.npz")) == from_store
+    plan.to_csv(tmp_path / "plan.csv")
+    lines = (tmp_path / "plan.csv").read_text().splitlines()
+    assert lines[0] == "student_id,action,concept,reason" and len(lines) == 62
+
+
+def test_cohort_backend_serializes_locked_updates_across_handles(tmp_path):
+    open_student_store(tmp_path, backend="cohort").save(StudentState(student_id="s1", name="Ada"))
+
+    def bump(worker: int) -> None:
+        store = open_student_store(tmp_path, backend="cohort")
+        for idx in range(25):
+            with store.locked("s1"):
+                reviews = store.load("s1").concept("A").reviews
+                seen = reviews.repetitions
+                time.sleep(0)  # let other writers run between the read and the write
+                reviews.repetitions = seen + 1
+                store.save(store.load("s1"))
+            store.save(StudentState(student_id=f"w{worker}-{idx}", name="New"))
+
+    workers = [threading.Thread(target=bump, args=(idx,)) for idx in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    store = open_student_store(tmp_path, backend="cohort")
+    assert store.load("s1").concepts["A"].reviews.repetitions == 100
+    assert len(store.student_ids()) == 101
@@ -1,4 +1,11 @@
-from skillgraph_tutor.graph import parse_syllabus_markdown
+import pytest
+
+from skillgraph_tutor.graph import (
+    load_graph,
+    parse_syllabus_files,
+    parse_syllabus_markdown,
+    syllabus_files,
+)
 
 
 def test_parse_syllabus_and_requires():
@@ -12,3 +19,43 @@ requires: A
     assert "A" in graph.nodes
     assert graph.nodes["B"].requires == ["A"]
     assert graph.nodes["C"].requires == ["B"]
+
+
+def test_compiled_graph_csr_and_topological_order(tmp_path):
+    graph = parse_syllabus_markdown("## A\n## C\nrequires: B, A\n## B\nrequires: A, Ghost")
+    graph.save_json(tmp_path / "graph.json")
+    compiled = load_graph(tmp_path / "graph.json").compiled
+    assert compiled.names[: compiled.node_count] == ["A", "C", "B"]
+    assert compiled.ids["Ghost"] >= compiled.node_count
+    b = compiled.ids["B"]
+    assert [compiled.names[i] for i in compiled.prerequisites(b)] == ["A", "Ghost"]
+    assert [compiled.names[i] for i in compiled.dependents(compiled.ids["A"])] == ["C", "B"]
+    assert graph.topological_order() == ["A", "B", "C"]
+
+
+def test_compile_rejects_prerequisite_cycles():
+    graph = parse_syllabus_markdown("## A\nrequires: C\n## B\n## C\n## D\nrequires: A")
+    with pytest.raises(ValueError, match="cycle detected among concepts: A, B, C, D"):
+        graph.compile()
+
+
+def test_parse_syllabus_files_across_files_reports_unknown_and_cycles(tmp_path):
+    (tmp_path / "unit1.md").write_text("## A\n## B\nrequires: C, Ghost\n", encoding="utf-8")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "unit2.md").write_text("## C\nrequires: A\n## D\n", encoding="utf-8")
+
+    paths = syllabus_files(tmp_path)
+    assert [path.name for path in paths] == ["unit2.md", "unit1.md"]
+    assert syllabus_files(str(tmp_path / "*.md")) == [tmp_path / "unit1.md"]
+    graph, report = parse_syllabus_files(paths)
+    assert graph.nodes["C"].requires == ["A"]  # defined in the other file
+    assert graph.nodes["D"].requires == ["C"]
+    assert graph.nodes["A"].requires == []  # implicit chaining restarts per file
+    assert (report.files, report.lines) == (2, 6)
+    assert report.unknown == {"Ghost": ["B"]}
+    assert report.cycles == []
+    assert graph.topological_order()[:2] == ["A", "C"]
+
+    (tmp_path / "unit3.md").write_text("## A\nrequires: D\n", encoding="utf-8")
+    _, report = parse_syllabus_files(syllabus_files(tmp_path))
+    assert report.cycles == [["C", "D", "A"]]
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from skillgraph_tutor.cli import plan_actions
+from skillgraph_tutor.config import PlannerConfig, SkillGraphConfig
+from skillgraph_tutor.graph import parse_syllabus_markdown
+from skillgraph_tutor.horizon import parse_horizon, plan_horizon
+from skillgraph_tutor.planner import seven_day_plan
+from skillgraph_tutor.student import StudentState
+
+NOW = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def test_parse_horizon():
+    assert [parse_horizon(text) for text in ["7d", "30D", " 2w ", "90"]] == [7, 30, 14, 90]
+    for bad in ["0d", "soon", "3m", ""]:
+        with pytest.raises(ValueError, match="Invalid horizon"):
+            parse_horizon(bad)
+
+
+def test_horizon_plan_respects_budget_and_prerequisites():
+    graph = parse_syllabus_markdown("## A\n## B\n## C\nrequires: A\n## D\nrequires: B, C")
+    student = StudentState(student_id="s1", name="Ada")
+    before = student.to_dict()
+    config = PlannerConfig(actions_per_day=2)
+
+    plan = plan_horizon(graph, student, "30d", config, now=NOW)
+
+    assert student.to_dict() == before
+    assert plan == plan_horizon(graph, student, "30d", config, now=NOW)
+    assert [item.day for item in plan] == sorted(item.day for item in plan)
+    assert max(item.day for item in plan) <= 30
+    for day in {item.day for item in plan}:
+        today = [item.concept for item in plan if item.day == day]
+        assert len(today) <= 2 and len(set(today)) == len(today)
+
+    # Replay the plan to check every "learn" only happens once its prerequisites are met.
+    replay = student.simulate()
+    learned = [item.concept for item in plan if item.action == "learn"]
+    assert sorted(learned) == ["A", "B", "C", "D"]
+    for item in plan:
+        if item.action == "learn":
+            assert item.concept not in replay.concepts
+            for req in graph.nodes[item.concept].requires:
+                assert replay.concepts[req].mastery >= config.mastery_threshold
+        when = NOW + timedelta(days=item.day - 1)
+        replay.update_mastery(item.concept, correct=True, confidence=0.8, now=when)
+
+
+def test_default_plan_matches_the_report_week():
+    graph = parse_syllabus_markdown("## A\n## B\n## C\nrequires: A\n## D\nrequires: B, C")
+    student = StudentState(student_id="s1", name="Ada")
+    cfg = SkillGraphConfig()
+    cfg.planner.actions_per_day = 3
+
+    week = [(item.day, item.concept) for item in seven_day_plan(graph, student)]
+    for horizon in ("7d", "1w"):
+        plan = plan_actions(cfg, graph, student, horizon)
+        assert [(item.day, item.concept) for item in plan] == week
+    longer = plan_actions(cfg, graph, student, "14d")
+    assert max(item.day for item in longer) > 7
+    assert len(plan_actions(cfg, graph, student, "7d", per_day=2)) > 7
+
+
+def test_horizon_plan_uses_review_threshold_and_fills_every_day():
+    graph = parse_syllabus_markdown("## A\n## B\n## C\nrequires: A\n## D\nrequires: B, C")
+    student = StudentState(student_id="s1", name="Ada")
+    for name, mastery in [("A", 0.65), ("B", 0.9), ("C", 0.9), ("D", 0.9)]:
+        state = student.concept(name)
+        state.mastery = mastery
+        state.updated_at = NOW.isoformat()
+        state.reviews.due_at = (NOW + timedelta(days=30)).isoformat()
+    config = PlannerConfig(actions_per_day=2)
+
+    plan = plan_horizon(graph, student, "5d", config, now=NOW, review_threshold=0.6)
+
+    # A is above the review threshold and not due, so day 1 has no "due" review.
+    assert [item.reason for item in plan[:2]] == ["no_eligible_new_concepts"] * 2
+    assert [item.day for item in plan] == [1, 1, 2, 2, 3, 3, 4, 4, 5, 5]
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from skillgraph_tutor.config import SkillGraphConfig
+from skillgraph_tutor.ingest import ingest_events, read_events
+from skillgraph_tutor.storage import StaleStudentError, open_student_store
+from skillgraph_tutor.student import StudentState
+
+ROWS = [
+    ("s1", "A", True, 0.9, "2026-03-01T10:00:00+00:00"),
+    ("s2", "A", False, 0, "2026-03-01T09:00:00+00:00"),
+    ("s1", "A", False, 0.4, "2026-03-01T08:00:00+00:00"),
+    ("ghost", "A", True, 0.9, "2026-03-01T08:00:00+00:00"),
+    ("s1", "B", True, 0.7, "2026-03-02T08:00:00"),
+    ("s2", "A", True, 0.8, "2026-03-02T08:00:00"),
+]
+KEYS = ["student_id", "concept", "correct", "confidence", "timestamp"]
+
+
+def _write_inputs(tmp_path):
+    csv_path = tmp_path / "events.csv"
+    lines = [",".join(KEYS)] + [",".join(str(v) for v in row) for row in ROWS]
+    csv_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    jsonl_path = tmp_path / "events.jsonl"
+    jsonl_path.write_text(
+        "".join(json.dumps(dict(zip(KEYS, row, strict=True))) + "\n" for row in ROWS),
+        encoding="utf-8",
+    )
+    return csv_path, jsonl_path
+
+
+def _seed(store) -> None:
+    for student_id in ["s1", "s2"]:
+        store.save(StudentState(student_id=student_id, name=student_id.upper()))
+
+
+def test_read_events_parses_csv_and_jsonl_alike(tmp_path):
+    csv_path, jsonl_path = _write_inputs(tmp_path)
+    from_csv, from_jsonl = list(read_events(csv_path)), list(read_events(jsonl_path))
+    assert from_csv == from_jsonl
+    assert from_csv[0].correct is True and from_csv[2].correct is False
+    assert from_csv[4].timestamp.tzinfo is not None
+    assert from_jsonl[1].confidence == 0.0  # an explicit 0 is not "missing"
+
+
+def test_ingest_groups_per_student_and_skips_unknown(tmp_path):
+    _, jsonl_path = _write_inputs(tmp_path)
+    store = open_student_store(tmp_path)
+    _seed(store)
+    stats = ingest_events(SkillGraphConfig(), store, read_events(jsonl_path), chunk_rows=4)
+    assert (stats.rows, stats.students, stats.skipped) == (6, 2, 1)
+    s1 = store.load("s1")
+    # Out-of-order rows are applied by timestamp: the 10:00 correct answer lands last.
+    assert s1.concepts["A"].updated_at == "2026-03-01T10:00:00+00:00"
+    assert s1.concepts["A"].reviews.repetitions == 1
+    assert s1.concepts["B"].reviews.repetitions == 1
+
+
+def test_cohort_ingest_matches_json_backend(tmp_path):
+    pytest.importorskip("numpy")
+    from skillgraph_tutor.cohort import CohortStore
+
+    _, jsonl_path = _write_inputs(tmp_path)
+    cfg = SkillGraphConfig()
+    json_store = open_student_store(tmp_path / "json")
+    _seed(json_store)
+    ingest_events(cfg, json_store, read_events(jsonl_path))
+
+    CohortStore.create(tmp_path / "cohort" / "cohort")
+    cohort_store = open_student_store(tmp_path / "cohort", backend="cohort")
+    _seed(cohort_store)
+    stats = ingest_events(cfg, cohort_store, read_events(jsonl_path))
+    assert (stats.rows, stats.students, stats.skipped) == (6, 2, 1)
+
+    reopened = open_student_store(tmp_path / "cohort", backend="cohort")
+    for student_id in ["s1", "s2"]:
+        assert reopened.load(student_id).to_dict() == json_store.load(student_id).to_dict()
+
+
+def test_ingest_retries_stale_saves_then_reports_progress(tmp_path, monkeypatch):
+    _, jsonl_path = _write_inputs(tmp_path)
+    store = open_student_store(tmp_path, fsync=False)
+    _seed(store)
+    save = store.save
+    stale = {"s1": 1}  # s1 goes stale once, as if another process saved it unlocked
+
+    def racing_save(student):
+        if stale.get(student.student_id, 0) > 0:
+            stale[student.student_id] -= 1
+            save(store.load(student.student_id))
+        save(student)
+
+    monkeypatch.setattr(store, "save", racing_save)
+    stats = ingest_events(SkillGraphConfig(), store, read_events(jsonl_path))
+    assert (stats.rows, stats.students, stats.skipped) == (6, 2, 1)
+    assert store.load("s1").concepts["A"].reviews.repetitions == 1
+
+    stale["s2"] = 99
+    with pytest.raises(StaleStudentError, match="stopped after applying 3 rows"):
+        ingest_events(SkillGraphConfig(), store, read_events(jsonl_path))
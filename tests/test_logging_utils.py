@@ -0,0 +1,44 @@
+import gzip
+import json
+
+from skillgraph_tutor.config import LoggingConfig
+from skillgraph_tutor.logging_utils import TraceWriter, trace_writer
+
+
+def test_trace_writer_buffers_rotates_and_compresses(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    writer = TraceWriter(path, flush_events=1000, flush_seconds=60, max_bytes=600, compress=True)
+    calls = []
+    for idx in range(20):
+        writer.emit({"idx": idx, "due_count": lambda idx=idx: calls.append(idx) or idx})
+    assert not path.exists()  # nothing written until a flush
+    writer.flush()
+    writer.emit({"idx": 20, "due_count": 20})
+    writer.close()
+
+    rotated = gzip.decompress((tmp_path / "traces.jsonl.1.gz").read_bytes()).decode()
+    events = [json.loads(line) for line in (rotated + path.read_text()).splitlines()]
+    assert [event["idx"] for event in events] == list(range(21))
+    assert all(event["due_count"] == event["idx"] and event["timestamp"] for event in events)
+    assert calls == list(range(20))
+
+    assert trace_writer(LoggingConfig(trace_path="")) is None
+    shared = trace_writer(LoggingConfig(trace_path=str(tmp_path / "t.jsonl")))
+    assert trace_writer(LoggingConfig(trace_path=str(tmp_path / "t.jsonl"))) is shared
+
+
+def test_trace_writer_survives_unserializable_events(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    writer = TraceWriter(path, flush_events=1000, flush_seconds=60)
+    loop: dict = {}
+    loop["self"] = loop
+    writer.emit({"idx": 0, "value": object()})  # written via str()
+    writer.emit({"idx": 1, "value": loop})  # cannot be encoded at all
+    writer.emit({"idx": 2})
+    assert writer.flush(timeout=5)
+    writer.close()
+
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [event["idx"] for event in events] == [0, 2]
+    assert events[0]["value"].startswith("<object object")
+    assert writer.dropped == 1
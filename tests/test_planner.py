@@ -1,5 +1,8 @@
+import random
+from datetime import datetime, timedelta, timezone
+
 from skillgraph_tutor.graph import parse_syllabus_markdown
-from skillgraph_tutor.planner import next_action, seven_day_plan
+from skillgraph_tutor.planner import learnable_frontier, next_action, seven_day_plan
 from skillgraph_tutor.student import StudentState
 
 
@@ -28,3 +31,39 @@ def test_next_action_fallback_is_deterministic():
         concept.reviews.due_at = "2999-01-01T00:00:00+00:00"
     action = next_action(g, s)
     assert action.concept == "A"
+
+
+def _scan_eligible(graph, student, threshold):
+    return [
+        name
+        for name, node in graph.nodes.items()
+        if name not in student.concepts
+        and all(
+            req in student.concepts and student.concepts[req].mastery >= threshold
+            for req in node.requires
+        )
+    ]
+
+
+def test_learnable_frontier_tracks_threshold_crossings_both_ways():
+    rng = random.Random(4)
+    lines = []
+    for idx in range(60):
+        lines.append(f"## C{idx}")
+        if idx:
+            reqs = {f"C{rng.randrange(idx)}" for _ in range(rng.randint(1, 3))}
+            lines.append(f"requires: {', '.join(sorted(reqs))}")
+    graph = parse_syllabus_markdown("\n".join(lines))
+    s = StudentState(student_id="s1", name="Ada")
+    frontier = learnable_frontier(graph, s, 0.7)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for step in range(300):
+        name = f"C{rng.randrange(60)}"
+        if step % 4 == 0:
+            s.apply_forgetting(name, now=now + timedelta(days=rng.randint(0, 60)))
+        else:
+            s.concept(name).mastery = rng.choice([0.1, 0.69, 0.7, 0.95])
+        expected = _scan_eligible(graph, s, 0.7)
+        assert frontier.eligible() == expected
+        assert frontier.eligible(limit=1) == expected[:1]
+        assert frontier.eligible(limit=3) == expected[:3]
@@ -1,7 +1,9 @@
 from datetime import datetime, timedelta, timezone
 
+from skillgraph_tutor.config import SkillGraphConfig, StorageConfig
 from skillgraph_tutor.graph import parse_syllabus_markdown
-from skillgraph_tutor.reporting import render_report
+from skillgraph_tutor.reporting import render_report, write_cohort_reports
+from skillgraph_tutor.storage import open_student_store
 from skillgraph_tutor.student import StudentState
 
 
@@ -15,3 +17,35 @@ def test_due_reviews_include_past_due_items():
 
     assert "- A" in md
     assert payload["due_reviews"] == ["A"]
+
+
+def test_cohort_reports_match_serial_and_summarize(tmp_path):
+    cfg = SkillGraphConfig(data_dir=str(tmp_path / "ws"))
+    parse_syllabus_markdown("## A\n## B\n## C").save_json(tmp_path / "ws" / "graph.json")
+    store = open_student_store(cfg.data_dir)
+    for idx in range(5):
+        student = StudentState(student_id=f"s{idx}", name=f"S{idx}")
+        student.concept("A").mastery = 0.2 * idx
+        store.save(student)
+
+    parallel = write_cohort_reports(cfg, tmp_path / "par", workers=2, shard_size=2)
+    serial = write_cohort_reports(cfg, tmp_path / "ser", workers=1)
+
+    assert parallel == serial
+    assert [row["student_id"] for row in parallel["rows"]] == [f"s{i}" for i in range(5)]
+    assert parallel["mean_mastery"] == 0.4
+    for name in ["report.md", "report.json", "eval_metrics.json", "eval_report.md"]:
+        assert (tmp_path / "par" / "s3" / name).read_text() == (
+            tmp_path / "ser" / "s3" / name
+        ).read_text()
+    assert "| [S4](s4/report.md) |" in (tmp_path / "par" / "cohort_summary.md").read_text()
+
+
+def test_cohort_reports_read_the_graph_from_a_sqlite_store(tmp_path):
+    cfg = SkillGraphConfig(data_dir=str(tmp_path / "ws"), storage=StorageConfig(backend="sqlite"))
+    store = open_student_store(cfg.data_dir, backend="sqlite")
+    store.save_graph(parse_syllabus_markdown("## X\n## Y\nrequires: X"))  # no graph.json
+    store.save(StudentState(student_id="s1", name="Ada"))
+
+    summary = write_cohort_reports(cfg, tmp_path / "out", workers=1)
+    assert summary["rows"][0]["next"] == "learn X"
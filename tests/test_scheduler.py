@@ -1,6 +1,10 @@
+import random
+from datetime import datetime, timedelta, timezone
+
 from skillgraph_tutor.config import SpacedRepetitionConfig
-from skillgraph_tutor.scheduler import sm2_update
-from skillgraph_tutor.student import ConceptState
+from skillgraph_tutor.planner import build_review_queue
+from skillgraph_tutor.scheduler import is_due, review_index, sm2_update
+from skillgraph_tutor.student import ConceptState, StudentState
 
 
 def test_sm2_progression():
@@ -16,3 +20,35 @@ def test_sm2_uses_configurable_initial_interval():
     cfg = SpacedRepetitionConfig(initial_interval_days=2, easy_bonus=1.5)
     sm2_update(c, quality=5, config=cfg)
     assert c.reviews.interval_days >= 2
+
+
+def _scan_queue(student: StudentState, now: datetime) -> list[str]:
+    queue = [
+        name
+        for name, concept in student.concepts.items()
+        if is_due(concept, now=now) or concept.mastery < 0.6
+    ]
+    return sorted(queue, key=lambda n: student.concepts[n].mastery)
+
+
+def test_review_queue_index_tracks_incremental_updates():
+    rng = random.Random(1)
+    now = datetime(2026, 5, 1, tzinfo=timezone.utc)
+    student = StudentState(student_id="s1", name="Ada")
+    for idx in range(40):
+        student.concept(f"C{idx}").mastery = rng.choice([0.2, 0.5, 0.7, 0.9])
+    assert build_review_queue(student, now=now) == _scan_queue(student, now)
+
+    for step in range(200):
+        name = f"C{rng.randrange(50)}"
+        if step % 3:
+            sm2_update(student.concept(name), quality=rng.randint(0, 5), now=now)
+        else:
+            student.update_mastery(name, correct=rng.random() < 0.7, confidence=0.8, now=now)
+        later = now + timedelta(days=rng.randint(0, 10))
+        expected = _scan_queue(student, later)
+        assert build_review_queue(student, now=later) == expected
+        for limit in (1, 3, len(expected) // 2 + 1, len(expected) + 2):
+            assert build_review_queue(student, now=later, limit=limit) == expected[:limit]
+        due = review_index(student).due(now=later)
+        assert sorted(due) == sorted(n for n, c in student.concepts.items() if is_due(c, later))
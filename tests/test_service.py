@@ -0,0 +1,113 @@
+import asyncio
+import json
+
+from skillgraph_tutor.config import LoggingConfig, ServiceConfig, SkillGraphConfig, StorageConfig
+from skillgraph_tutor.graph import parse_syllabus_markdown
+from skillgraph_tutor.service import TutorService, start_server
+from skillgraph_tutor.storage import open_configured_store
+from skillgraph_tutor.student import load_student
+
+
+def _config(tmp_path, backend: str = "json", **service) -> SkillGraphConfig:
+    cfg = SkillGraphConfig(
+        data_dir=str(tmp_path / "ws"),
+        storage=StorageConfig(backend=backend),
+        logging=LoggingConfig(trace_path=str(tmp_path / "traces.jsonl")),
+        service=ServiceConfig(port=0, journal_fsync=False, **service),
+    )
+    parse_syllabus_markdown("## A\n## B\nrequires: A").save_json(tmp_path / "ws" / "graph.json")
+    return cfg
+
+
+def test_service_keeps_state_in_memory_until_flush(tmp_path):
+    service = TutorService(_config(tmp_path))
+    assert service.handle("POST", "/students", {"student_id": "s1", "name": "Ada"})[0] == 200
+    status, body = service.handle(
+        "POST", "/quiz", {"student_id": "s1", "concept": "A", "correct": "true"}
+    )
+    assert status == 200 and body["mastery_after"] > body["mastery_before"]
+    student_file = tmp_path / "ws" / "students" / "s1.json"
+    assert not student_file.exists()
+
+    assert service.handle("POST", "/flush", {}) == (200, {"flushed": 1})
+    assert load_student(student_file).concepts["A"].reviews.repetitions == 1
+    assert service.handle("GET", "/plan", {"student_id": "s1"})[1]["plan"][0]["concept"] == "A"
+    assert service.handle("GET", "/plan", {"student_id": "nobody"})[0] == 404
+    assert service.handle("POST", "/quiz", {"student_id": "s1"})[0] == 400
+
+
+def test_service_replays_journal_after_crash(tmp_path):
+    cfg = _config(tmp_path)
+    crashed = TutorService(cfg)
+    crashed.handle("POST", "/students", {"student_id": "s1", "name": "Ada"})
+    crashed.handle("POST", "/quiz", {"student_id": "s1", "concept": "A", "correct": True})
+    expected = crashed.student("s1").to_dict()
+    # No flush/close: the journal is the only durable record.
+
+    recovered = TutorService(cfg)
+    assert load_student(tmp_path / "ws" / "students" / "s1.json").to_dict() == expected
+    assert recovered.journal.entries() == []
+
+
+def test_service_reads_the_graph_from_a_sqlite_store(tmp_path):
+    cfg = _config(tmp_path, backend="sqlite")
+    graph_json = tmp_path / "ws" / "graph.json"
+    open_configured_store(cfg).save_graph(parse_syllabus_markdown("## X\n## Y\nrequires: X"))
+    graph_json.unlink()  # the database holds the only copy
+    service = TutorService(cfg)
+    service.handle("POST", "/students", {"student_id": "s1", "name": "Ada"})
+    status, body = service.handle("GET", "/plan", {"student_id": "s1", "horizon": "next"})
+    assert status == 200 and body["plan"][0]["concept"] == "X"
+
+
+def test_service_report_out_stays_inside_data_dir(tmp_path):
+    service = TutorService(_config(tmp_path))
+    service.handle("POST", "/students", {"student_id": "s1", "name": "Ada"})
+    status, _ = service.handle("POST", "/report", {"student_id": "s1", "out": "reports/s1"})
+    assert status == 200
+    assert (tmp_path / "ws" / "reports" / "s1" / "report.md").exists()
+    for out in ["../escaped", str(tmp_path / "elsewhere"), "reports/../../escaped"]:
+        status, body = service.handle("POST", "/report", {"student_id": "s1", "out": out})
+        assert status == 400 and "inside" in body["error"]
+    assert not (tmp_path / "escaped").exists() and not (tmp_path / "elsewhere").exists()
+
+
+def test_service_http_round_trip(tmp_path):
+    async def scenario():
+        service = TutorService(_config(tmp_path))
+        server = await start_server(service)
+        host, port = server.sockets[0].getsockname()[:2]
+        reader, writer = await asyncio.open_connection(host, port)
+
+        async def call(method, path, payload=None):
+            body = json.dumps(payload).encode() if payload is not None else b""
+            head = f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n"
+            writer.write(head.encode() + body)
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            headers = {}
+            while (line := await reader.readline()) != b"\r\n":
+                key, _, value = line.decode().partition(":")
+                headers[key.lower()] = value.strip()
+            return status, json.loads(await reader.readexactly(int(headers["content-length"])))
+
+        results = [
+            await call("POST", "/students", {"student_id": "s1", "name": "Ada"}),
+            await call("POST", "/study", {"student_id": "s1", "concept": "A"}),
+            await call("POST", "/report", {"student_id": "s1"}),
+            await call("GET", "/report?student_id=s1"),
+            await call("GET", "/missing"),
+        ]
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        service.close()
+        return results
+
+    added, studied, report, get_report, missing = asyncio.run(scenario())
+    assert added == (200, {"student_id": "s1"})
+    assert "A" in studied[1]["question"]
+    assert report[0] == 200 and report[1]["student"]["student_id"] == "s1"
+    assert "eval" in report[1]
+    assert get_report[0] == 404  # writes files, so POST only
+    assert missing[0] == 404
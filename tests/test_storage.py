@@ -0,0 +1,179 @@
+import json
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from skillgraph_tutor.packed import PackedConcepts
+from skillgraph_tutor.scheduler import sm2_update
+from skillgraph_tutor.storage import (
+    EventLogStudentStore,
+    JsonStudentStore,
+    StaleStudentError,
+    migrate_students,
+    open_student_store,
+)
+from skillgraph_tutor.student import StudentState
+
+
+def test_event_log_appends_only_changed_concepts(tmp_path):
+    store = open_student_store(tmp_path, backend="eventlog")
+    student = StudentState(student_id="s1", name="Ada")
+    for name in ["A", "B", "C"]:
+        student.concept(name).mastery = 0.5
+    store.save(student)
+    assert store.snapshot_path("s1").exists()
+    assert not store.log_path("s1").exists()
+
+    loaded = store.load("s1")
+    now = datetime(2026, 2, 1, tzinfo=timezone.utc)
+    loaded.update_mastery("B", correct=True, confidence=1.0, now=now)
+    sm2_update(loaded.concept("B"), quality=4, now=now)
+    loaded.concept("A")  # read-only access is not an event
+    loaded.concept("D")  # newly studied concept is
+    store.save(loaded)
+    store.save(loaded)  # nothing changed since the last save
+
+    events = list(store.events("s1"))
+    assert len(events) == 1
+    assert sorted(events[0]["concepts"]) == ["B", "D"]
+    assert store.load("s1").to_dict() == loaded.to_dict()
+
+
+def test_event_log_compacts_and_ignores_torn_tail(tmp_path):
+    store = EventLogStudentStore(tmp_path, compact_after=3)
+    store.save(StudentState(student_id="s1", name="Ada"))
+    student = store.load("s1")
+    for step in range(5):
+        student.concept("A").mastery = step / 10
+        store.save(student)
+    assert len(list(store.events("s1"))) == 2  # compacted after the third event
+
+    with store.log_path("s1").open("a", encoding="utf-8") as handle:
+        handle.write('{"concepts": {"A": {"mast')
+    assert store.load("s1").concepts["A"].mastery == 0.4
+    snapshot = json.loads(store.snapshot_path("s1").read_text(encoding="utf-8"))
+    assert snapshot["concepts"]["A"]["mastery"] == 0.2
+    assert store.student_ids() == ["s1"]
+
+
+def test_binary_store_decodes_concepts_lazily_and_migrates_from_json(tmp_path):
+    source = open_student_store(tmp_path, backend="json")
+    student = StudentState(student_id="s1", name="Ada Lovelace", forgetting_lambda=0.05)
+    now = datetime(2026, 2, 1, tzinfo=timezone.utc)
+    for name in ["A", "B", "Cálculo"]:
+        student.update_mastery(name, correct=True, confidence=0.9, now=now)
+    sm2_update(student.concept("B"), quality=5, now=now)
+    source.save(student)
+
+    store = open_student_store(tmp_path, backend="binary")
+    assert migrate_students(source, store) == 1
+    assert store.student_ids() == ["s1"]
+    loaded = store.load("s1")
+    assert isinstance(loaded.concepts, PackedConcepts)
+    assert loaded.to_dict() == student.to_dict()
+
+    lazy = store.load("s1")
+    lazy.update_mastery("A", correct=False, confidence=1.0, now=now)
+    assert list(lazy.concepts._decoded) == ["A"]
+    lazy.concept("D")
+    store.save(lazy)
+    assert store.load("s1").to_dict() == lazy.to_dict()
+    assert list(store.load("s1").concepts) == ["A", "B", "Cálculo", "D"]
+
+    pruned = store.load("s1")
+    del pruned.concepts["B"]
+    store.save(pruned)
+    assert store.load("s1").to_dict() == pruned.to_dict()
+
+
+def test_sqlite_store_saves_changes_in_batches_and_answers_indexed_queries(tmp_path):
+    store = open_student_store(tmp_path, backend="sqlite")
+    now = datetime(2026, 2, 1, tzinfo=timezone.utc)
+    with store.batch():
+        for idx in range(3):
+            student = StudentState(student_id=f"s{idx}", name=f"Student {idx}")
+            student.concept("Variables").mastery = 0.3 + idx / 10
+            student.concept("Functions")
+            if idx:
+                sm2_update(student.concept("Functions"), quality=4, now=now)
+            store.save(student)
+    assert store.student_ids() == ["s0", "s1", "s2"]
+    assert store.students_due("Functions", now=now) == ["s0"]
+    assert store.students_due("Functions", now=datetime(2026, 2, 3, tzinfo=timezone.utc)) == [
+        "s0",
+        "s1",
+        "s2",
+    ]
+    assert store.students_below("Variables", 0.45) == ["s0", "s1"]
+
+    loaded = store.load("s1")
+    loaded.update_mastery("Variables", correct=True, confidence=1.0, now=now)
+    del loaded.concepts["Functions"]
+    loaded.concept("Loops")
+    store.save(loaded)
+    reloaded = open_student_store(tmp_path, backend="sqlite").load("s1")
+    assert reloaded.to_dict() == loaded.to_dict()
+    assert list(reloaded.concepts) == ["Variables", "Loops"]
+
+    with store.pool.connection() as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT student_id FROM concepts WHERE concept = ? AND due_us <= ?",
+            ("Functions", 0),
+        ).fetchall()
+    assert "concepts_due" in str(plan)
+
+
+def test_sharded_json_store_indexes_students_and_rebalances_flat_workspaces(tmp_path):
+    flat = JsonStudentStore(tmp_path / "students")
+    for idx in range(20):
+        flat.save(StudentState(student_id=f"s{idx:02d}", name=f"Student {idx}"))
+    flat.manifest.path.unlink()  # as written before the manifest existed
+    flat.save(flat.load("s05"))  # the first save after upgrading must not hide the others
+    assert flat.student_ids() == [f"s{idx:02d}" for idx in range(20)]
+
+    sharded = open_student_store(tmp_path, shard_levels=2, shard_fanout=16)
+    *shards, name = sharded.path("s07").relative_to(sharded.root).parts
+    assert len(shards) == 2 and all(len(shard) == 1 for shard in shards)  # 16 -> one hex digit
+    assert name == "s07.json"
+    assert sharded.rebalance() == 20
+    assert not list(sharded.root.glob("*.json"))
+    assert sharded.load("s07").name == "Student 7"
+
+    student = sharded.load("s03")
+    student.concept("A").mastery = 0.9
+    sharded.save(student)
+    entries = sharded.manifest.entries()
+    assert sorted(entries) == sharded.student_ids() == [f"s{idx:02d}" for idx in range(20)]
+    assert entries["s03"]["path"] == sharded.path("s03").relative_to(sharded.root).as_posix()
+    assert entries["s03"]["size"] == sharded.path("s03").stat().st_size
+
+
+@pytest.mark.parametrize("backend", ["json", "eventlog", "sqlite"])
+def test_store_rejects_stale_saves_and_serializes_locked_updates(tmp_path, backend):
+    store = open_student_store(tmp_path, backend=backend, fsync=False)
+    store.save(StudentState(student_id="s1", name="Ada"))
+    first, second = store.load("s1"), store.load("s1")
+    first.concept("A").mastery = 0.5
+    store.save(first)
+    second.concept("B").mastery = 0.5
+    with pytest.raises(StaleStudentError):
+        store.save(second)
+    store.save(first)  # its own revision is current again after a save
+
+    def bump() -> None:
+        for _ in range(25):
+            with store.locked("s1"):
+                student = store.load("s1")
+                student.concept("A").reviews.repetitions += 1
+                store.save(student)
+
+    workers = [threading.Thread(target=bump) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert store.load("s1").concepts["A"].reviews.repetitions == 100
+    assert not list(tmp_path.rglob("*.tmp"))
+    if backend != "sqlite":
+        assert len(list((store.root / ".locks").iterdir())) == 1
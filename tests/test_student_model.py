@@ -1,6 +1,7 @@
+import copy
 from datetime import datetime, timedelta, timezone
 
-from skillgraph_tutor.student import StudentState
+from skillgraph_tutor.student import ConceptState, ReviewState, StudentState
 
 
 def test_forgetting_and_update():
@@ -19,3 +20,77 @@ def test_from_dict_uses_dataclass_defaults_when_fields_missing():
     assert student.forgetting_lambda == StudentState.forgetting_lambda
     assert student.mastery_learning_rate == StudentState.mastery_learning_rate
     assert student.concepts["A"].mastery == 0.2
+
+
+def test_legacy_iso_timestamps_load_as_epoch_and_round_trip():
+    raw = {
+        "student_id": "s1",
+        "name": "Ada",
+        "concepts": {
+            "A": {
+                "mastery": 0.5,
+                "updated_at": "2026-01-01T02:00:00.250000+02:00",
+                "reviews": {"repetitions": 2, "interval_days": 6, "due_at": "2026-01-07T00:00:00"},
+            }
+        },
+    }
+    state = StudentState.from_dict(raw).concepts["A"]
+    assert state.updated_us == 1_767_225_600_250_000
+    assert state.reviews.due_us == state.updated_us - 250_000 + 6 * 86400 * 1_000_000
+    assert state.updated_at == "2026-01-01T00:00:00.250000+00:00"
+    again = StudentState.from_dict(StudentState.from_dict(raw).to_dict()).concepts["A"]
+    assert again == state
+
+
+def test_simulation_copies_on_write_and_leaves_student_untouched():
+    now = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    student = StudentState(student_id="s1", name="Ada", forgetting_lambda=0.1)
+    for name in ["A", "B"]:
+        student.concept(name).mastery = 0.8
+        student.concept(name).updated_at = (now - timedelta(days=5)).isoformat()
+    before = student.to_dict()
+    reference = copy.deepcopy(student)
+
+    sim = student.simulate()
+    assert sim.concepts["B"] is student.concepts["B"]  # untouched concepts are shared
+    for target in [sim, reference]:
+        target.update_mastery("A", correct=True, confidence=0.9, now=now)
+        target.concept("C").updated_at = now.isoformat()
+        target.concept("A").reviews.due_at = now.isoformat()
+
+    assert student.to_dict() == before
+    assert sim.to_dict() == reference.to_dict()
+    assert len(sim.concepts) == 3 and list(sim.concepts) == ["A", "B", "C"]
+    assert set(sim.concepts.changes) == {"A", "C"}
+
+    fork = sim.simulate()
+    forked = fork.to_dict()
+    sim.update_mastery("A", correct=True, confidence=0.9, now=now + timedelta(days=1))
+    sim.concept("C").mastery = 1.0
+    assert fork.to_dict() == forked  # later writes to the parent stay out of the fork
+    fork.concept("A").mastery = 0.0
+    assert sim.concepts["A"].mastery > 0.0
+
+
+def test_concept_states_are_slotted_and_loaded_names_shared():
+    first, second = (
+        StudentState.from_dict({"student_id": "s1", "name": "Ada", "concepts": {name: {}}})
+        for name in ("".join(["Frac", "tions"]), "".join(["Fract", "ions"]))
+    )
+    state = first.concepts["Fractions"]
+    assert not hasattr(state, "__dict__") and not hasattr(state.reviews, "__dict__")
+    assert next(iter(first.concepts)) is next(iter(second.concepts))
+    assert state.reviews.ease_factor == 2.5 and state.reviews.due_us is None
+
+
+def test_concept_state_still_accepts_iso_keywords():
+    state = ConceptState(
+        mastery=0.4,
+        updated_at="2026-01-01T00:00:00",  # naive means UTC
+        reviews=ReviewState(repetitions=2, due_at="2026-01-03T00:00:00+00:00"),
+    )
+    assert state.updated_at == "2026-01-01T00:00:00+00:00"
+    assert state.reviews.due_at == "2026-01-03T00:00:00+00:00"
+    assert state == ConceptState(
+        0.4, state.updated_us, ReviewState(2, 0, 2.5, state.reviews.due_us)
+    )